@@ -90,9 +90,9 @@ class App:
         # Combine parsing and validation to avoid redundant checks
         self.parse_and_verify_args()
 
-        if self.args.email and self.setting.SMTP_validation_enabled:
+        if self.args.email and self.setting.general.SMTP_validation_enabled:
             self._validate_smtp_connection()
-        if self.setting.image_verification_enabled:
+        if self.setting.general.image_verification_enabled:
             self._verify_image_file_integrity()
 
         # all checks passed, merge settings
@@ -100,7 +100,7 @@ class App:
         self.setting.merge_args(self.args, args_attributes)
 
         # update number of fishes to catch
-        fishes_to_catch = self.setting.keepnet_limit - self.setting.fishes_in_keepnet
+        fishes_to_catch = self.setting.general.keepnet_limit - self.setting.fishes_in_keepnet
         self.setting.fishes_to_catch = fishes_to_catch
         print(ASCII_LOGO)
         print("https://github.com/dereklee0310/RussianFishing4Script")
@@ -171,14 +171,14 @@ class App:
             ),
         )
 
-        argv = self.setting.default_arguments
+        argv = self.setting.general.default_arguments
         self.args = parser.parse_args(shlex.split(argv) + sys.argv[1:])
 
     def _verify_args(self) -> None:
         """Verify args that comes with an argument."""
 
         # verify number of fishes in keepnet
-        if not 0 <= self.args.fishes_in_keepnet < self.setting.keepnet_limit:
+        if not 0 <= self.args.fishes_in_keepnet < self.setting.general.keepnet_limit:
             logger.error("Invalid number of fishes in keepnet")
             sys.exit()
 
@@ -317,12 +317,12 @@ class App:
         table.add_row(["Profile name", self.setting.profile_names[self.pid]])
 
         for attribute_name, column_name, _ in COMMON_CONFIGS:
-            attribute_value = getattr(self.setting, attribute_name)
+            attribute_value = getattr(self.setting.profile, attribute_name)
             table.add_row([column_name, attribute_value])
 
-        special_configs = SPECIAL_CONFIGS.get(self.setting.fishing_strategy)
+        special_configs = SPECIAL_CONFIGS.get(self.setting.profile.fishing_strategy)
         for attribute_name, column_name, _ in special_configs:
-            attribute_value = getattr(self.setting, attribute_name)
+            attribute_value = getattr(self.setting.profile, attribute_name)
             table.add_row([column_name, attribute_value])
         print(table)
 
@@ -332,7 +332,7 @@ class App:
         :param key: key code used by OS
         :type key: keyboard.KeyCode
         """
-        if key == keyboard.KeyCode.from_char(self.setting.quitting_shortcut):
+        if key == keyboard.KeyCode.from_char(self.setting.general.quitting_shortcut):
             logger.info("Shutting down...")
             os.kill(os.getpid(), signal.CTRL_C_EVENT)
             sys.exit()
@@ -347,11 +347,11 @@ if __name__ == "__main__":
     app.display_args()
     app.display_user_configs()
 
-    if app.setting.confirmation_enabled:
+    if app.setting.general.confirmation_enabled:
         script.ask_for_confirmation("Do you want to continue with the settings above")
     app.setting.window_controller.activate_game_window()
 
-    if app.setting.quitting_shortcut != "Ctrl-C":
+    if app.setting.general.quitting_shortcut != "Ctrl-C":
         listener = keyboard.Listener(on_release=app.on_release)
         listener.start()
 
@@ -7,23 +7,27 @@ Usage: app.py
 # pylint: disable=no-member
 # setting node's attributes will be merged on the fly
 
+# pylint: disable=import-outside-toplevel, wrong-import-position
+# optional features import their dependencies on first use to speed up startup
+
 import logging
 import os
 import shlex
 import signal
-import smtplib
 import sys
+import time
 from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from socket import gaierror
+
+LAUNCH_TIME = time.perf_counter()  # taken before the heavy imports below
 
 import pyautogui as pag
-from dotenv import load_dotenv
 from prettytable import PrettyTable
-from pynput import keyboard
 
-import script
-from player import Player
+import notifier
+import scheduler
+from exceptions import BundleError, ConfigError
 from setting import COMMON_CONFIGS, SPECIAL_CONFIGS, Setting
 
 # logging.BASIC_FORMAT: %(levelname)s:%(name)s:%(message)s
@@ -44,6 +48,7 @@ HELP = [
     ("e", "Send email to yourself after terminated without user interruption"),
     ("M", "Send Message to the user's miaotixing service. after terminated without user interruption"),
     ("S", "Take screenshots of every fish you catch and save them in screenshots/"),
+    ("E", "Write a JSONL event log with a record of every cast in logs/"),
 ]
 
 # ------------------ flag name, attribute name, description ------------------ #
@@ -59,6 +64,7 @@ COMMON_ARGS = (
     ("email", "email_sending_enabled", "Email sending"),
     ("miaotixing", "miaotixing_sending_enabled", "miaotixing sending"),
     ("screenshot", "screenshot_enabled", "Screenshot"),
+    ("event_log", "event_log_enabled", "Event log"),
 )
 
 SPECIAL_ARGS = (
@@ -66,6 +72,10 @@ SPECIAL_ARGS = (
     ("rainbow_line", "rainbow_line_enabled", "Rainbow line"),
     ("fishes_in_keepnet", "fishes_in_keepnet", "Fishes in keepnet"),
     ("boat_ticket_duration", "boat_ticket_duration", "Boat ticket duratioin"),
+    ("metrics_port", "metrics_port", "Metrics port"),
+    ("summary_interval", "summary_interval", "Summary interval"),
+    ("schedule", "schedule", "Schedule"),
+    ("multi_window", "multi_window_enabled", "Multi-window"),
 )
 
 # https://patorjk.com/software/taag/#p=testall&f=3D-ASCII&t=RF4S%0A, ANSI Shadow
@@ -85,22 +95,25 @@ class App:
         """Merge args into setting node."""
         self.pid = None
         self.player = None
+        self.runner = None
 
-        self.setting = Setting()
+        try:
+            self.setting = Setting()
+        except ConfigError as e:
+            logger.error(e)
+            print("Please check your configuration in ../config.ini")
+            sys.exit()
+        self.setting.launch_time = LAUNCH_TIME  # shifted by the time spent on prompts
         self.parse_args()
         self._verify_args()
-
-        if self.args.email and self.setting.SMTP_validation_enabled:
-            self._validate_smtp_connection()
-        if self.setting.image_verification_enabled:
-            self._verify_image_file_integrity()
+        self._run_validations()
 
         # all checks passed, merge settings
         args_attributes = COMMON_ARGS + SPECIAL_ARGS
         self.setting.merge_args(self.args, args_attributes)
 
         # update number of fishes to catch
-        fishes_to_catch = self.setting.keepnet_limit - self.setting.fishes_in_keepnet
+        fishes_to_catch = self.setting.general.keepnet_limit - self.setting.fishes_in_keepnet
         self.setting.fishes_to_catch = fishes_to_catch
 #        print(ASCII_LOGO)
         print("https://github.com/dereklee0310/RussianFishing4Script")
@@ -170,15 +183,41 @@ class App:
                 "use 1, 2, 3, or 5 to speicfy the ticket duration"
             ),
         )
+        parser.add_argument(
+            "--metrics-port",
+            metavar="PORT",
+            type=int,
+            help="Serve Prometheus-style metrics on localhost with the given port",
+        )
+        parser.add_argument(
+            "--summary-interval",
+            metavar="MINUTES",
+            type=float,
+            help="Send running results with -e or -M every given minutes while fishing",
+        )
+        parser.add_argument(
+            "--multi-window",
+            action="store_true",
+            help="Drive all game windows with the same profile, windows must not overlap",
+        )
+        parser.add_argument(
+            "--schedule",
+            metavar="SCHEDULE",
+            help=(
+                "Run/pause windows and profile rotations, e.g., "
+                '"5:30m pause:30m 6:1h", end it with quit to stop the script, '
+                "otherwise it's repeated"
+            ),
+        )
 
-        argv = self.setting.default_arguments
+        argv = self.setting.general.default_arguments
         self.args = parser.parse_args(shlex.split(argv) + sys.argv[1:])
 
     def _verify_args(self) -> None:
         """Verify args that comes with an argument."""
 
         # verify number of fishes in keepnet
-        if not 0 <= self.args.fishes_in_keepnet < self.setting.keepnet_limit:
+        if not 0 <= self.args.fishes_in_keepnet < self.setting.general.keepnet_limit:
             logger.error("Invalid number of fishes in keepnet")
             sys.exit()
 
@@ -188,22 +227,62 @@ class App:
             sys.exit()
         self.pid = self.args.pid
 
+        # the profile of the first fishing window is used if pid is not specified
+        if self.args.schedule is not None:
+            try:
+                windows = scheduler.parse_schedule(self.args.schedule)
+            except ValueError as e:
+                logger.error(e)
+                sys.exit()
+            pids = [window.pid for window in windows if window.pid is not None]
+            if not all(self._is_pid_valid(str(pid)) and pid != 0 for pid in pids):
+                logger.error("Invalid profile id in schedule")
+                sys.exit()
+            if self.pid is None:
+                self.pid = pids[0]
+
+        if self.args.summary_interval is not None:
+            if not (self.args.email or self.args.miaotixing):
+                logger.error("Summary interval requires email or miaotixing sending")
+                sys.exit()
+            if self.args.summary_interval <= 0:
+                logger.error("Invalid summary interval")
+                sys.exit()
+
         # boat_ticket_duration already checked by choices[...]
 
+    def _run_validations(self) -> None:
+        """Run enabled startup validations concurrently.
+
+        Validations exit the script on failure, SystemExit raised in the worker
+        thread is re-raised here by Future.result().
+        """
+        validations = []
+        if self.args.email and self.setting.general.SMTP_validation_enabled:
+            validations.append(self._validate_smtp_connection)
+        if self.setting.general.image_verification_enabled:
+            validations.append(self._verify_image_file_integrity)
+        if not validations:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(validations)) as executor:
+            futures = [executor.submit(validation) for validation in validations]
+            for future in futures:
+                future.result()
+
     def _validate_smtp_connection(self) -> None:
         """Validate email configuration in .env."""
-        load_dotenv()
-        email = os.getenv("EMAIL")
-        password = os.getenv("PASSWORD")
-        smtp_server_name = os.getenv("SMTP_SERVER")
+        import smtplib
+        from socket import gaierror
 
-        if not smtp_server_name:
+        notifier.load_env()
+        if not os.getenv("SMTP_SERVER"):
             logger.error("SMTP_SERVER is not specified")
             sys.exit()
 
         try:
-            with smtplib.SMTP_SSL(smtp_server_name, 465) as smtp_server:
-                smtp_server.login(email, password)
+            with notifier.connect_smtp():
+                pass
         except smtplib.SMTPAuthenticationError:
             logger.error("Email address or password not accepted")
             print(
@@ -222,25 +301,34 @@ class App:
     def _verify_image_file_integrity(self) -> None:
         """Verify the file integrity of static/{language}.
 
-        Compare files in static/en and static/{language}
-        and print missing files in static/{language}.
+        Compare templates of en and {language} and print missing templates of
+        {language}. Template bundles and their content hashes are used if they are
+        up to date, otherwise the directory listings are compared.
         """
+        import templates
+
         logger.info("Verifying file integrity...")
 
-        image_dir = self.setting.image_dir
-        if image_dir == "../static/en/":
+        language = self.setting.general.language
+        try:
+            bundle = templates.load_bundle(language)
+            reference_bundle = templates.load_bundle("en")  # use en version as reference
+        except BundleError as e:
+            logger.error(e)
+            print("Please run templates.py to rebuild the template bundles")
+            sys.exit()
+
+        if language == "en":
             logger.info("Integrity check passed")
             return
 
-        complete_filenames = os.listdir("../static/en/")  # use en version as reference
-        try:
-            current_filenames = os.listdir(image_dir)
-        except FileNotFoundError:
-            logger.error("Directory %s not found", image_dir)
-            print("Please check your language setting in ../config.ini")
-            sys.exit()
+        if bundle is not None and reference_bundle is not None:
+            missing_filenames = {
+                f"{name}.png" for name in reference_bundle.names - bundle.names
+            }
+        else:
+            missing_filenames = self._get_missing_filenames()
 
-        missing_filenames = set(complete_filenames) - set(current_filenames)
         if len(missing_filenames) != 0:
             logger.error("Integrity check failed")
             guide_link = "https://shorturl.at/2AzUI"
@@ -254,6 +342,22 @@ class App:
 
         logger.info("Integrity check passed")
 
+    def _get_missing_filenames(self) -> set[str]:
+        """Compare files in static/en and static/{language}.
+
+        :return: missing files in static/{language}
+        :rtype: set[str]
+        """
+        image_dir = self.setting.image_dir
+        complete_filenames = os.listdir("../static/en/")  # use en version as reference
+        try:
+            current_filenames = os.listdir(image_dir)
+        except FileNotFoundError:
+            logger.error("Directory %s not found", image_dir)
+            print("Please check your language setting in ../config.ini")
+            sys.exit()
+        return set(complete_filenames) - set(current_filenames)
+
     def _is_pid_valid(self, pid: str) -> bool:
         """Validate the profile id.
 
@@ -277,6 +381,7 @@ class App:
 
     def ask_for_pid(self) -> None:
         """Get and validate user profile id from user input."""
+        start_time = time.perf_counter()
         pid = input("Enter profile id or press q to exit: ")
         while not self._is_pid_valid(pid):
             if pid.strip() == "q":
@@ -284,6 +389,7 @@ class App:
             print("Invalid profile id, please try again.")
             pid = input("Profile id: ")
         self.pid = int(pid)
+        self.setting.launch_time += time.perf_counter() - start_time
 
         if self.pid == 0:
             os.startfile(Path(__file__).resolve().parents[1] / "config.ini")
@@ -293,8 +399,29 @@ class App:
     def create_player(self) -> None:
         """Generate a player object from args and configuration file."""
         # use pid to merge user profile into setting before passing it as argument
-        self.setting.merge_user_configs(self.pid)
-        self.player = Player(self.setting)
+        try:
+            if self.args.schedule is not None:  # validate all scheduled profiles first
+                for window in scheduler.parse_schedule(self.args.schedule):
+                    if window.pid is not None:
+                        self.setting.merge_user_configs(window.pid)
+            self.setting.merge_user_configs(self.pid)
+        except ConfigError as e:
+            logger.error(e)
+            sys.exit()
+
+        if not self.setting.multi_window_enabled:
+            from player import Player
+
+            self.player = Player(self.setting)
+            return
+
+        from multiwindow import MultiWindowRunner
+        from windowcontroller import WindowController, find_game_windows
+
+        hwnds = find_game_windows()
+        logger.info("Found %s game windows", len(hwnds))
+        window_controllers = [WindowController(hwnd=hwnd) for hwnd in hwnds]
+        self.runner = MultiWindowRunner(self.setting, window_controllers)
 
     def display_args(self) -> None:
         """Display command line arguments."""
@@ -317,22 +444,24 @@ class App:
         table.add_row(["Profile name", self.setting.profile_names[self.pid]])
 
         for attribute_name, column_name, _ in COMMON_CONFIGS:
-            attribute_value = getattr(self.setting, attribute_name)
+            attribute_value = getattr(self.setting.profile, attribute_name)
             table.add_row([column_name, attribute_value])
 
-        special_configs = SPECIAL_CONFIGS.get(self.setting.fishing_strategy)
+        special_configs = SPECIAL_CONFIGS.get(self.setting.profile.fishing_strategy)
         for attribute_name, column_name, _ in special_configs:
-            attribute_value = getattr(self.setting, attribute_name)
+            attribute_value = getattr(self.setting.profile, attribute_name)
             table.add_row([column_name, attribute_value])
         print(table)
 
-    def on_release(self, key: keyboard.KeyCode) -> None:
+    def on_release(self, key: "keyboard.KeyCode") -> None:
         """Callback for button release.
 
         :param key: key code used by OS
         :type key: keyboard.KeyCode
         """
-        if key == keyboard.KeyCode.from_char(self.setting.quitting_shortcut):
+        from pynput import keyboard
+
+        if key == keyboard.KeyCode.from_char(self.setting.general.quitting_shortcut):
             logger.info("Shutting down...")
             os.kill(os.getpid(), signal.CTRL_C_EVENT)
             sys.exit()
@@ -347,22 +476,41 @@ if __name__ == "__main__":
     app.display_args()
     app.display_user_configs()
 
-    if app.setting.confirmation_enabled:
+    if app.setting.general.confirmation_enabled:
+        import script
+
+        confirmation_start_time = time.perf_counter()
         script.ask_for_confirmation("Do you want to continue with the settings above")
+        app.setting.launch_time += time.perf_counter() - confirmation_start_time
     app.setting.window_controller.activate_game_window()
 
-    if app.setting.quitting_shortcut != "Ctrl-C":
+    if app.setting.general.quitting_shortcut != "Ctrl-C":
+        from pynput import keyboard
+
         listener = keyboard.Listener(on_release=app.on_release)
         listener.start()
 
     try:
-        app.player.start_fishing()
+        if app.runner is not None:
+            app.runner.run()
+        else:
+            app.player.start_fishing()
     except KeyboardInterrupt:
         pass
 
     pag.keyUp("shift")  # avoid Shift key stuck
-    print(app.player.gen_result("Terminated by user"))
-    if app.setting.plotting_enabled:
-        app.plot_and_save()
+    players = [app.player] if app.runner is None else app.runner.players
+    for player in players:
+        player.tackle.clicklock.release()
+    for player in players:
+        print(player.gen_result("Terminated by user"))
+        if app.setting.plotting_enabled:
+            player.plot_and_save()
+    if app.runner is not None:
+        print(app.runner.gen_result())
+    for player in players:
+        player.close()
+    if app.runner is not None:
+        app.runner.close()
 
 # CTRL_C_EVENT reference: https://stackoverflow.com/questions/58455684/
@@ -0,0 +1,495 @@
+"""
+Benchmarks for startup and detection performance.
+
+Results are printed and appended to logs/benchmark.jsonl to track them over time.
+
+Usage: benchmark.py {startup,scaling,findall,probes,holds,replay} [-h]
+"""
+
+# pylint: disable=import-outside-toplevel
+# each benchmark imports its own dependencies
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from prettytable import PrettyTable
+
+SRC_DIR = Path(__file__).resolve().parent
+RESULT_FILE = SRC_DIR.parent / "logs" / "benchmark.jsonl"
+
+STARTUP_RUNS = 5
+TTFC_SESSIONS = 20
+IMPORT_TIME_TOP = 10
+
+SCALES = (0.75, 1, 1.25, 1.5, 2)
+SCALING_CONFIDENCE = 0.9
+FRAME_SIZE = (900, 1600)  # height, width
+FINDALL_RUNS = 5
+FINDALL_COUNTS = (1, 10, 40)
+FINDALL_CONFIDENCE = 0.95
+PROBE_TRIALS = 50
+PROBE_JITTER = 12  # brightness shift of the pasted template
+PROBE_NOISE = 4  # standard deviation of the pixel noise
+HOLD_DURATIONS = (0.05, 0.1, 0.4, 1.0, 2.0)  # e.g., pirks, casts and retrieves
+HOLD_RUNS = 10
+REPLAY_RUNS = 5
+# detectors polled by the fishing loop
+REPLAY_DETECTORS = (
+    "is_fish_hooked",
+    "is_fish_captured",
+    "is_tackle_ready",
+    "is_tackle_broken",
+    "is_lure_broken",
+    "is_line_at_end",
+    "is_disconnected",
+    "is_ticket_expired",
+)
+
+
+def benchmark_startup(args: argparse.Namespace) -> dict:
+    """Measure the import time of app.py and report recorded times to first cast.
+
+    The import time is measured in fresh interpreters, and the times to first
+    cast are read from the sessions in the catch database.
+
+    :param args: parsed args
+    :type args: argparse.Namespace
+    :return: benchmark result
+    :rtype: dict
+    """
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    import_times = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        import_times.append(float(output.split()[-1]))
+
+    # cumulative import time of top-level modules, in microseconds
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    module_times = []
+    for line in stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # header or unrelated output
+        _, cumulative, module = fields
+        if not module.startswith("  "):  # nested imports are indented
+            module_times.append((int(cumulative), module.strip()))
+    module_times.sort(reverse=True)
+
+    from catchdb import CatchDatabase
+
+    catch_db = CatchDatabase()
+    ttfc = [seconds for _, seconds in catch_db.get_times_to_first_cast(args.sessions)]
+    catch_db.close()
+
+    table = PrettyTable(header=False, align="l")
+    table.title = "Startup"
+    table.add_row(["Import time (median)", f"{statistics.median(import_times):.3f}s"])
+    table.add_row(["Import time (min)", f"{min(import_times):.3f}s"])
+    for cumulative, module in module_times[:IMPORT_TIME_TOP]:
+        table.add_row([f"  import {module}", f"{cumulative / 1e6:.3f}s"])
+    if ttfc:
+        table.add_row(["Time to first cast (latest)", f"{ttfc[0]:.2f}s"])
+        table.add_row(
+            [f"Time to first cast (median of {len(ttfc)})", f"{statistics.median(ttfc):.2f}s"]
+        )
+    print(table)
+
+    return {
+        "import_time_median": statistics.median(import_times),
+        "import_time_min": min(import_times),
+        "time_to_first_cast_median": statistics.median(ttfc) if ttfc else None,
+    }
+
+
+def benchmark_scaling(args: argparse.Namespace) -> dict:
+    """Compare the match rate of native and scaled templates at different ui scales.
+
+    Every template is resized to the ui scale and pasted into a synthetic noisy
+    frame, then searched with the template at native scale and with the template
+    resized by templates.scale_template(). A match counts if the best location is
+    the pasted one and its score reaches the confidence.
+
+    :param args: parsed args
+    :type args: argparse.Namespace
+    :return: benchmark result
+    :rtype: dict
+    """
+    import numpy as np
+
+    import templates
+
+    bundle = templates.load_bundle(args.language)
+    if bundle is None:
+        sys.exit(f"Template bundle of '{args.language}' not found, run templates.py first")
+
+    rng = np.random.default_rng(0)
+    height, width = FRAME_SIZE
+    table = PrettyTable(["UI scale", "Native templates", "Scaled templates", "Scale time"])
+    table.title = f"Scaling ({len(bundle.names)} templates)"
+    result = {}
+    for scale in args.scales:
+        start_time = time.perf_counter()
+        scaled_templates = bundle.get_scaled_templates(scale)
+        scale_time = time.perf_counter() - start_time
+
+        native_hits = scaled_hits = total = 0
+        for name, template in bundle.templates.items():
+            target = scaled_templates[name]
+            target_height, target_width = target.shape[:2]
+            if target_height >= height or target_width >= width:
+                continue
+            frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            x = int(rng.integers(0, width - target_width))
+            y = int(rng.integers(0, height - target_height))
+            frame[y : y + target_height, x : x + target_width] = target
+            total += 1
+            native_hits += _is_matched(frame, template, (x, y))
+            scaled_hits += _is_matched(frame, target, (x, y))
+
+        native_rate = native_hits / total if total else 0.0
+        scaled_rate = scaled_hits / total if total else 0.0
+        table.add_row(
+            [scale, f"{native_rate:.1%}", f"{scaled_rate:.1%}", f"{scale_time:.3f}s"]
+        )
+        result[f"match_rate_native_{scale}"] = native_rate
+        result[f"match_rate_scaled_{scale}"] = scaled_rate
+    print(table)
+    return result
+
+
+def _is_matched(frame, template, location: tuple[int, int]) -> bool:
+    """Check if the best match of a template is at the expected location.
+
+    :param frame: frame to search in
+    :type frame: np.ndarray
+    :param template: template to search for
+    :type template: np.ndarray
+    :param location: expected top-left corner
+    :type location: tuple[int, int]
+    :return: True if matched, False otherwise
+    :rtype: bool
+    """
+    import cv2
+
+    scores = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+    _, max_score, _, max_location = cv2.minMaxLoc(scores)
+    return max_score >= SCALING_CONFIDENCE and max_location == location
+
+
+def benchmark_findall(args: argparse.Namespace) -> dict:
+    """Compare pyscreeze.locateAll with matching.find_all on crowded menus.
+
+    A template is pasted in a grid into a synthetic noisy frame, like favorites in
+    a selection menu, then all of its instances are searched by both methods.
+
+    :param args: parsed args
+    :type args: argparse.Namespace
+    :return: benchmark result
+    :rtype: dict
+    """
+    import numpy as np
+    import pyscreeze
+
+    import matching
+    import templates
+
+    bundle = templates.load_bundle(args.language)
+    if bundle is None:
+        sys.exit(f"Template bundle of '{args.language}' not found, run templates.py first")
+    template = np.ascontiguousarray(bundle.templates[args.template])
+    template_height, template_width = template.shape[:2]
+
+    rng = np.random.default_rng(0)
+    height, width = FRAME_SIZE
+    columns = width // (template_width * 2)
+    table = PrettyTable(["Instances", "Method", "Found", "Time (median)"])
+    table.title = f"Find all '{args.template}'"
+    result = {}
+    for count in args.counts:
+        frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        for i in range(count):
+            x = i % columns * template_width * 2
+            y = i // columns * template_height * 2
+            if y + template_height > height:
+                sys.exit(f"{count} instances don't fit in the frame")
+            frame[y : y + template_height, x : x + template_width] = template
+
+        methods = {
+            "locateAll": lambda: list(
+                pyscreeze.locateAll(template, frame, confidence=FINDALL_CONFIDENCE)
+            ),
+            "find_all": lambda: matching.find_all(frame, template, FINDALL_CONFIDENCE)[0],
+        }
+        for method, search in methods.items():
+            times = []
+            for _ in range(args.runs):
+                start_time = time.perf_counter()
+                found = len(search())
+                times.append(time.perf_counter() - start_time)
+            median = statistics.median(times)
+            table.add_row([count, method, found, f"{median * 1000:.1f}ms"])
+            result[f"{method}_time_{count}"] = median
+            result[f"{method}_found_{count}"] = found
+    print(table)
+    return result
+
+
+def benchmark_probes(args: argparse.Namespace) -> dict:
+    """Validate the color probes of the detectors and compare their cost.
+
+    Every probed template is pasted with a brightness shift and pixel noise into a
+    smooth synthetic frame. A probe saying "absent" there is a false negative.
+    The same frames without the template give the rate of skipped matchings.
+
+    :param args: parsed args
+    :type args: argparse.Namespace
+    :return: benchmark result
+    :rtype: dict
+    """
+    import cv2
+    import numpy as np
+
+    import templates
+    from colorprobe import ColorProbe, get_signature
+    from monitor import COLOR_PROBED
+
+    bundle = templates.load_bundle(args.language)
+    if bundle is None:
+        sys.exit(f"Template bundle of '{args.language}' not found, run templates.py first")
+
+    rng = np.random.default_rng(0)
+    height, width = FRAME_SIZE
+    table = PrettyTable(
+        ["Detector", "False negatives", "Skipped when absent", "Probe time", "Match time"]
+    )
+    table.title = f"Color probes ({args.trials} trials)"
+    result = {}
+    for name in COLOR_PROBED:
+        if name not in bundle.names:
+            continue
+        template = np.ascontiguousarray(bundle.templates[name])
+        signature = get_signature(template)
+        if signature is None:
+            table.add_row([name, "no distinctive color", "", "", ""])
+            continue
+        probe = ColorProbe(signature)
+        template_height, template_width = template.shape[:2]
+
+        false_negatives = skipped = 0
+        probe_times, match_times = [], []
+        for _ in range(args.trials):
+            noise = rng.integers(0, 256, (height // 16, width // 16, 3), dtype=np.uint8)
+            frame = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+
+            start_time = time.perf_counter()
+            skipped += not probe(frame)
+            probe_times.append(time.perf_counter() - start_time)
+            start_time = time.perf_counter()
+            cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+            match_times.append(time.perf_counter() - start_time)
+
+            pasted = template.astype(np.int16) + int(rng.integers(-PROBE_JITTER, PROBE_JITTER))
+            pasted += rng.normal(0, PROBE_NOISE, template.shape).astype(np.int16)
+            x = int(rng.integers(0, width - template_width))
+            y = int(rng.integers(0, height - template_height))
+            frame[y : y + template_height, x : x + template_width] = np.clip(pasted, 0, 255)
+            false_negatives += not probe(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+        fn_rate = false_negatives / args.trials
+        skip_rate = skipped / args.trials
+        probe_time = statistics.median(probe_times)
+        match_time = statistics.median(match_times)
+        table.add_row(
+            [
+                name,
+                f"{fn_rate:.1%}",
+                f"{skip_rate:.1%}",
+                f"{probe_time * 1000:.2f}ms",
+                f"{match_time * 1000:.2f}ms",
+            ]
+        )
+        result[f"false_negative_rate_{name}"] = fn_rate
+        result[f"skip_rate_{name}"] = skip_rate
+        result[f"probe_time_{name}"] = probe_time
+        result[f"match_time_{name}"] = match_time
+    print(table)
+    return result
+
+
+def benchmark_holds(args: argparse.Namespace) -> dict:
+    """Compare the achieved durations of time.sleep() and precise_sleep().
+
+    No input is sent, only the waits between mouseDown() and mouseUp() are timed.
+
+    :param args: parsed args
+    :type args: argparse.Namespace
+    :return: benchmark result
+    :rtype: dict
+    """
+    from precisetime import precise_sleep
+
+    def _sleep(duration: float) -> float:
+        start_time = time.perf_counter()
+        time.sleep(duration)
+        return time.perf_counter() - start_time
+
+    table = PrettyTable(["Requested", "Method", "Mean error", "Stdev", "Max error"])
+    table.title = f"Hold durations ({args.runs} runs)"
+    result = {}
+    for duration in args.durations:
+        for method, wait in (("sleep", _sleep), ("precise_sleep", precise_sleep)):
+            errors = [wait(duration) - duration for _ in range(args.runs)]
+            max_error = max(map(abs, errors))
+            table.add_row(
+                [
+                    f"{duration}s",
+                    method,
+                    f"{statistics.fmean(errors) * 1000:+.2f}ms",
+                    f"{statistics.pstdev(errors) * 1000:.2f}ms",
+                    f"{max_error * 1000:.2f}ms",
+                ]
+            )
+            result[f"{method}_max_error_{duration}"] = max_error
+    print(table)
+    return result
+
+
+def benchmark_replay(args: argparse.Namespace) -> dict:
+    """Run the detectors of the fishing loop over recorded frames.
+
+    The game is replaced by FakeWindowController and FakeCapture, so the whole
+    path of Monitor, from the capture to the templates, runs without the game.
+
+    :param args: parsed args
+    :type args: argparse.Namespace
+    :return: benchmark result
+    :rtype: dict
+    """
+    from PIL import Image
+
+    from fakes import FakeCapture, FakeWindowController
+    from monitor import Monitor
+    from setting import Setting
+
+    setting = Setting()
+    table = PrettyTable(["Frame", "Screen", "Detected", "Captures", "Time / frame"], align="l")
+    table.title = f"Replay ({args.runs} runs)"
+    frame_times = []
+    for path in args.frames:
+        image = Image.open(path).convert("RGB")
+        setting.bind_window(FakeWindowController((0, 0, *image.size)))
+        setting.capture = FakeCapture([image])
+        monitor = Monitor(setting)
+
+        durations = []
+        for _ in range(args.runs):
+            start_time = time.perf_counter()
+            detected = [name for name in REPLAY_DETECTORS if getattr(monitor, name)()]
+            durations.append(time.perf_counter() - start_time)
+        frame_time = min(durations)
+        frame_times.append(frame_time)
+        captures = setting.capture.capture_count // args.runs
+        table.add_row(
+            [
+                Path(path).name,
+                monitor.classify_screen() or "-",
+                ", ".join(detected) or "-",
+                captures,
+                f"{frame_time * 1000:.1f}ms",
+            ]
+        )
+    print(table)
+    return {"mean_frame_time": statistics.fmean(frame_times)}
+
+
+def save_result(name: str, result: dict) -> None:
+    """Append a benchmark result to the result file and compare it with the last one.
+
+    :param name: benchmark name
+    :type name: str
+    :param result: benchmark result
+    :type result: dict
+    """
+    previous = None
+    if RESULT_FILE.exists():
+        with open(RESULT_FILE, encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                if record["benchmark"] == name:
+                    previous = record
+
+    if previous is not None:
+        for key, value in result.items():
+            pre_value = previous["result"].get(key)
+            if isinstance(value, float) and isinstance(pre_value, float) and pre_value:
+                print(f"{key}: {value:.4f} ({(value - pre_value) / pre_value:+.1%})")
+
+    RESULT_FILE.parent.mkdir(exist_ok=True)
+    with open(RESULT_FILE, "a", encoding="utf-8") as file:
+        record = {"benchmark": name, "time": time.time(), "result": result}
+        file.write(json.dumps(record) + "\n")
+
+
+def parse_args() -> argparse.Namespace:
+    """Cofigure argparser and parse the command line arguments.
+
+    :return: parsed args
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Run performance benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    startup = subparsers.add_parser("startup", help="Import time and time to first cast")
+    startup.add_argument("-n", "--runs", type=int, default=STARTUP_RUNS)
+    startup.add_argument("-s", "--sessions", type=int, default=TTFC_SESSIONS)
+    startup.set_defaults(func=benchmark_startup)
+
+    scaling = subparsers.add_parser("scaling", help="Match rate of scaled templates")
+    scaling.add_argument("-l", "--language", default="en")
+    scaling.add_argument("--scales", type=float, nargs="+", default=SCALES)
+    scaling.set_defaults(func=benchmark_scaling)
+
+    findall = subparsers.add_parser("findall", help="Find-all matching on crowded menus")
+    findall.add_argument("-l", "--language", default="en")
+    findall.add_argument("-t", "--template", default="favorite")
+    findall.add_argument("-n", "--runs", type=int, default=FINDALL_RUNS)
+    findall.add_argument("--counts", type=int, nargs="+", default=FINDALL_COUNTS)
+    findall.set_defaults(func=benchmark_findall)
+
+    probes = subparsers.add_parser("probes", help="False negatives of the color probes")
+    probes.add_argument("-l", "--language", default="en")
+    probes.add_argument("-n", "--trials", type=int, default=PROBE_TRIALS)
+    probes.set_defaults(func=benchmark_probes)
+
+    holds = subparsers.add_parser("holds", help="Precision of input hold durations")
+    holds.add_argument("-n", "--runs", type=int, default=HOLD_RUNS)
+    holds.add_argument("--durations", type=float, nargs="+", default=HOLD_DURATIONS)
+    holds.set_defaults(func=benchmark_holds)
+
+    replay = subparsers.add_parser("replay", help="Loop detectors on recorded frames")
+    replay.add_argument("frames", nargs="+", help="screenshots of the game window")
+    replay.add_argument("-n", "--runs", type=int, default=REPLAY_RUNS)
+    replay.set_defaults(func=benchmark_replay)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    save_result(arguments.benchmark, arguments.func(arguments))
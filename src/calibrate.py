@@ -0,0 +1,233 @@
+"""
+Calibrate the matching confidences of the detectors from labeled frames.
+
+Frames are screenshots of the game sorted into directories named after the
+template that is visible in them, frames without any of them go to none/:
+
+    FRAMES/get/*.png    frames where the "get" template is visible
+    FRAMES/keep/*.png
+    FRAMES/none/*.png   frames for negatives only
+
+For every template with labeled frames, the best matching score of each frame is
+computed, then the ROC curve gives the threshold that separates positives from
+negatives. The recommendations are saved to calibration.json per language and
+loaded by Monitor, they override monitor.CONFIDENCES.
+
+Usage: calibrate.py FRAMES [-h] [-l LANGUAGE] [-s SCALE] [--dry-run]
+"""
+
+# pylint: disable=import-outside-toplevel
+# monitor imports this module for load_calibration()
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_PATH = Path(__file__).resolve().parents[1] / "calibration.json"
+NEGATIVE_DIR = "none"
+FRAME_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+MIN_CONFIDENCE = 0.5
+MAX_CONFIDENCE = 0.99
+
+
+def load_calibration(language: str) -> dict[str, float]:
+    """Load the calibrated confidences of a language.
+
+    :param language: language directory name in static/
+    :type language: str
+    :return: template name - confidence, empty if not calibrated
+    :rtype: dict[str, float]
+    """
+    try:
+        with open(CALIBRATION_PATH, encoding="utf-8") as file:
+            calibration = json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning("%s is invalid, using default confidences", CALIBRATION_PATH.name)
+        return {}
+    return calibration.get(language, {})
+
+
+def get_roc_curve(
+    positives: np.ndarray, negatives: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute the ROC curve of the matching scores.
+
+    :param positives: scores of the frames where the template is visible
+    :type positives: np.ndarray
+    :param negatives: scores of the other frames
+    :type negatives: np.ndarray
+    :return: thresholds in descending order, true and false positive rates
+    :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    thresholds = np.unique(np.concatenate((positives, negatives)))[::-1]
+    tpr = (positives >= thresholds[:, None]).mean(axis=1)
+    fpr = (negatives >= thresholds[:, None]).mean(axis=1)
+    return thresholds, tpr, fpr
+
+
+def recommend_threshold(positives: np.ndarray, negatives: np.ndarray) -> float:
+    """Recommend a confidence for the matching scores.
+
+    If the scores are separable, the threshold is the middle of the margin.
+    Otherwise it maximizes the Youden index, TPR - FPR.
+
+    :param positives: scores of the frames where the template is visible
+    :type positives: np.ndarray
+    :param negatives: scores of the other frames
+    :type negatives: np.ndarray
+    :return: recommended confidence
+    :rtype: float
+    """
+    if positives.min() > negatives.max():
+        threshold = (positives.min() + negatives.max()) / 2
+    else:
+        thresholds, tpr, fpr = get_roc_curve(positives, negatives)
+        threshold = thresholds[np.argmax(tpr - fpr)]  # the highest one on ties
+    return round(float(np.clip(threshold, MIN_CONFIDENCE, MAX_CONFIDENCE)), 3)
+
+
+def get_auc(positives: np.ndarray, negatives: np.ndarray) -> float:
+    """Compute the area under the ROC curve.
+
+    :param positives: scores of the frames where the template is visible
+    :type positives: np.ndarray
+    :param negatives: scores of the other frames
+    :type negatives: np.ndarray
+    :return: area under the curve, 1 if the scores are separable
+    :rtype: float
+    """
+    _, tpr, fpr = get_roc_curve(positives, negatives)
+    tpr = np.concatenate(([0], tpr))
+    fpr = np.concatenate(([0], fpr))
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+def load_frames(frame_dir: Path) -> dict[str, list[np.ndarray]]:
+    """Load the labeled frames.
+
+    :param frame_dir: directory of the frame set
+    :type frame_dir: Path
+    :return: label - frames in BGR format
+    :rtype: dict[str, list[np.ndarray]]
+    """
+    import cv2
+
+    frames = {}
+    for label_dir in sorted(path for path in frame_dir.iterdir() if path.is_dir()):
+        for path in sorted(label_dir.iterdir()):
+            if path.suffix.lower() not in FRAME_SUFFIXES:
+                continue
+            frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if frame is None:
+                logger.warning("Failed to read %s, skipped", path)
+                continue
+            frames.setdefault(label_dir.name, []).append(frame)
+    return frames
+
+
+def calibrate(args: argparse.Namespace) -> dict[str, float]:
+    """Compute the recommended confidence of every labeled template.
+
+    :param args: parsed args
+    :type args: argparse.Namespace
+    :return: template name - recommended confidence
+    :rtype: dict[str, float]
+    """
+    import cv2
+    from prettytable import PrettyTable
+
+    import templates
+    from monitor import CONFIDENCES, DEFAULT_CONFIDENCE
+
+    frames = load_frames(args.frames)
+    frame_count = sum(len(label_frames) for label_frames in frames.values())
+    image_dir = templates.STATIC_DIR / args.language
+    table = PrettyTable(
+        ["Template", "Positives", "Negatives", "AUC", "Current", "Recommended"], align="l"
+    )
+    table.title = f"Calibration of '{args.language}' ({frame_count} frames)"
+    recommendations = {}
+    for name in sorted(frames):
+        if name == NEGATIVE_DIR:
+            continue
+        template = templates.read_template(image_dir / f"{name}.png", args.scale)
+        if template is None:
+            logger.warning("Template '%s' not found in %s, skipped", name, image_dir)
+            continue
+
+        positives, negatives = [], []
+        for label, label_frames in frames.items():
+            for frame in label_frames:
+                if template.shape[0] > frame.shape[0] or template.shape[1] > frame.shape[1]:
+                    continue
+                scores = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+                (positives if label == name else negatives).append(float(scores.max()))
+        if not positives or not negatives:
+            logger.warning("Template '%s' needs both positives and negatives, skipped", name)
+            continue
+
+        positives, negatives = np.array(positives), np.array(negatives)
+        recommendations[name] = recommend_threshold(positives, negatives)
+        table.add_row(
+            [
+                name,
+                len(positives),
+                len(negatives),
+                f"{get_auc(positives, negatives):.3f}",
+                CONFIDENCES.get(name, DEFAULT_CONFIDENCE),
+                recommendations[name],
+            ]
+        )
+    print(table)
+    return recommendations
+
+
+def save_calibration(language: str, recommendations: dict[str, float]) -> None:
+    """Merge the recommended confidences of a language into the calibration file.
+
+    :param language: language directory name in static/
+    :type language: str
+    :param recommendations: template name - confidence
+    :type recommendations: dict[str, float]
+    """
+    calibration = {}
+    if CALIBRATION_PATH.exists():
+        with open(CALIBRATION_PATH, encoding="utf-8") as file:
+            calibration = json.load(file)
+    calibration[language] = calibration.get(language, {}) | recommendations
+    with open(CALIBRATION_PATH, "w", encoding="utf-8") as file:
+        json.dump(calibration, file, indent=4, sort_keys=True)
+
+
+def parse_args() -> argparse.Namespace:
+    """Cofigure argparser and parse the command line arguments.
+
+    :return: parsed args
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Calibrate matching confidences.")
+    parser.add_argument("frames", type=Path, metavar="FRAMES", help="Labeled frame directory")
+    parser.add_argument("-l", "--language", default="en")
+    parser.add_argument("-s", "--scale", type=float, default=1, help="UI scale of the frames")
+    parser.add_argument("--dry-run", action="store_true", help="Don't save the result")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
+    arguments = parse_args()
+    result = calibrate(arguments)
+    if result and not arguments.dry_run:
+        save_calibration(arguments.language, result)
+        print(f"Saved {len(result)} confidences of '{arguments.language}' to {CALIBRATION_PATH}")
+    # retrieval detectors use the confidence in config.ini instead
+    retrieval_confidences = [result[name] for name in ("0m", "5m", "wheel") if name in result]
+    if retrieval_confidences:
+        print(f"Consider retrieval_detect_confidence = {min(retrieval_confidences)}")
@@ -0,0 +1,247 @@
+"""
+Module for screen capture backends used by Monitor.
+
+ScreenCapture captures the screen with pyscreeze. When several game windows are
+driven from the same process, it shares the latest frame between them for a
+short time instead of capturing the same screen repeatedly.
+
+Template searches return a MatchResult, which keeps the score, the frame and the
+time spent along with the box.
+"""
+
+import threading
+import time
+from typing import Callable
+
+import cv2
+import numpy as np
+import pyscreeze
+from PIL import Image
+from pyscreeze import Box, Point
+
+import matching
+
+
+class MatchResult:
+    """Result of a template search, truthy if the template is found."""
+
+    __slots__ = ("box", "score", "frame_id", "elapsed")
+
+    def __init__(self, box: Box | None, score: float, frame_id: int, elapsed: float):
+        """Initialize the result.
+
+        :param box: image box on the screen, None if not found
+        :type box: Box | None
+        :param score: best matching score, 0 if the search was skipped
+        :type score: float
+        :param frame_id: id of the searched frame, see ScreenCapture.capture_count
+        :type frame_id: int
+        :param elapsed: time spent in the search, including the capture
+        :type elapsed: float
+        """
+        self.box = box
+        self.score = score
+        self.frame_id = frame_id
+        self.elapsed = elapsed
+
+    def __bool__(self) -> bool:
+        return self.box is not None
+
+    def __repr__(self) -> str:
+        return (
+            f"MatchResult(box={self.box}, score={self.score:.3f}, "
+            f"frame_id={self.frame_id}, elapsed={self.elapsed:.4f})"
+        )
+
+    @property
+    def center(self) -> Point | None:
+        """Getter.
+
+        :return: center of the box, None if not found
+        :rtype: Point | None
+        """
+        if self.box is None:
+            return None
+        return Point(self.box.left + self.box.width // 2, self.box.top + self.box.height // 2)
+
+
+class ScreenCapture:
+    """Capture the screen and locate templates in it."""
+
+    def __init__(self, max_frame_age: float = 0):
+        """Initialize the shared frame.
+
+        :param max_frame_age: seconds to reuse a captured frame, 0 to capture the
+            searched region every time, defaults to 0
+        :type max_frame_age: float, optional
+        """
+        self.max_frame_age = max_frame_age
+        self._lock = threading.Lock()
+        self._frame = None
+        self._frame_time = 0
+        self._frame_id = 0
+        self.capture_count = 0
+
+    def _capture(self, region: tuple[int, int, int, int] | None = None) -> Image.Image:
+        """Capture the screen.
+
+        :param region: region to capture, defaults to the whole screen
+        :type region: tuple[int, int, int, int] | None, optional
+        :return: captured image
+        :rtype: Image.Image
+        """
+        self.capture_count += 1
+        return pyscreeze.screenshot(region=region)
+
+    def grab(self) -> Image.Image:
+        """Get the shared frame of the whole screen, capture a new one if it's too old.
+
+        :return: frame of the whole screen
+        :rtype: Image.Image
+        """
+        return self._grab()[0]
+
+    def _grab(self) -> tuple[Image.Image, int]:
+        """Get the shared frame and its id, capture a new one if it's too old.
+
+        :return: frame of the whole screen and its id
+        :rtype: tuple[Image.Image, int]
+        """
+        with self._lock:
+            now = time.perf_counter()
+            if self._frame is None or now - self._frame_time > self.max_frame_age:
+                self._frame = self._capture()
+                self._frame_time = now
+                self._frame_id = self.capture_count
+            return self._frame, self._frame_id
+
+    def _get_frame(
+        self, region: tuple[int, int, int, int] | None
+    ) -> tuple[Image.Image, int, int, int]:
+        """Get the image of a region and its offset on the screen.
+
+        :param region: region to search in, None for the whole screen
+        :type region: tuple[int, int, int, int] | None
+        :return: image, its top-left corner, and the id of the frame
+        :rtype: tuple[Image.Image, int, int, int]
+        """
+        if not self.max_frame_age:  # nothing to share, capture the region only
+            x, y = region[:2] if region is not None else (0, 0)
+            image = self._capture(region)
+            return image, x, y, self.capture_count
+        frame, frame_id = self._grab()
+        if region is None:
+            return frame, 0, 0, frame_id
+        x, y, width, height = region
+        return frame.crop((x, y, x + width, y + height)), x, y, frame_id
+
+    def grab_region(self, region: tuple[int, int, int, int]) -> Image.Image:
+        """Get the image of a small region, e.g., a HUD element read every loop.
+
+        :param region: region to capture
+        :type region: tuple[int, int, int, int]
+        :return: image of the region
+        :rtype: Image.Image
+        """
+        return self._get_frame(region)[0]
+
+    def grab_region_with_id(self, region: tuple[int, int, int, int]) -> tuple[Image.Image, int]:
+        """Get the image of a small region and the id of its frame, see grab_region().
+
+        :param region: region to capture
+        :type region: tuple[int, int, int, int]
+        :return: image of the region and the id of the frame
+        :rtype: tuple[Image.Image, int]
+        """
+        image, _, _, frame_id = self._get_frame(region)
+        return image, frame_id
+
+    def match(
+        self,
+        template,
+        confidence: float,
+        region: tuple[int, int, int, int] | None = None,
+        probe: Callable[[Image.Image], bool] | None = None,
+        grayscale: bool = False,
+    ) -> MatchResult:
+        """Search for the best match of a template on the screen.
+
+        :param template: template in BGR format, path of the image, or a captured
+            image in RGB format
+        :type template: np.ndarray | str | Image.Image
+        :param confidence: matching confidence
+        :type confidence: float
+        :param region: region to search in, defaults to the whole screen
+        :type region: tuple[int, int, int, int] | None, optional
+        :param probe: cheap check of the captured image, template matching is
+            skipped if it returns False, defaults to None
+        :type probe: Callable[[Image.Image], bool] | None, optional
+        :param grayscale: whether to match in grayscale, defaults to False
+        :type grayscale: bool, optional
+        :raises OSError: the image of the template can't be read
+        :return: search result, falsy if not found
+        :rtype: MatchResult
+        """
+        start_time = time.perf_counter()
+        frame, x, y, frame_id = self._get_frame(region)
+        if probe is not None and not probe(frame):
+            return MatchResult(None, 0.0, frame_id, time.perf_counter() - start_time)
+        if isinstance(template, str):
+            path, template = template, cv2.imread(template, cv2.IMREAD_COLOR)
+            if template is None:
+                raise OSError(f"Failed to read {path}")
+        elif isinstance(template, Image.Image):
+            template = cv2.cvtColor(np.asarray(template)[:, :, :3], cv2.COLOR_RGB2BGR)
+
+        box, score = None, 0.0
+        haystack = cv2.cvtColor(np.asarray(frame)[:, :, :3], cv2.COLOR_RGB2BGR)
+        if grayscale:
+            haystack = cv2.cvtColor(haystack, cv2.COLOR_BGR2GRAY)
+            template = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+        height, width = template.shape[:2]
+        if height <= haystack.shape[0] and width <= haystack.shape[1]:
+            scores = cv2.matchTemplate(haystack, template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (left, top) = cv2.minMaxLoc(scores)
+            if score >= confidence:
+                box = Box(left + x, top + y, width, height)
+        return MatchResult(box, score, frame_id, time.perf_counter() - start_time)
+
+    def find_all(
+        self,
+        template: np.ndarray,
+        confidence: float,
+        region: tuple[int, int, int, int] | None = None,
+        order: str = "score",
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Find all non-overlapping occurrences of a template in one pass.
+
+        :param template: template in BGR format
+        :type template: np.ndarray
+        :param confidence: matching confidence
+        :type confidence: float
+        :param region: region to search in, defaults to the whole screen
+        :type region: tuple[int, int, int, int] | None, optional
+        :param order: "score" or "position", see matching.find_all(), defaults to "score"
+        :type order: str, optional
+        :return: boxes on the screen in an array of shape (n, 4), and their scores
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        image, x, y, _ = self._get_frame(region)
+        frame = cv2.cvtColor(np.asarray(image)[:, :, :3], cv2.COLOR_RGB2BGR)
+        boxes, scores = matching.find_all(frame, template, confidence, order)
+        boxes[:, :2] += (x, y)
+        return boxes, scores
+
+    def pixel(self, x: int, y: int) -> tuple[int, int, int]:
+        """Get the color of a pixel on the screen.
+
+        :param x: x coordinate
+        :type x: int
+        :param y: y coordinate
+        :type y: int
+        :return: RGB color
+        :rtype: tuple[int, int, int]
+        """
+        if not self.max_frame_age:
+            return pyscreeze.pixel(x, y)
+        return self.grab().getpixel((x, y))[:3]
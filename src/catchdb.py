@@ -0,0 +1,237 @@
+"""
+Module for CatchDatabase class, a persistent multi-session catch store.
+
+Every cast is appended to the casts table, and the hourly and per-profile
+aggregates are updated in the same transaction, so readers never rescan the raw
+records. The players of several windows share one database, each of them
+records its own CatchSession.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+DEFAULT_PATH = Path(__file__).resolve().parents[1] / "logs" / "catches.db"
+
+# outcomes that count as a catch, released fishes don't go into the keepnet
+CATCH_OUTCOMES = ("kept",)
+HOUR_KINDS = ("rhour", "ghour")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    start_time REAL NOT NULL,
+    profile TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    time_to_first_cast REAL
+);
+CREATE TABLE IF NOT EXISTS casts (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    time REAL NOT NULL,
+    rhour INTEGER NOT NULL,
+    ghour INTEGER NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_hourly (
+    session_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    casts INTEGER NOT NULL DEFAULT 0,
+    catches INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, kind, hour)
+);
+CREATE TABLE IF NOT EXISTS profile_hourly (
+    profile TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    casts INTEGER NOT NULL DEFAULT 0,
+    catches INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile, strategy, kind, hour)
+);
+CREATE TABLE IF NOT EXISTS profile_totals (
+    profile TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    casts INTEGER NOT NULL DEFAULT 0,
+    catches INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile, strategy)
+);
+"""
+
+
+class CatchSession(NamedTuple):
+    """A registered session, casts are recorded under its id and profile."""
+
+    id: int
+    profile: str
+    strategy: str
+
+
+class CatchDatabase:
+    """SQLite store of casts with incrementally maintained aggregates."""
+
+    def __init__(self, path: Path = DEFAULT_PATH):
+        """Open or create the database.
+
+        :param path: path of the database file, defaults to DEFAULT_PATH
+        :type path: Path, optional
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # players of several windows are built in the main thread but run in
+        # their own threads, the connection is shared under the lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer
+        self.conn.executescript(SCHEMA)
+
+    def start_session(self, profile: str, strategy: str) -> CatchSession:
+        """Register a new session.
+
+        :param profile: profile name
+        :type profile: str
+        :param strategy: fishing strategy
+        :type strategy: str
+        :return: the new session
+        :rtype: CatchSession
+        """
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO sessions (start_time, profile, strategy) VALUES (?, ?, ?)",
+                (time.time(), profile, strategy),
+            )
+            self.conn.execute(
+                "INSERT INTO profile_totals (profile, strategy, sessions) VALUES (?, ?, 1) "
+                "ON CONFLICT DO UPDATE SET sessions = sessions + 1",
+                (profile, strategy),
+            )
+        return CatchSession(cursor.lastrowid, profile, strategy)
+
+    def add_cast(self, session: CatchSession, rhour: int, ghour: int, outcome: str) -> None:
+        """Append a cast and update the aggregates.
+
+        :param session: session of the cast
+        :type session: CatchSession
+        :param rhour: real hour since the session started
+        :type rhour: int
+        :param ghour: in-game hour
+        :type ghour: int
+        :param outcome: kept, released, missed, or broken
+        :type outcome: str
+        """
+        catch = int(outcome in CATCH_OUTCOMES)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO casts (session_id, time, rhour, ghour, outcome) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session.id, time.time(), rhour, ghour, outcome),
+            )
+            for kind, hour in zip(HOUR_KINDS, (rhour, ghour)):
+                self.conn.execute(
+                    "INSERT INTO session_hourly (session_id, kind, hour, casts, catches) "
+                    "VALUES (?, ?, ?, 1, ?) ON CONFLICT DO UPDATE SET "
+                    "casts = casts + 1, catches = catches + excluded.catches",
+                    (session.id, kind, hour, catch),
+                )
+                self.conn.execute(
+                    "INSERT INTO profile_hourly (profile, strategy, kind, hour, casts, catches) "
+                    "VALUES (?, ?, ?, ?, 1, ?) ON CONFLICT DO UPDATE SET "
+                    "casts = casts + 1, catches = catches + excluded.catches",
+                    (session.profile, session.strategy, kind, hour, catch),
+                )
+            self.conn.execute(
+                "UPDATE profile_totals SET casts = casts + 1, catches = catches + ? "
+                "WHERE profile = ? AND strategy = ?",
+                (catch, session.profile, session.strategy),
+            )
+
+    def set_time_to_first_cast(self, session: CatchSession, seconds: float) -> None:
+        """Record the time between the launch and the first cast of the session.
+
+        :param session: session to update
+        :type session: CatchSession
+        :param seconds: time to first cast
+        :type seconds: float
+        """
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE sessions SET time_to_first_cast = ? WHERE id = ?",
+                (seconds, session.id),
+            )
+
+    def get_times_to_first_cast(self, limit: int) -> list[tuple[float, float]]:
+        """Get the time to first cast of the latest sessions.
+
+        :param limit: maximum number of sessions
+        :type limit: int
+        :return: start time - time to first cast pairs, latest first
+        :rtype: list[tuple[float, float]]
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT start_time, time_to_first_cast FROM sessions "
+                "WHERE time_to_first_cast IS NOT NULL ORDER BY id DESC LIMIT ?",
+                (limit,),
+            )
+            return rows.fetchall()
+
+    def get_session_catches(self, kind: str, session_id: int) -> dict[int, int]:
+        """Get catches per hour of a session.
+
+        :param kind: rhour or ghour
+        :type kind: str
+        :param session_id: session id
+        :type session_id: int
+        :return: hour - catch count mapping
+        :rtype: dict[int, int]
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT hour, catches FROM session_hourly WHERE session_id = ? AND kind = ?",
+                (session_id, kind),
+            )
+            return dict(rows.fetchall())
+
+    def get_profile_catches(self, kind: str, profile: str | None = None) -> dict[int, int]:
+        """Get catches per hour across all sessions, optionally of a single profile.
+
+        :param kind: rhour or ghour
+        :type kind: str
+        :param profile: profile name, defaults to all profiles
+        :type profile: str | None, optional
+        :return: hour - catch count mapping
+        :rtype: dict[int, int]
+        """
+        query = "SELECT hour, SUM(catches) FROM profile_hourly WHERE kind = ?"
+        params = [kind]
+        if profile is not None:
+            query += " AND profile = ?"
+            params.append(profile)
+        with self._lock:
+            rows = self.conn.execute(query + " GROUP BY hour", params)
+            return dict(rows.fetchall())
+
+    def get_profile_totals(self, session: CatchSession) -> tuple[int, int, int]:
+        """Get the number of sessions, casts and catches of the profile of a session.
+
+        :param session: session whose profile and strategy are queried
+        :type session: CatchSession
+        :return: sessions, casts, and catches across all sessions
+        :rtype: tuple[int, int, int]
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT sessions, casts, catches FROM profile_totals "
+                "WHERE profile = ? AND strategy = ?",
+                (session.profile, session.strategy),
+            ).fetchone()
+        return row or (0, 0, 0)
+
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,128 @@
+"""
+Render charts of catch records from the catch database.
+
+This script is launched in a separate process by Player.plot_and_save(),
+so matplotlib is never imported by the main script.
+
+Usage: chart.py [-s SESSION_ID] [-a] [-p PROFILE]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from matplotlib import pyplot as plt
+from matplotlib.ticker import MaxNLocator
+
+from catchdb import DEFAULT_PATH, CatchDatabase
+
+LOG_DIR = Path(__file__).resolve().parents[1] / "logs"
+
+
+def plot_session(db: CatchDatabase, session_id: int, output: Path) -> None:
+    """Plot catches per real hour and game hour of a single session.
+
+    :param db: catch database
+    :type db: CatchDatabase
+    :param session_id: session id
+    :type session_id: int
+    :param output: path of the output image
+    :type output: Path
+    """
+    catches_per_rhour = db.get_session_catches("rhour", session_id)
+    catches_per_ghour = db.get_session_catches("ghour", session_id)
+    if not catches_per_rhour:
+        print("No catch records found in this session")
+        return
+
+    _, ax = plt.subplots(nrows=1, ncols=2)
+    ax[0].set_ylabel("Fish")
+
+    last_rhour = max(catches_per_rhour)  # hour: 0, 1, 2, 3, 4, "5"
+    fish_per_rhour = [catches_per_rhour.get(hour, 0) for hour in range(last_rhour + 1)]
+    ax[0].plot(range(last_rhour + 1), fish_per_rhour)
+    ax[0].set_title("Fish Caughted per Real Hour")
+    ax[0].set_xticks(range(last_rhour + 2))
+    ax[0].set_xlabel("Hour (real running time)")
+    ax[0].yaxis.set_major_locator(MaxNLocator(integer=True))
+
+    _plot_game_hours(ax[1], catches_per_ghour, "Fish Caughted per Game Hour")
+    plt.savefig(output)
+    print(f"The Plot has been saved under {output.parent}")
+
+
+def plot_all_sessions(db: CatchDatabase, profile: str | None, output: Path) -> None:
+    """Plot catches per game hour across all sessions.
+
+    :param db: catch database
+    :type db: CatchDatabase
+    :param profile: profile name, None for all profiles
+    :type profile: str | None
+    :param output: path of the output image
+    :type output: Path
+    """
+    catches_per_ghour = db.get_profile_catches("ghour", profile)
+    if not catches_per_ghour:
+        print("No catch records found")
+        return
+
+    _, ax = plt.subplots(nrows=1, ncols=1)
+    ax.set_ylabel("Fish")
+    title = "Fish Caughted per Game Hour (all sessions)"
+    if profile is not None:
+        title += f"\n{profile}"
+    _plot_game_hours(ax, catches_per_ghour, title)
+    plt.savefig(output)
+    print(f"The Plot has been saved under {output.parent}")
+
+
+def _plot_game_hours(ax: plt.Axes, catches_per_ghour: dict[int, int], title: str) -> None:
+    """Draw a bar chart of catches per game hour.
+
+    :param ax: axes to draw on
+    :type ax: plt.Axes
+    :param catches_per_ghour: hour - catch count mapping
+    :type catches_per_ghour: dict[int, int]
+    :param title: title of the chart
+    :type title: str
+    """
+    fish_per_ghour = [catches_per_ghour.get(hour, 0) for hour in range(24)]
+    ax.bar(range(0, 24), fish_per_ghour)
+    ax.set_title(title)
+    ax.set_xticks(range(0, 24, 2))
+    ax.set_xlabel("Hour (game time)")
+    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+
+
+def parse_args() -> argparse.Namespace:
+    """Cofigure argparser and parse the command line arguments.
+
+    :return: parsed args
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Plot catch records.")
+    parser.add_argument("-s", "--session", type=int, help="Id of the session to plot")
+    parser.add_argument(
+        "-a", "--all", action="store_true", help="Plot catches of all sessions"
+    )
+    parser.add_argument(
+        "-p", "--profile", help="Only plot sessions of the given profile with -a"
+    )
+    parser.add_argument(
+        "-d", "--database", type=Path, default=DEFAULT_PATH, help="Database file"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    catch_db = CatchDatabase(args.database)
+    timestamp = time.strftime("%Y-%m-%d--%H-%M-%S", time.localtime())
+    LOG_DIR.mkdir(exist_ok=True)
+    if args.all:
+        plot_all_sessions(catch_db, args.profile, LOG_DIR / f"{timestamp}-all.png")
+    elif args.session is not None:
+        plot_session(catch_db, args.session, LOG_DIR / f"{timestamp}.png")
+    else:
+        print("Please specify a session id with -s or use -a")
+    catch_db.close()
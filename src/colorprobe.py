@@ -0,0 +1,108 @@
+"""
+Module for ColorProbe class, a cheap check before template matching.
+
+A template with a distinctive dominant color can't be on the screen unless
+enough pixels of that color are. Counting them takes a few milliseconds, so the
+full template matching only runs when the probe says "maybe".
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+QUANT_SHIFT = 5  # 8 levels per channel for the color histogram
+SATURATION_MIN = 48  # grayish pixels are too common to be distinctive
+COLOR_TOLERANCE = 24
+MIN_SIGNATURE_SHARE = 0.1
+# part of the dominant pixels that must be found, for blending and antialiasing
+PROBE_TOLERANCE = 0.5
+
+
+def get_signature(template: np.ndarray) -> tuple[np.ndarray, np.ndarray, int] | None:
+    """Get the dominant saturated color of a template.
+
+    :param template: template in BGR format
+    :type template: np.ndarray
+    :return: lower and upper bounds of the color in RGB format and the minimum
+        number of pixels to find, None if the template has no distinctive color
+    :rtype: tuple[np.ndarray, np.ndarray, int] | None
+    """
+    pixels = template.reshape(-1, 3)[:, ::-1].astype(np.int16)  # RGB
+    saturated = pixels[pixels.max(axis=1) - pixels.min(axis=1) >= SATURATION_MIN]
+    if len(saturated) < MIN_SIGNATURE_SHARE * len(pixels):
+        return None
+
+    bins = saturated >> QUANT_SHIFT
+    keys = (bins[:, 0] << 6) | (bins[:, 1] << 3) | bins[:, 2]
+    dominant = saturated[keys == np.bincount(keys).argmax()]
+    color = dominant.mean(axis=0)
+    lower = np.clip(color - COLOR_TOLERANCE, 0, 255).astype(np.uint8)
+    upper = np.clip(color + COLOR_TOLERANCE, 0, 255).astype(np.uint8)
+
+    rgb = np.ascontiguousarray(template[:, :, ::-1])
+    count = cv2.countNonZero(cv2.inRange(rgb, lower, upper))
+    if count < MIN_SIGNATURE_SHARE * len(pixels):
+        return None
+    return lower, upper, max(1, int(count * PROBE_TOLERANCE))
+
+
+class ColorProbe:
+    """Dominant color probe of a template and its statistics."""
+
+    def __init__(self, signature: tuple[np.ndarray, np.ndarray, int]):
+        """Initialize the counters.
+
+        :param signature: signature from get_signature()
+        :type signature: tuple[np.ndarray, np.ndarray, int]
+        """
+        self.lower, self.upper, self.min_pixels = signature
+        self._passed = True
+        self.check_count = 0
+        self.skip_count = 0
+        self.probe_time = 0  # of the checks that passed
+        self.passed_time = 0  # of the searches that ran template matching
+        self.skipped_time = 0  # of the searches stopped by the probe
+
+    def __call__(self, image) -> bool:
+        """Check if the template may be in the image.
+
+        :param image: image in RGB format
+        :type image: Image.Image
+        :return: False if the template is surely absent, True otherwise
+        :rtype: bool
+        """
+        start_time = time.perf_counter()
+        frame = np.asarray(image)[:, :, :3]
+        count = cv2.countNonZero(cv2.inRange(frame, self.lower, self.upper))
+        self._passed = count >= self.min_pixels
+        self.check_count += 1
+        if self._passed:
+            self.probe_time += time.perf_counter() - start_time
+        else:
+            self.skip_count += 1
+        return self._passed
+
+    def record(self, elapsed: float) -> None:
+        """Record the duration of the search that used the probe.
+
+        :param elapsed: duration of the search in seconds
+        :type elapsed: float
+        """
+        if self._passed:
+            self.passed_time += elapsed
+        else:
+            self.skipped_time += elapsed
+
+    def get_saved_time(self) -> float:
+        """Estimate the time saved compared to template matching only.
+
+        :return: saved time in seconds, negative if the probe costs more
+        :rtype: float
+        """
+        passed_count = self.check_count - self.skip_count
+        if not passed_count:
+            return 0
+        # a search without the probe costs as much as a passed one minus its probe
+        avg_search_time = (self.passed_time - self.probe_time) / passed_count
+        return self.check_count * avg_search_time - self.passed_time - self.skipped_time
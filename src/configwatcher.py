@@ -0,0 +1,59 @@
+"""
+Module for ConfigWatcher class, a background watcher of config.ini.
+
+The watcher only counts the changes, every fishing loop reloads the config
+itself at its next safe point, so the players of several windows can share it.
+"""
+
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 2
+
+
+class ConfigWatcher:
+    """Poll the modification time of a file in a daemon thread."""
+
+    def __init__(self, path: Path, interval: float = POLL_INTERVAL):
+        """Record the current state of the file and start polling.
+
+        :param path: path of the file
+        :type path: Path
+        :param interval: polling interval in seconds, defaults to POLL_INTERVAL
+        :type interval: float, optional
+        """
+        self.path = path
+        self.interval = interval
+        self._state = self._get_state()
+        self.version = 0  # incremented after each change
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _get_state(self) -> tuple[int, int] | None:
+        """Getter.
+
+        :return: modification time and size, None if the file is missing
+        :rtype: tuple[int, int] | None
+        """
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None  # editors may replace the file instead of writing to it
+        return stat.st_mtime_ns, stat.st_size
+
+    def _run(self) -> None:
+        """Count the change when the state of the file is updated."""
+        while not self._stopped.wait(self.interval):
+            state = self._get_state()
+            if state is not None and state != self._state:
+                self._state = state
+                logger.info("%s is modified, it will be reloaded", self.path.name)
+                self.version += 1
+
+    def close(self) -> None:
+        """Stop polling."""
+        self._stopped.set()
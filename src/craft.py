@@ -62,7 +62,11 @@ class App:
     def start(self) -> None:
         """Main crafting loop."""
         random.seed(datetime.now().timestamp())
-        pag.moveTo(self.monitor.get_make_position())
+        make_position = self.monitor.get_make_position()
+        if not make_position:
+            print("Make button not found, please open the crafting menu")
+            return
+        pag.moveTo(make_position.center)
         while True:
             pag.click()  # click make button
 
@@ -0,0 +1,163 @@
+"""
+Module for ScoreTracker class, a drift monitor of the matching scores.
+
+When a game patch slightly changes an icon, the scores of its positive matches
+slide down until the detector misses it. The scores of the first matches of a
+template are its baseline, a warning is raised when the recent scores keep only
+a small part of the baseline margin above the threshold.
+"""
+
+import logging
+from collections import deque
+
+from prettytable import PrettyTable
+
+logger = logging.getLogger(__name__)
+
+SCORE_WINDOW = 30
+BASELINE_SAMPLES = 10
+# warn when the recent margin drops below this part of the baseline margin,
+# and warn again only after it recovers
+WARNING_MARGIN_RATIO = 0.5
+RECOVERY_MARGIN_RATIO = 0.75
+MIN_BASELINE_MARGIN = 0.01  # scores too close to the threshold from the start
+
+
+class TemplateScores:
+    """Rolling statistics of the positive matching scores of a template."""
+
+    def __init__(self, threshold: float):
+        """Initialize the statistics.
+
+        :param threshold: matching confidence of the template
+        :type threshold: float
+        """
+        self.threshold = threshold
+        self.count = 0
+        self.baseline_scores = []
+        self.recent_scores = deque(maxlen=SCORE_WINDOW)
+        self.min_score = 1.0
+        self.warned = False
+
+    @property
+    def baseline(self) -> float | None:
+        """Getter.
+
+        :return: mean score of the first matches, None if there are too few
+        :rtype: float | None
+        """
+        if len(self.baseline_scores) < BASELINE_SAMPLES:
+            return None
+        return sum(self.baseline_scores) / len(self.baseline_scores)
+
+    @property
+    def recent(self) -> float:
+        """Getter.
+
+        :return: mean score of the recent matches
+        :rtype: float
+        """
+        return sum(self.recent_scores) / len(self.recent_scores)
+
+    def get_margin_ratio(self) -> float | None:
+        """Get the part of the baseline margin kept by the recent scores.
+
+        :return: recent margin / baseline margin, None if the baseline is unknown
+            or has no margin
+        :rtype: float | None
+        """
+        baseline = self.baseline
+        if baseline is None or baseline - self.threshold < MIN_BASELINE_MARGIN:
+            return None
+        if len(self.recent_scores) < SCORE_WINDOW // 2:
+            return None
+        return (self.recent - self.threshold) / (baseline - self.threshold)
+
+
+class ScoreTracker:
+    """Track the matching scores of all templates and detect drifts."""
+
+    def __init__(self):
+        """Initialize the statistics."""
+        self.templates = {}  # name - TemplateScores
+        self._warnings = []
+
+    def record(self, image: str, score: float, threshold: float) -> None:
+        """Record the score of a positive match.
+
+        :param image: base name of the template
+        :type image: str
+        :param score: matching score
+        :type score: float
+        :param threshold: matching confidence used
+        :type threshold: float
+        """
+        stats = self.templates.get(image)
+        if stats is None:
+            stats = self.templates[image] = TemplateScores(threshold)
+        stats.threshold = threshold
+        stats.count += 1
+        stats.min_score = min(stats.min_score, score)
+        stats.recent_scores.append(score)
+        if len(stats.baseline_scores) < BASELINE_SAMPLES:
+            stats.baseline_scores.append(score)
+            return
+
+        ratio = stats.get_margin_ratio()
+        if ratio is None:
+            return
+        if not stats.warned and ratio < WARNING_MARGIN_RATIO:
+            stats.warned = True
+            logger.warning(
+                "Scores of '%s' are drifting toward the threshold: %.3f -> %.3f (threshold %.2f)",
+                image,
+                stats.baseline,
+                stats.recent,
+                threshold,
+            )
+            self._warnings.append(image)
+        elif stats.warned and ratio >= RECOVERY_MARGIN_RATIO:
+            stats.warned = False
+
+    def pop_warnings(self) -> list[str]:
+        """Get and clear the templates that started drifting since the last call.
+
+        :return: names of the drifting templates
+        :rtype: list[str]
+        """
+        warnings, self._warnings = self._warnings, []
+        return warnings
+
+    def get_drifting_templates(self) -> list[str]:
+        """Getter.
+
+        :return: names of the templates currently drifting
+        :rtype: list[str]
+        """
+        return [name for name, stats in self.templates.items() if stats.warned]
+
+    def gen_table(self) -> PrettyTable:
+        """Generate a table of the score statistics.
+
+        :return: table of baseline, recent and minimum scores of every template
+        :rtype: PrettyTable
+        """
+        table = PrettyTable(
+            ["Template", "Matches", "Baseline", "Recent", "Min", "Threshold", "Drifting"],
+            align="l",
+        )
+        table.title = "Match Scores"
+        for name, stats in sorted(self.templates.items()):
+            baseline = stats.baseline
+            table.add_row(
+                [
+                    name,
+                    stats.count,
+                    "N/A" if baseline is None else f"{baseline:.3f}",
+                    f"{stats.recent:.3f}",
+                    f"{stats.min_score:.3f}",
+                    stats.threshold,
+                    "yes" if stats.warned else "",
+                ]
+            )
+        return table
@@ -0,0 +1,83 @@
+"""
+Module for EventLog class, a buffered JSONL writer for per-cast records.
+
+Records are handed to a background thread, so writing a cast record never
+blocks the fishing loop. Each line of the output file is one JSON object.
+"""
+
+import json
+import logging
+import queue
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5
+BATCH_SIZE = 64
+
+
+class EventLog:
+    """Buffered JSONL writer running on a background thread."""
+
+    def __init__(self, path: Path):
+        """Open the log file and start the writer thread.
+
+        :param path: path of the output .jsonl file
+        :type path: Path
+        """
+        self.path = Path(path)
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict) -> None:
+        """Enqueue a record, this never blocks the caller.
+
+        :param record: json-serializable record
+        :type record: dict
+        """
+        if not self._closed:
+            self._queue.put(record)
+
+    def close(self, timeout: float = FLUSH_INTERVAL) -> None:
+        """Flush pending records and stop the writer thread.
+
+        :param timeout: maximum time to wait for the writer, defaults to FLUSH_INTERVAL
+        :type timeout: float, optional
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)  # sentinel
+        self._thread.join(timeout)
+
+    def _write_loop(self) -> None:
+        """Drain the queue in batches and append them to the file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            while True:
+                try:
+                    record = self._queue.get(timeout=FLUSH_INTERVAL)
+                except queue.Empty:
+                    continue
+
+                batch = [record]
+                while len(batch) < BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stopped = None in batch
+                lines = [
+                    json.dumps(r, ensure_ascii=False) + "\n" for r in batch if r is not None
+                ]
+                try:
+                    file.writelines(lines)
+                    file.flush()
+                except OSError as e:
+                    logger.error("Failed to write event log: %s", e)
+                if stopped:
+                    return
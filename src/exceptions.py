@@ -17,3 +17,15 @@ class LineAtEndError(Exception):
 
 class FishGotAwayError(Exception):
     """A hooked fish got away during pulling stage."""
+
+
+class ProfileChangedError(Exception):
+    """The profile is changed by the schedule, the fishing loop should restart."""
+
+
+class ConfigError(Exception):
+    """A value in config.ini is missing or invalid."""
+
+
+class BundleError(Exception):
+    """A template bundle doesn't match its manifest."""
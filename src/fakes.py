@@ -0,0 +1,82 @@
+"""
+Fake window and capture backends for running Monitor and Player without the game.
+
+They can replace the real backends of a setting node:
+    setting.bind_window(FakeWindowController())
+    setting.capture = FakeCapture(["frame1.png", "frame2.png"])
+
+benchmark.py replay runs the detectors of Monitor over recorded frames this way.
+"""
+
+# pylint: disable=missing-function-docstring
+# same interfaces as the real backends
+
+import itertools
+from typing import Iterable
+
+from PIL import Image
+
+from capture import ScreenCapture
+
+
+class FakeWindowController:
+    """A game window that is always at the given position."""
+
+    def __init__(self, rect: tuple[int, int, int, int] = (0, 0, 1920, 1080)):
+        """Set the window rectangle.
+
+        :param rect: left, top, right, and bottom, defaults to (0, 0, 1920, 1080)
+        :type rect: tuple[int, int, int, int], optional
+        """
+        self.rect = rect
+        self.activation_count = 0
+
+    def get_game_rect(self) -> tuple[int, int, int, int]:
+        return self.rect
+
+    def get_client_size(self) -> tuple[int, int]:
+        left, top, right, bottom = self.rect
+        return right - left, bottom - top
+
+    def get_capture_region(self) -> tuple[int, int, int, int]:
+        left, top, right, bottom = self.rect
+        return left, top, right - left, bottom - top
+
+    def activate_script_window(self) -> None:
+        pass
+
+    def activate_game_window(self) -> None:
+        self.activation_count += 1
+
+
+class FakeCapture(ScreenCapture):
+    """Serve prepared frames instead of capturing the screen."""
+
+    def __init__(self, frames: Iterable[Image.Image | str], max_frame_age: float = 0):
+        """Load the frames, they are served in a loop.
+
+        :param frames: images or paths of the images
+        :type frames: Iterable[Image.Image | str]
+        :param max_frame_age: seconds to reuse a frame, 0 to serve the next frame
+            for every search, defaults to 0
+        :type max_frame_age: float, optional
+        """
+        super().__init__(max_frame_age)
+        images = [
+            frame if isinstance(frame, Image.Image) else Image.open(frame).convert("RGB")
+            for frame in frames
+        ]
+        self._frames = itertools.cycle(images)
+        self._current = images[0]
+
+    def _capture(self, region: tuple[int, int, int, int] | None = None) -> Image.Image:
+        self.capture_count += 1
+        self._current = next(self._frames)
+        if region is None:
+            return self._current
+        x, y, width, height = region
+        return self._current.crop((x, y, x + width, y + height))
+
+    def pixel(self, x: int, y: int) -> tuple[int, int, int]:
+        frame = self.grab() if self.max_frame_age else self._current
+        return frame.getpixel((x, y))[:3]
@@ -0,0 +1,113 @@
+"""
+Module for FishCardAnalyzer class, a classifier of the captured fish card.
+
+The card region is captured once, then every mark and species template is
+matched against that small image instead of searching the whole screen for each
+of them. To recognize a new species, put its image in the language directory,
+e.g., static/en/perch.png, and add its name to SPECIES or to the unmarked
+release whitelist.
+"""
+
+import logging
+from typing import Callable, Iterable, NamedTuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SPECIES = ("mackerel", "saithe", "herring", "squid", "scallop", "mussel")
+
+
+class FishCard(NamedTuple):
+    """Result of a fish card analysis, species is None if it's not recognized."""
+
+    marked: bool
+    species: str | None
+    scores: dict[str, float]
+
+
+class FishCardAnalyzer:
+    """Match the mark and species templates against an image of the fish card."""
+
+    def __init__(
+        self,
+        get_template: Callable[[str], np.ndarray | None],
+        get_confidence: Callable[[str], float],
+    ):
+        """Initialize the template cache.
+
+        :param get_template: function that returns a template in BGR format by its
+            name, None if it's unavailable
+        :type get_template: Callable[[str], np.ndarray | None]
+        :param get_confidence: function that returns the matching confidence of a
+            template by its name
+        :type get_confidence: Callable[[str], float]
+        """
+        self._get_template = get_template
+        self._get_confidence = get_confidence
+        self._templates = {}
+
+    def _load(self, name: str) -> np.ndarray | None:
+        """Get a template, the missing ones are only reported once.
+
+        :param name: base name of the image
+        :type name: str
+        :return: template in BGR format, None if it's unavailable
+        :rtype: np.ndarray | None
+        """
+        if name not in self._templates:
+            self._templates[name] = self._get_template(name)
+            if self._templates[name] is None:
+                logger.debug("Template '%s' is unavailable, skipped", name)
+        return self._templates[name]
+
+    def get_scores(self, frame: np.ndarray, names: Iterable[str]) -> dict[str, float]:
+        """Get the best matching score of every template in a frame.
+
+        :param frame: image in BGR format
+        :type frame: np.ndarray
+        :param names: base names of the templates
+        :type names: Iterable[str]
+        :return: scores of the available templates
+        :rtype: dict[str, float]
+        """
+        height, width = frame.shape[:2]
+        scores = {}
+        for name in names:
+            template = self._load(name)
+            if template is None:
+                continue
+            if template.shape[0] > height or template.shape[1] > width:
+                scores[name] = 0.0
+                continue
+            result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+            scores[name] = float(result.max())
+        return scores
+
+    def analyze(self, image, species: Iterable[str] = SPECIES) -> FishCard:
+        """Classify the fish card.
+
+        :param image: image of the fish card region
+        :type image: Image.Image
+        :param species: species to recognize, defaults to SPECIES
+        :type species: Iterable[str], optional
+        :return: mark, the best matched species, and the scores
+        :rtype: FishCard
+        """
+        frame = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+        species = tuple(dict.fromkeys(species))  # keep the order, drop duplicates
+        scores = self.get_scores(frame, ("mark", *species))
+
+        species_scores = {name: scores[name] for name in species if name in scores}
+        best = max(species_scores, key=species_scores.get, default=None)
+        if best is not None and species_scores[best] < self._get_confidence(best):
+            best = None
+
+        card = FishCard(
+            marked=scores.get("mark", 0) >= self._get_confidence("mark"),
+            species=best,
+            scores=scores,
+        )
+        logger.debug("Fish card: %s", card)
+        return card
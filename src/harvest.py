@@ -66,7 +66,7 @@ class App:
 
     def start(self) -> None:
         """Main harvesting loop."""
-        pag.press(self.setting.shovel_spoon_shortcut)
+        pag.press(self.setting.general.shovel_spoon_shortcut)
         time.sleep(3)
         while True:
             if self.monitor.is_comfort_low() and self.timer.is_tea_drinkable():
@@ -110,7 +110,11 @@ class App:
         """
         with pag.hold("t"):
             time.sleep(0.25)
-            pag.moveTo(self.monitor.get_food_position(food))
+            food_position = self.monitor.get_food_position(food)
+            if not food_position:
+                print(f"{food.capitalize()} not found in quick selection menu")
+                return
+            pag.moveTo(food_position.center)
             pag.click()
             time.sleep(0.25)
 
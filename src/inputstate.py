@@ -0,0 +1,72 @@
+"""
+Module for ClickLock class, a tracker of the left mouse button lock.
+
+Reeling stages hold the left mouse button for ENGAGE_DURATION to trigger
+clicklock, then click to release it when they end. Consecutive stages, like a
+retrieval followed by pulling, paid the whole cost again. The tracker keeps the
+button locked between them, the player releases it when the reeling ends or
+before another input, e.g., using an item. When the state is unknown, e.g., at
+startup or after the user touched the mouse, the logical state of the button is
+queried from the system.
+"""
+
+import logging
+from time import sleep
+
+import pyautogui as pag
+import win32api
+import win32con
+
+logger = logging.getLogger(__name__)
+
+ENGAGE_DURATION = 3  # >= 2.2 to trigger clicklock
+
+
+def is_left_button_down() -> bool:
+    """Check the logical state of the left mouse button.
+
+    :return: True if the button is held or locked, False otherwise
+    :rtype: bool
+    """
+    return win32api.GetAsyncKeyState(win32con.VK_LBUTTON) & 0x8000 != 0
+
+
+class ClickLock:
+    """Track whether clicklock is engaged and reuse it across stages."""
+
+    def __init__(self):
+        """Initialize the state, it's unknown until the first engagement."""
+        self.engaged = None  # None if unknown
+        self.engage_count = 0
+        self.reuse_count = 0
+
+    def engage(self) -> None:
+        """Engage clicklock, skip the hold if it's still engaged."""
+        # the user or the game may have released it since the last stage
+        if self.engaged is not False and is_left_button_down():
+            self.engaged = True
+            self.reuse_count += 1
+            logger.debug("Clicklock reused")
+            return
+        pag.mouseDown()
+        sleep(ENGAGE_DURATION)
+        self.engaged = True
+        self.engage_count += 1
+
+    def release(self) -> None:
+        """Release clicklock if it's or might be engaged."""
+        if self.engaged is False:
+            return
+        if self.engaged is None and not is_left_button_down():
+            self.engaged = False
+            return
+        pag.click()
+        self.engaged = False
+
+    def get_saved_time(self) -> float:
+        """Getter.
+
+        :return: hold time saved by reusing the engaged clicklock
+        :rtype: float
+        """
+        return self.reuse_count * ENGAGE_DURATION
@@ -0,0 +1,106 @@
+"""
+Module for InventoryScanner class, used for broken lure replacement.
+
+The tackle panel and the selection menu are captured once per scroll position,
+then every instance of a template is found in that image. Broken favorites are
+told apart by the color of their wear bar, probed for all of them at once.
+"""
+
+import logging
+from typing import Callable
+
+import cv2
+import numpy as np
+
+import matching
+
+logger = logging.getLogger(__name__)
+
+# color of the wear bar of a broken item, and its offset from the favorite icon
+BROKEN_COLOR = (178, 59, 30)
+WEAR_BAR_OFFSET = (-75, 190)
+
+
+class InventoryScanner:
+    """Find broken items and usable favorites in a captured image."""
+
+    def __init__(
+        self,
+        get_template: Callable[[str], np.ndarray | None],
+        get_confidence: Callable[[str], float],
+        scale: float,
+    ):
+        """Initialize the template loader.
+
+        :param get_template: function that returns a template in BGR format by its
+            name, None if it's unavailable
+        :type get_template: Callable[[str], np.ndarray | None]
+        :param get_confidence: function that returns the matching confidence of a
+            template by its name
+        :type get_confidence: Callable[[str], float]
+        :param scale: ui scale of the game
+        :type scale: float
+        """
+        self._get_template = get_template
+        self._get_confidence = get_confidence
+        self.wear_bar_offset = np.array([int(offset * scale) for offset in WEAR_BAR_OFFSET])
+
+    def _locate_all(self, frame: np.ndarray, image: str) -> np.ndarray:
+        """Find the centers of all instances of a template, from top to bottom.
+
+        :param frame: image in BGR format
+        :type frame: np.ndarray
+        :param image: base name of the template
+        :type image: str
+        :return: centers in an array of shape (n, 2)
+        :rtype: np.ndarray
+        """
+        template = self._get_template(image)
+        if template is None:
+            logger.warning("Template '%s' is unavailable", image)
+            return np.empty((0, 2), dtype=int)
+        confidence = self._get_confidence(image)
+        boxes, _ = matching.find_all(frame, template, confidence, order="position")
+        return boxes[:, :2] + boxes[:, 2:] // 2
+
+    def find_broken_items(self, image, offset: tuple[int, int]) -> list[tuple[int, int]]:
+        """Find all items with 100% wear in the tackle panel.
+
+        :param image: image of the game window
+        :type image: Image.Image
+        :param offset: top-left corner of the image on the screen
+        :type offset: tuple[int, int]
+        :return: centers of the wear texts on the screen, from top to bottom
+        :rtype: list[tuple[int, int]]
+        """
+        frame = cv2.cvtColor(np.asarray(image)[:, :, :3], cv2.COLOR_RGB2BGR)
+        centers = self._locate_all(frame, "100wear") + offset
+        return [(int(x), int(y)) for x, y in centers]
+
+    def find_usable_favorites(
+        self, image, offset: tuple[int, int]
+    ) -> tuple[list[tuple[int, int]], int]:
+        """Find favorite items in the selection menu and skip the broken ones.
+
+        :param image: image of the game window
+        :type image: Image.Image
+        :param offset: top-left corner of the image on the screen
+        :type offset: tuple[int, int]
+        :return: positions to click for the usable favorites, and the number of
+            broken ones
+        :rtype: tuple[list[tuple[int, int]], int]
+        """
+        rgb = np.asarray(image)[:, :, :3]
+        frame = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+        centers = self._locate_all(frame, "favorite")
+
+        probes = centers + self.wear_bar_offset
+        height, width = rgb.shape[:2]
+        inside = (
+            (probes[:, 0] >= 0) & (probes[:, 0] < width)
+            & (probes[:, 1] >= 0) & (probes[:, 1] < height)
+        )
+        probes = probes[inside]
+        broken = np.all(rgb[probes[:, 1], probes[:, 0]] == BROKEN_COLOR, axis=1)
+        usable = probes[~broken] + offset
+        return [(int(x), int(y)) for x, y in usable], int(broken.sum())
@@ -0,0 +1,82 @@
+"""
+Find all instances of a template in an image.
+
+Unlike pyscreeze.locateAll, the response map is computed once, only its local
+maxima are kept, and overlapping matches are suppressed, so every instance is
+reported exactly once.
+"""
+
+import cv2
+import numpy as np
+
+# matches overlapping a better one by more than this are duplicates
+NMS_THRESHOLD = 0.3
+
+
+def find_all(
+    frame: np.ndarray, template: np.ndarray, confidence: float, order: str = "score"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find all non-overlapping instances of a template.
+
+    :param frame: image in BGR format
+    :type frame: np.ndarray
+    :param template: template in BGR format
+    :type template: np.ndarray
+    :param confidence: matching confidence
+    :type confidence: float
+    :param order: "score" for the best match first, "position" for top to bottom
+        then left to right, defaults to "score"
+    :type order: str, optional
+    :return: boxes (left, top, width, height) in an int array of shape (n, 4),
+        and their scores
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    height, width = template.shape[:2]
+    if height > frame.shape[0] or width > frame.shape[1]:
+        return np.empty((0, 4), dtype=int), np.empty(0, dtype=np.float32)
+
+    scores = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+    # neighbours of a match also pass the threshold, keep the local maxima only
+    peaks = (scores >= confidence) & (scores == cv2.dilate(scores, np.ones((3, 3))))
+    ys, xs = np.nonzero(peaks)
+    peak_scores = scores[ys, xs]
+    ranking = np.argsort(-peak_scores, kind="stable")
+    xs, ys, peak_scores = xs[ranking], ys[ranking], peak_scores[ranking]
+
+    keep = _suppress(xs, ys, width, height)
+    boxes = np.column_stack(
+        (xs[keep], ys[keep], np.full(len(keep), width), np.full(len(keep), height))
+    ).astype(int)
+    peak_scores = peak_scores[keep]
+    if order == "position":
+        ranking = np.lexsort((boxes[:, 0], boxes[:, 1]))
+        boxes, peak_scores = boxes[ranking], peak_scores[ranking]
+    return boxes, peak_scores
+
+
+def _suppress(xs: np.ndarray, ys: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Greedy non-maximum suppression of boxes of the same size.
+
+    :param xs: left of the boxes, sorted by score in descending order
+    :type xs: np.ndarray
+    :param ys: top of the boxes
+    :type ys: np.ndarray
+    :param width: width of the boxes
+    :type width: int
+    :param height: height of the boxes
+    :type height: int
+    :return: indices of the kept boxes
+    :rtype: np.ndarray
+    """
+    area = width * height
+    suppressed = np.zeros(len(xs), dtype=bool)
+    keep = []
+    for i in range(len(xs)):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        overlap = np.clip(width - np.abs(xs - xs[i]), 0, None) * np.clip(
+            height - np.abs(ys - ys[i]), 0, None
+        )
+        suppressed |= overlap / (2 * area - overlap) > NMS_THRESHOLD
+    return np.array(keep, dtype=int)
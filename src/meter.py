@@ -0,0 +1,157 @@
+"""
+Module for RainbowMeter class, a reader of the rainbow line distance.
+
+The distance on the rainbow line meter is read with digit templates in
+static/digits/0.png ~ 9.png. They are not shipped because the font is rendered
+differently on every resolution, crop them from a screenshot of your game to
+enable the reader. Without them, retrieval detection falls back to searching
+the 0m and 5m templates.
+
+The meter has a fixed position on the HUD, so it's located once with the 0m or
+5m template, and only that small region is read afterwards.
+"""
+
+import logging
+import time
+from collections import deque
+from pathlib import Path
+
+import cv2
+import numpy as np
+from pyscreeze import Box
+
+import templates
+
+logger = logging.getLogger(__name__)
+
+DIGIT_DIR = Path(__file__).resolve().parents[1] / "static" / "digits"
+DIGIT_CONFIDENCE = 0.85
+# the meter is right-aligned, room for 4 digits on the left of the matched "0m"
+METER_LEFT_MARGIN = 3
+METER_MARGIN = 4  # pixels around the meter
+FINISH_DISTANCE = 5
+SPEED_SAMPLES = 5
+MIN_SPEED = 0.1  # m/s, slower readings are considered stopped
+
+
+class RainbowMeter:
+    """Read the rainbow line distance and estimate the retrieval speed."""
+
+    def __init__(self, scale: float):
+        """Load the digit templates resized to the ui scale.
+
+        :param scale: ui scale of the game
+        :type scale: float
+        """
+        self.digits = {}
+        for digit in range(10):
+            template = templates.read_template(DIGIT_DIR / f"{digit}.png", scale)
+            if template is None:
+                self.digits = {}
+                break
+            self.digits[digit] = template
+        self.region = None
+        self.samples = deque(maxlen=SPEED_SAMPLES)
+
+    @property
+    def enabled(self) -> bool:
+        """Getter.
+
+        :return: True if all digit templates are available, False otherwise
+        :rtype: bool
+        """
+        return bool(self.digits)
+
+    def is_ready(self) -> bool:
+        """Check if the meter can be read.
+
+        :return: True if digit templates are loaded and the meter is located
+        :rtype: bool
+        """
+        return self.enabled and self.region is not None
+
+    def calibrate(self, box: Box) -> None:
+        """Locate the meter from a match of the 0m or 5m template.
+
+        :param box: box of the matched template
+        :type box: Box
+        """
+        if not self.enabled or self.region is not None:
+            return
+        # the template consists of a digit and "m", the digit takes about half of it
+        digit_width = box.width // 2
+        left = box.left - METER_LEFT_MARGIN * digit_width - METER_MARGIN
+        self.region = (
+            max(0, left),
+            max(0, box.top - METER_MARGIN),
+            box.left + box.width + METER_MARGIN - max(0, left),
+            box.height + 2 * METER_MARGIN,
+        )
+        logger.info("Rainbow line meter located at %s", self.region)
+
+    def read(self, image) -> int | None:
+        """Read the distance from an image of the meter region.
+
+        :param image: image of the meter region
+        :type image: Image.Image
+        :return: distance in meters, None if no digit is found
+        :rtype: int | None
+        """
+        frame = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+        matches = []  # x, score, digit
+        for digit, template in self.digits.items():
+            if template.shape[0] > frame.shape[0] or template.shape[1] > frame.shape[1]:
+                continue
+            scores = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+            for x in np.flatnonzero((scores >= DIGIT_CONFIDENCE).any(axis=0)):
+                matches.append((int(x), float(scores[:, x].max()), digit))
+        if not matches:
+            return None
+
+        # keep the best digit at each position, positions are a digit width apart
+        min_gap = min(template.shape[1] for template in self.digits.values()) // 2
+        digits = []
+        for x, score, digit in sorted(matches, key=lambda match: -match[1]):
+            if all(abs(x - kept_x) > min_gap for kept_x, _ in digits):
+                digits.append((x, digit))
+        digits.sort()
+        return int("".join(str(digit) for _, digit in digits))
+
+    def add_sample(self, distance: int) -> None:
+        """Record a reading for speed estimation.
+
+        :param distance: distance in meters
+        :type distance: int
+        """
+        self.samples.append((time.perf_counter(), distance))
+
+    def reset(self) -> None:
+        """Forget the readings of the previous retrieval."""
+        self.samples.clear()
+
+    def get_speed(self) -> float | None:
+        """Estimate the retrieval speed with a least squares fit of the readings.
+
+        :return: retrieval speed in m/s, None if there aren't enough readings
+        :rtype: float | None
+        """
+        if len(self.samples) < 2:
+            return None
+        times, distances = np.array(self.samples, dtype=float).T
+        if times[-1] == times[0]:
+            return None
+        slope = np.polyfit(times - times[0], distances, 1)[0]
+        return -slope
+
+    def predict_time_left(self) -> float | None:
+        """Predict the time left before the retrieval is finished.
+
+        :return: seconds left, None if the speed is unknown or the line is not
+            being retrieved
+        :rtype: float | None
+        """
+        speed = self.get_speed()
+        if speed is None or speed < MIN_SPEED:
+            return None
+        _, distance = self.samples[-1]
+        return max(0, (distance - FINISH_DISTANCE) / speed)
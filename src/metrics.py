@@ -0,0 +1,85 @@
+"""
+Module for MetricsServer class, a local Prometheus-style metrics endpoint.
+
+The fishing loop publishes a pre-rendered snapshot at its safe points, and the
+server thread only returns the latest snapshot, so scraping never touches the
+counters in the loop.
+"""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """HTTP server on localhost that serves the latest metrics snapshot."""
+
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        """Bind the server and start serving in a daemon thread.
+
+        :param port: port to listen on
+        :type port: int
+        :param host: address to bind, defaults to "127.0.0.1"
+        :type host: str, optional
+        """
+        self.snapshot = b""
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        """Create a request handler bound to this server.
+
+        :return: request handler class
+        :rtype: type[BaseHTTPRequestHandler]
+        """
+        metrics_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Serve the snapshot on /metrics."""
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics_server.snapshot  # a single reference read, no lock
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass  # keep the console clean
+
+        return Handler
+
+    def publish(self, metrics: tuple[tuple]) -> None:
+        """Render metrics in Prometheus text format and replace the snapshot.
+
+        :param metrics: name - type - help - samples, where samples is a tuple of
+            (labels, value) and labels is a dict or None
+        :type metrics: tuple[tuple]
+        """
+        lines = []
+        for name, metric_type, help_msg, samples in metrics:
+            lines.append(f"# HELP {name} {help_msg}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                if labels:
+                    label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{label_str}}} {value}")
+                else:
+                    lines.append(f"{name} {value}")
+        self.snapshot = ("\n".join(lines) + "\n").encode()
+
+    def close(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
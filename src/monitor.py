@@ -10,15 +10,72 @@ Todo:
 # docstring for every functions? u serious?
 
 import logging
-import sys
+import time
+from typing import Any, Callable
 
-import pyautogui as pag
+import numpy as np
 from pyscreeze import Box
 
+import templates
+from calibrate import load_calibration
+from capture import MatchResult
+from colorprobe import ColorProbe, get_signature
+from drift import ScoreTracker
+from fishcard import SPECIES, FishCard, FishCardAnalyzer
+from inventory import InventoryScanner
+from meter import FINISH_DISTANCE, RainbowMeter
+from screenstate import ScreenClassifier
 from setting import Setting
+from settle import SETTLE_INTERVAL, wait_until_settled
 
 logger = logging.getLogger(__name__)
 
+# the float camera is centered horizontally, in pixels at native scale
+FLOAT_CAMERA_SIZE = 164
+FLOAT_CAMERA_BOTTOM_MARGIN = 248
+# matching confidences of the templates, overridden by calibration.json
+DEFAULT_CONFIDENCE = 0.9
+CONFIDENCES = {
+    "get": 0.9,
+    "keep": 0.9,
+    "mark": 0.7,
+    "ready": 0.6,
+    "broke": 0.6,
+    "lure_is_broken": 0.7,
+    "movement": 0.7,
+    "disconnected": 0.9,
+    "spooling": 0.98,
+    "ticket": 0.9,
+    "warning": 0.8,
+    "ok": 0.8,
+    "quit": 0.8,
+    "yes": 0.8,
+    "make": 0.9,
+    "exit": 0.8,
+    "confirm_exit": 0.8,
+    "harvest_confirm": 0.8,
+    "energy": 0.8,
+    "food": 0.8,
+    "comfort": 0.8,
+    "carrot": 0.8,
+    "tea": 0.8,
+    "coffee": 0.8,
+    "ticket_1": 0.95,
+    "ticket_2": 0.95,
+    "ticket_3": 0.95,
+    "ticket_5": 0.95,
+    "scrollbar": 0.97,
+    "100wear": 0.98,
+    "favorite": 0.95,
+}
+
+# detectors with a distinctive color, a color probe runs before template matching
+COLOR_PROBED = ("get", "keep", "ready", "broke", "warning", "ok")
+# the fish card is centered in the window, its size at native scale including the
+# mark and the species name, scaled by ui_scale and clamped to the window size
+FISH_CARD_WIDTH = 1040
+FISH_CARD_HEIGHT = 720
+
 
 class Monitor:
     """A class that holds different aliases of locateOnScreen(image)."""
@@ -33,172 +90,392 @@ class Monitor:
         """
         self.setting = setting
 
-    def _locate_single_image_box(self, image: str, confidence: float) -> Box | None:
+        # decoded templates resized to the ui scale once,
+        # fall back to png files if the bundle is unavailable
+        self.scale = setting.general.ui_scale
+        bundle = templates.load_bundle(setting.general.language)
+        self.templates = {} if bundle is None else bundle.get_scaled_templates(self.scale)
+
+        # offset of the float camera from the window's top-left corner, and its size
+        width, height = map(int, setting.window_size.split("x"))
+        self.float_camera_size = round(FLOAT_CAMERA_SIZE * self.scale)
+        self.float_camera_offset = (
+            width // 2 - self.float_camera_size // 2,
+            height - round(FLOAT_CAMERA_BOTTOM_MARGIN * self.scale),
+        )
+        card_width = min(width, round(FISH_CARD_WIDTH * self.scale))
+        card_height = min(height, round(FISH_CARD_HEIGHT * self.scale))
+        self.fish_card_region = (
+            (width - card_width) // 2,
+            (height - card_height) // 2,
+            card_width,
+            card_height,
+        )
+
+        calibration = load_calibration(setting.general.language)
+        if calibration:
+            logger.info("Calibrated confidences of %d templates loaded", len(calibration))
+        self.confidences = CONFIDENCES | calibration
+
+        self.fish_card_analyzer = FishCardAnalyzer(
+            self._get_template_array, self.get_confidence
+        )
+        self.inventory_scanner = InventoryScanner(
+            self._get_template_array, self.get_confidence, self.scale
+        )
+
+        # reads the rainbow line distance once it's located by the 0m or 5m template
+        self.rainbow_meter = RainbowMeter(self.scale)
+
+        self.screen_classifier = ScreenClassifier.load()
+        if self.screen_classifier is not None:
+            logger.info("Screen state classifier loaded")
+
+        self.color_probes = {}  # name - color probe, None if unavailable
+        self.score_tracker = ScoreTracker()
+
+        # accumulated cost of screen searches
+        self.detect_count = 0
+        self.detect_time = 0
+
+        # time cut from the animation delays by wait_until_settled()
+        self.settle_count = 0
+        self.settle_saved_time = 0
+
+    def _locate_single_image_box(
+        self, image: str, confidence: float | None = None
+    ) -> MatchResult:
         """A wrapper for locateOnScreen method and path resolving.
 
         :param image: base name of the image
         :type image: str
-        :param confidence: matching confidence for locateOnScreen
-        :type confidence: float
-        :return: image box, None if not found
-        :rtype: Box
+        :param confidence: matching confidence for locateOnScreen, defaults to the
+            one of the template
+        :type confidence: float | None, optional
+        :return: search result, falsy if not found
+        :rtype: MatchResult
         """
-        return pag.locateOnScreen(
-            f"{self.setting.image_dir}/{image}.png", confidence=confidence
+        if confidence is None:
+            confidence = self.get_confidence(image)
+        probe = self._get_color_probe(image)
+        result = self.setting.capture.match(
+            self._get_template(image), confidence, self._get_search_region(), probe
         )
+        if probe is not None:
+            probe.record(result.elapsed)
+        if result:
+            self.score_tracker.record(image, result.score, confidence)
+        self.detect_count += 1
+        self.detect_time += result.elapsed
+        return result
 
-    def _locate_multiple_image_boxes(self, image: str, confidence: float) -> Box | None:
-        """A wrapper for locateAllOnScreen method and path resolving.
+    def get_confidence(self, image: str) -> float:
+        """Getter.
 
-        This method is used for eliminating branching in ._locate_single_image_box(),
-        which accelerates those frequently called upstreasm methods.
-        It should only be invoked by get_favorite_items().
+        :param image: base name of the image
+        :type image: str
+        :return: calibrated matching confidence of the template
+        :rtype: float
+        """
+        return self.confidences.get(image, DEFAULT_CONFIDENCE)
+
+    def _get_color_probe(self, image: str) -> ColorProbe | None:
+        """Get the color probe of a detector, create it at the first use.
 
         :param image: base name of the image
         :type image: str
-        :param confidence: matching confidence for locateOnScreen
-        :type confidence: float
-        :return: image box, None if not found
-        :rtype: Box
+        :return: color probe, None if the detector doesn't use one
+        :rtype: ColorProbe | None
+        """
+        if image not in COLOR_PROBED:
+            return None
+        if image not in self.color_probes:
+            template = self._get_template_array(image)
+            signature = None if template is None else get_signature(template)
+            self.color_probes[image] = None if signature is None else ColorProbe(signature)
+        return self.color_probes[image]
+
+    def get_probe_stats(self) -> tuple[int, float]:
+        """Getter.
+
+        :return: number of template matchings skipped by color probes, and the
+            estimated time saved in seconds
+        :rtype: tuple[int, float]
         """
-        return pag.locateAllOnScreen(
-            f"{self.setting.image_dir}/{image}.png", confidence=confidence
+        probes = [probe for probe in self.color_probes.values() if probe is not None]
+        return (
+            sum(probe.skip_count for probe in probes),
+            sum(probe.get_saved_time() for probe in probes),
         )
 
+    def _get_search_region(self) -> tuple[int, int, int, int] | None:
+        """Get the region to search in.
+
+        :return: region of the game window if several windows are driven,
+            None for the whole screen
+        :rtype: tuple[int, int, int, int] | None
+        """
+        if self.setting.arbiter is None:
+            return None
+        return self.setting.window_controller.get_capture_region()
+
+    def _get_template(self, image: str):
+        """Get the decoded template, or the path of the png file at native scale.
+
+        :param image: base name of the image
+        :type image: str
+        :return: template in BGR format or path of the image
+        :rtype: np.ndarray | str
+        """
+        template = self.templates.get(image)
+        if template is not None:
+            return template
+        path = f"{self.setting.image_dir}/{image}.png"
+        if self.scale == templates.NATIVE_SCALE:
+            return path
+        template = templates.read_template(path, self.scale)
+        if template is None:
+            return path  # let locateOnScreen raise the error
+        self.templates[image] = template
+        return template
+
+    def _get_template_array(self, image: str):
+        """Get the decoded template, decode the png file if necessary.
+
+        :param image: base name of the image
+        :type image: str
+        :return: template in BGR format, None if it's unavailable
+        :rtype: np.ndarray | None
+        """
+        template = self._get_template(image)
+        if not isinstance(template, str):
+            return template
+        template = templates.read_template(template, self.scale)
+        if template is not None:
+            self.templates[image] = template
+        return template
+
     # ---------------------------------------------------------------------------- #
     #                           icon and text recognition                          #
     # ---------------------------------------------------------------------------- #
 
-    # ------------------------ unmarked release whitelist ------------------------ #
-    def is_fish_species_matched(self, species: str) -> Box | None:
-        """Check if the captured fish match the given species.
+    # --------------------------------- fish card -------------------------------- #
+    def analyze_fish_card(self, species: tuple[str, ...] = ()) -> FishCard:
+        """Capture the fish card once and classify its mark and species.
 
-        :param species: mackerel, saithe, herring, squid, scallop, or mussel
-        :type species: str
-        :return: image box, None if not found
-        :rtype: Box
+        :param species: species to recognize besides the known ones, defaults to ()
+        :type species: tuple[str, ...], optional
+        :return: mark, species, and matching scores
+        :rtype: FishCard
         """
-        return self._locate_single_image_box(species, 0.9)
-
-    # ----------------------------- unmarked release ----------------------------- #
-    def is_fish_marked(self):
-        return self._locate_single_image_box("mark", 0.7)
-
-    def is_fish_yellow_marked(self):
-        return self._locate_single_image_box("trophy", 0.7)
+        start_time = time.perf_counter()
+        image = self.setting.capture.grab_region(self.get_fish_card_region())
+        card = self.fish_card_analyzer.analyze(image, SPECIES + species)
+        self.detect_count += 1
+        self.detect_time += time.perf_counter() - start_time
+        return card
 
     # -------------------------------- fish status ------------------------------- #
     def is_fish_hooked(self):
-        return self._locate_single_image_box("get", 0.9)
+        return self._locate_single_image_box("get")
 
     def is_fish_captured(self):
-        return self._locate_single_image_box("keep", 0.9)
+        return self._locate_single_image_box("keep")
 
     # ---------------------------- retrieval detection --------------------------- #
-    def _is_rainbow_line_0or5m(self):
-        return self._locate_single_image_box(
-            "5m", self.setting.retrieval_detect_confidence
+    def _is_rainbow_line_0or5m(self) -> MatchResult:
+        if self.rainbow_meter.is_ready():
+            result = self.read_rainbow_meter()
+            if result is not None:
+                return result
+
+        result = self._locate_single_image_box(
+            "5m", self.setting.general.retrieval_detect_confidence
         ) or self._locate_single_image_box(
-            "0m", self.setting.retrieval_detect_confidence
+            "0m", self.setting.general.retrieval_detect_confidence
         )
+        if result:
+            self.rainbow_meter.calibrate(result.box)
+        return result
+
+    def read_rainbow_meter(self) -> MatchResult | None:
+        """Read the rainbow line distance from the located meter.
+
+        :return: result boxed at the meter if the line is within FINISH_DISTANCE,
+            scored by FINISH_DISTANCE / distance up to 1, None if it can't be read
+        :rtype: MatchResult | None
+        """
+        start_time = time.perf_counter()
+        region = self.rainbow_meter.region
+        image, frame_id = self.setting.capture.grab_region_with_id(region)
+        distance = self.rainbow_meter.read(image)
+        elapsed = time.perf_counter() - start_time
+        self.detect_count += 1
+        self.detect_time += elapsed
+        if distance is None:
+            return None
+
+        self.rainbow_meter.add_sample(distance)
+        box = Box(*region) if distance <= FINISH_DISTANCE else None
+        score = FINISH_DISTANCE / max(distance, FINISH_DISTANCE)
+        return MatchResult(box, score, frame_id, elapsed)
 
     def _is_spool_full(self):
-        return self._locate_single_image_box("wheel", self.setting.retrieval_detect_confidence)
+        return self._locate_single_image_box(
+            "wheel", self.setting.general.retrieval_detect_confidence
+        )
 
     # ------------------------------ hint detection ------------------------------ #
     def is_tackle_ready(self):
-        return self._locate_single_image_box("ready", 0.6)
+        return self._locate_single_image_box("ready")
 
     def is_tackle_broken(self):
-        return self._locate_single_image_box("broke", 0.6)
+        return self._locate_single_image_box("broke")
 
     def is_lure_broken(self):
-        return self._locate_single_image_box("lure_is_broken", 0.7)
+        return self._locate_single_image_box("lure_is_broken")
 
     def is_moving_in_bottom_layer(self):
-        return self._locate_single_image_box("movement", 0.7)
+        return self._locate_single_image_box("movement")
 
     # ------------------------------ hint detection ------------------------------ #
     def is_disconnected(self):
-        return self._locate_single_image_box("disconnected", 0.9)
+        return self._locate_single_image_box("disconnected")
 
     def is_line_at_end(self):
-        return self._locate_single_image_box("spooling", 0.98)
+        return self._locate_single_image_box("spooling")
 
     def is_ticket_expired(self):
-        return self._locate_single_image_box("ticket", 0.9)
+        return self._locate_single_image_box("ticket")
 
     # ------------------------------- item crafting ------------------------------ #
     def is_operation_failed(self):
-        return self._locate_single_image_box("warning", 0.8)
+        return self._locate_single_image_box("warning")
 
     def is_operation_success(self):
-        return self._locate_single_image_box("ok", 0.8)
+        return self._locate_single_image_box("ok")
 
     # ---------------------- quiting game from control panel --------------------- #
     def get_quit_position(self):
-        return self._locate_single_image_box("quit", 0.8)
+        return self._locate_single_image_box("quit")
 
     def get_yes_position(self):
-        return self._locate_single_image_box("yes", 0.8)
+        return self._locate_single_image_box("yes")
 
     def get_make_position(self):
-        return self._locate_single_image_box("make", 0.9)
+        return self._locate_single_image_box("make")
 
     # ------------------------ quiting game from main menu ----------------------- #
     def get_exit_icon_position(self):
-        return self._locate_single_image_box("exit", 0.8)
+        return self._locate_single_image_box("exit")
 
     def get_confirm_exit_icon_position(self):
-        return self._locate_single_image_box("confirm_exit", 0.8)
+        return self._locate_single_image_box("confirm_exit")
 
     # ----------------------------- baits harvesting ----------------------------- #
     def is_harvest_success(self):
-        return self._locate_single_image_box("harvest_confirm", 0.8)
+        return self._locate_single_image_box("harvest_confirm")
 
     # ----------------------------- player stat icon ----------------------------- #
     def _get_energy_icon_position(self):
-        box = self._locate_single_image_box("energy", 0.8)
-        return box if box is None else pag.center(box)
+        return self._locate_single_image_box("energy").center
 
     def _get_food_icon_position(self):
-        box = self._locate_single_image_box("food", 0.8)
-        return box if box is None else pag.center(box)
+        return self._locate_single_image_box("food").center
 
     def _get_comfort_icon_position(self):
-        box = self._locate_single_image_box("comfort", 0.8)
-        return box if box is None else pag.center(box)
+        return self._locate_single_image_box("comfort").center
 
     # -------------------------- player stat refill item ------------------------- #
-    def get_food_position(self, food: str) -> Box | None:
+    def get_food_position(self, food: str) -> MatchResult:
         """Get the position of food in quick selection menu.
 
         :param food: carrot, tea, or coffee
         :type food: str
-        :return: image box, None if not found
-        :rtype: Box
+        :return: search result, falsy if not found
+        :rtype: MatchResult
         """
-        return self._locate_single_image_box(food, 0.8)
+        return self._locate_single_image_box(food)
 
-    def get_ticket_position(self, duration: int) -> Box | None:
+    def get_ticket_position(self, duration: int) -> MatchResult:
         """Locate the image of boat ticket according to the given duration.
 
         :param duration: duration of boat ticket
         :type duration: int
-        :return: image box, None if not found
-        :rtype: Box
+        :return: search result, falsy if not found
+        :rtype: MatchResult
         """
-        return self._locate_single_image_box(f"ticket_{duration}", 0.95)
+        return self._locate_single_image_box(f"ticket_{duration}")
 
     # -------------------------- broken lure replacement ------------------------- #
     def get_scrollbar_position(self):
-        return self._locate_single_image_box("scrollbar", 0.97)
+        return self._locate_single_image_box("scrollbar")
 
-    def get_100wear_position(self):
-        return self._locate_single_image_box("100wear", 0.98)
+    def _capture_window(self):
+        """Capture the game window once for several searches.
 
-    def get_favorite_item_positions(self):
-        return self._locate_multiple_image_boxes("favorite", 0.95)
+        :return: image of the window and its top-left corner
+        :rtype: tuple[Image.Image, tuple[int, int]]
+        """
+        region = self.setting.window_controller.get_capture_region()
+        return self.setting.capture.grab_region(region), region[:2]
+
+    def wait_until_settled(self, timeout: float, until: Callable[[], Any] | None = None) -> Any:
+        """Wait until the game window stops changing, or the expected element appears.
+
+        :param timeout: upper bound of the wait, the former fixed delay
+        :type timeout: float
+        :param until: detector of the expected element, defaults to None
+        :type until: Callable[[], Any] | None, optional
+        :return: the last result of the detector if it's given, otherwise whether
+            the window settled
+        :rtype: Any
+        """
+        start_time = time.perf_counter()
+        region = self.setting.window_controller.get_capture_region()
+        capture = self.setting.capture
+        result = wait_until_settled(
+            lambda: capture.grab_region(region),
+            timeout,
+            until,
+            # a shared frame is reused until it's too old
+            SETTLE_INTERVAL + capture.max_frame_age,
+        )
+        self.settle_count += 1
+        self.settle_saved_time += max(0, timeout - (time.perf_counter() - start_time))
+        return result
+
+    def scan_broken_items(self) -> list[tuple[int, int]]:
+        start_time = time.perf_counter()
+        items = self.inventory_scanner.find_broken_items(*self._capture_window())
+        self.detect_count += 1
+        self.detect_time += time.perf_counter() - start_time
+        return items
+
+    def scan_usable_favorites(self) -> tuple[list[tuple[int, int]], int]:
+        start_time = time.perf_counter()
+        favorites = self.inventory_scanner.find_usable_favorites(*self._capture_window())
+        self.detect_count += 1
+        self.detect_time += time.perf_counter() - start_time
+        return favorites
+
+    # ------------------------------- screen state ------------------------------- #
+    def classify_screen(self) -> str | None:
+        """Label the game window with a state of screenstate.STATES.
+
+        :return: state, None if the classifier is not trained or the screen is
+            unlike all labeled frames
+        :rtype: str | None
+        """
+        if self.screen_classifier is None:
+            return None
+        start_time = time.perf_counter()
+        image, _ = self._capture_window()
+        state, distance = self.screen_classifier.classify(np.asarray(image))
+        self.detect_count += 1
+        self.detect_time += time.perf_counter() - start_time
+        logger.info("Screen state: %s (distance %.3f)", state, distance)
+        return state
 
     # ---------------------------------------------------------------------------- #
     #                               image analyzation                              #
@@ -214,8 +491,9 @@ class Monitor:
             return False
         x, y = int(pos.x), int(pos.y)
         # default threshold: 0.74,  well done FishSoft
-        last_point = int(19 + 152 * self.setting.energy_threshold) - 1
-        return pag.pixel(x + 19, y) == pag.pixel(x + last_point, y)
+        last_point = self._scale(19 + 152 * self.setting.general.energy_threshold) - 1
+        pixel = self.setting.capture.pixel
+        return pixel(x + self._scale(19), y) == pixel(x + last_point, y)
 
     def is_hunger_low(self) -> bool:
         """Check if hunger is low.
@@ -227,8 +505,9 @@ class Monitor:
         if not pos:
             return False
         x, y = int(pos.x), int(pos.y)
-        last_point = int(18 + 152 * 0.5) - 1
-        return not pag.pixel(x + 18, y) == pag.pixel(x + last_point, y)
+        last_point = self._scale(18 + 152 * 0.5) - 1
+        pixel = self.setting.capture.pixel
+        return not pixel(x + self._scale(18), y) == pixel(x + last_point, y)
 
     def is_comfort_low(self) -> bool:
         """Check if comfort is low.
@@ -240,22 +519,35 @@ class Monitor:
         if not pos:
             return False
         x, y = int(pos.x), int(pos.y)
-        last_point = int(18 + 152 * 0.51) - 1
-        return not pag.pixel(x + 18, y) == pag.pixel(x + last_point, y)
+        last_point = self._scale(18 + 152 * 0.51) - 1
+        pixel = self.setting.capture.pixel
+        return not pixel(x + self._scale(18), y) == pixel(x + last_point, y)
+
+    def _scale(self, length: float) -> int:
+        """Convert a length in pixels at native scale to the ui scale.
+
+        :param length: length at native scale
+        :type length: float
+        :return: length at the ui scale
+        :rtype: int
+        """
+        return int(length * self.scale)
 
     def get_float_camera_region(self) -> tuple[int, int, int, int]:
         x, y = self.setting.window_controller.get_game_rect()[:2]
-        match self.setting.window_size:
-            case "2560x1440":
-                x += 1198
-                y += 1192
-            case "1920x1080":
-                x += 878
-                y += 832
-            case "1600x900":
-                x += 718
-                y += 652
-            case _:
-                logger.error("Invalid window size")
-                sys.exit()
-        return (x, y, 164, 164)
+        x_offset, y_offset = self.float_camera_offset
+        size = self.float_camera_size
+        return (x + x_offset, y + y_offset, size, size)
+
+    def get_fish_card_region(self) -> tuple[int, int, int, int]:
+        """Get the region of the fish card on the screen.
+
+        The region is computed from the window size and the ui scale once, see
+        FISH_CARD_WIDTH and FISH_CARD_HEIGHT, only the window position is updated.
+
+        :return: left, top, width, and height
+        :rtype: tuple[int, int, int, int]
+        """
+        x, y = self.setting.window_controller.get_game_rect()[:2]
+        x_offset, y_offset, width, height = self.fish_card_region
+        return (x + x_offset, y + y_offset, width, height)
@@ -72,7 +72,7 @@ if __name__ == "__main__":
     app = App()
     shift_key_holding_enabled = app.parse_args().shift
 
-    if app.setting.confirmation_enabled:
+    if app.setting.general.confirmation_enabled:
         script.ask_for_confirmation()
     WindowController().activate_game_window()
 
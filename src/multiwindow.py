@@ -0,0 +1,184 @@
+"""
+Drive several game windows from one process.
+
+Every window gets its own setting node and Player running in a thread. They
+share the template bundle, one screen capture backend, an input arbiter, and the
+catch database, screenshot writer, and config watcher.
+Keyboard and mouse input only work on the focused window, so a player must hold
+the arbiter while it controls its game. It's released at the loop checkpoint
+and during idle waits, e.g., between bottom rod checks or while watching the
+float, so the other windows can take turns.
+
+The game windows must not overlap, their regions are searched separately.
+"""
+
+import copy
+import logging
+import os
+import threading
+import time
+
+from prettytable import PrettyTable
+
+from capture import ScreenCapture
+from catchdb import CatchDatabase
+from configwatcher import ConfigWatcher
+from player import Player, create_screenshot_writer
+from setting import CONFIG_PATH, Setting
+
+logger = logging.getLogger(__name__)
+
+# a frame is shared by the windows for this many seconds
+SHARED_FRAME_AGE = 0.05
+JOIN_INTERVAL = 1
+
+
+class InputArbiter:
+    """A first-come, first-served lock that focuses the holder's game window."""
+
+    def __init__(self):
+        """Initialize the ticket counters."""
+        self._condition = threading.Condition()
+        self._next_ticket = 0
+        self._serving_ticket = 0
+        self._focused = None
+        self.wait_time = 0
+        self.switch_count = 0
+
+    def acquire(self, window_controller: object) -> None:
+        """Wait for the turn and focus the game window.
+
+        :param window_controller: controller of the game window to use
+        :type window_controller: object
+        """
+        start_time = time.perf_counter()
+        with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._condition.wait_for(lambda: self._serving_ticket == ticket)
+        self.wait_time += time.perf_counter() - start_time
+
+        if self._focused is not window_controller:
+            window_controller.activate_game_window()
+            self._focused = window_controller
+            self.switch_count += 1
+
+    def release(self) -> None:
+        """Pass the turn to the next waiting window."""
+        with self._condition:
+            self._serving_ticket += 1
+            self._condition.notify_all()
+
+
+class MultiWindowRunner:
+    """Run a Player for every game window."""
+
+    def __init__(self, setting: Setting, window_controllers: list):
+        """Create a setting node and a player for every window.
+
+        The given setting node should have its args and user profile merged, it's
+        copied for every window.
+
+        :param setting: merged setting node
+        :type setting: Setting
+        :param window_controllers: controllers of the game windows
+        :type window_controllers: list
+        """
+        self.arbiter = InputArbiter()
+        self.capture = ScreenCapture(SHARED_FRAME_AGE)
+        # one instance of each file-backed service, the windows must not race on the files
+        self.catch_db = CatchDatabase()
+        self.screenshot_writer = None
+        if setting.screenshot_enabled:
+            self.screenshot_writer = create_screenshot_writer(setting)
+        self.config_watcher = None
+        if setting.general.config_reload_enabled:
+            self.config_watcher = ConfigWatcher(CONFIG_PATH)
+
+        self.players = []
+        for i, window_controller in enumerate(window_controllers):
+            window_setting = copy.copy(setting)
+            window_setting.bind_window(window_controller)
+            window_setting.capture = self.capture
+            window_setting.arbiter = self.arbiter
+            window_setting.window_suffix = f"-w{i + 1}"
+            if setting.metrics_port is not None:
+                window_setting.metrics_port = setting.metrics_port + i
+            player = Player(
+                window_setting, self.catch_db, self.screenshot_writer, self.config_watcher
+            )
+            self.players.append(player)
+        self.threads = []
+        self.start_time = None
+        self.start_cpu_time = None
+
+    def _run_player(self, player: Player) -> None:
+        """Fishing loop of a window, executed in its own thread.
+
+        :param player: player of the window
+        :type player: Player
+        """
+        self.arbiter.acquire(player.setting.window_controller)
+        try:
+            player.start_fishing()
+        except SystemExit:  # terminated by the player itself
+            pass
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Player of %s stopped unexpectedly", threading.current_thread().name)
+        finally:
+            self.arbiter.release()
+
+    def run(self) -> None:
+        """Start all players and wait until they stop or Ctrl-C is pressed."""
+        self.start_time = time.perf_counter()
+        self.start_cpu_time = time.process_time()
+        for i, player in enumerate(self.players):
+            thread = threading.Thread(
+                target=self._run_player, args=(player,), name=f"window-{i + 1}", daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+
+        # join with a timeout so that KeyboardInterrupt is delivered to the main thread
+        while any(thread.is_alive() for thread in self.threads):
+            for thread in self.threads:
+                thread.join(JOIN_INTERVAL)
+
+    def close(self) -> None:
+        """Stop the shared services, call it after all players are closed."""
+        if self.config_watcher is not None:
+            self.config_watcher.close()
+        if self.screenshot_writer is not None:
+            self.screenshot_writer.close()
+        self.catch_db.close()
+
+    def gen_result(self) -> PrettyTable:
+        """Generate a table of the throughput of every window and the process.
+
+        :return: table of casts, catches and CPU usage
+        :rtype: PrettyTable
+        """
+        wall_time = time.perf_counter() - self.start_time
+        cpu_time = time.process_time() - self.start_cpu_time
+        hours = wall_time / 3600
+
+        table = PrettyTable(["Window", "Casts", "Fish caught", "Casts / hour"], align="l")
+        table.title = "Multi-window Throughput"
+        total_casts = total_fish = 0
+        for i, player in enumerate(self.players):
+            casts = player.cast_miss_count + player.marked_count + player.unmarked_count
+            total_casts += casts
+            total_fish += player.keep_fish_count
+            table.add_row([i + 1, casts, player.keep_fish_count, f"{casts / hours:.1f}"])
+        table.add_row(["Total", total_casts, total_fish, f"{total_casts / hours:.1f}"])
+
+        # cores actually used by this process, at most os.cpu_count()
+        cores_used = cpu_time / wall_time if wall_time else 0
+        casts_per_core_hour = total_casts / (cpu_time / 3600) if cpu_time else 0
+        table.add_row(["", "", "", ""])
+        table.add_row(["CPU cores used", f"{cores_used:.2f} / {os.cpu_count()}", "", ""])
+        table.add_row(["Casts / core-hour", f"{casts_per_core_hour:.1f}", "", ""])
+        table.add_row(["Input wait", f"{self.arbiter.wait_time:.1f}s", "", ""])
+        table.add_row(["Window switches", self.arbiter.switch_count, "", ""])
+        table.add_row(["Screen captures", self.capture.capture_count, "", ""])
+        return table
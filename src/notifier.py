@@ -0,0 +1,330 @@
+"""
+Module for Notifier class, a non-blocking notification dispatcher.
+
+Every channel owns a queue and a worker thread, so sending an email or playing an
+alarm never pauses the fishing loop. Connections are kept open between messages,
+and failed deliveries are retried with exponential backoff.
+
+Channels are configured in .env:
+    EMAIL, PASSWORD, SMTP_SERVER, SMTP_PORT (465), SMTP_SSL (True),
+    MIAO_CODE, MIAOTIXING_URL (http://miaotixing.com/trigger)
+
+Point SMTP_SERVER and MIAOTIXING_URL to a local server with SMTP_SSL=False to test
+the channels without sending anything.
+"""
+
+# pylint: disable=import-outside-toplevel
+# smtplib and the email package are only imported if email sending is enabled
+
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from queue import SimpleQueue
+from urllib import parse
+
+from prettytable import PrettyTable
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 3
+RETRY_DELAY = 2  # doubled after each failed attempt
+CONNECTION_TIMEOUT = 10
+SMTP_PORT = 465
+MIAOTIXING_URL = "http://miaotixing.com/trigger"
+
+
+def load_env() -> None:
+    """Load environment variables from .env."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def connect_smtp():
+    """Connect and log in to the SMTP server in .env.
+
+    :return: connected SMTP client
+    :rtype: smtplib.SMTP
+    """
+    import smtplib
+
+    server_name = os.getenv("SMTP_SERVER")
+    port = int(os.getenv("SMTP_PORT", str(SMTP_PORT)))
+    if os.getenv("SMTP_SSL", "True").lower() in ("false", "0", "no", "off"):
+        smtp_server = smtplib.SMTP(server_name, port, timeout=CONNECTION_TIMEOUT)
+    else:
+        smtp_server = smtplib.SMTP_SSL(server_name, port, timeout=CONNECTION_TIMEOUT)
+    password = os.getenv("PASSWORD")
+    if password:  # local test servers usually don't support authentication
+        smtp_server.login(os.getenv("EMAIL"), password)
+    return smtp_server
+
+
+class Channel:
+    """Base class of notification channels that deliver messages in a worker thread."""
+
+    name = "channel"
+    max_retries = MAX_RETRIES
+
+    def __init__(self):
+        """Start the worker thread."""
+        self._queue = SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, subject: str, table: PrettyTable | None) -> None:
+        """Queue a message, this method never blocks.
+
+        :param subject: subject of the message
+        :type subject: str
+        :param table: running results, None if there's nothing to attach
+        :type table: PrettyTable | None
+        """
+        self._queue.put((subject, table))
+
+    def _run(self) -> None:
+        """Deliver queued messages until the sentinel is received."""
+        while True:
+            message = self._queue.get()
+            if message is None:  # sentinel
+                break
+            try:
+                self._deliver(*message)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # keep the worker alive for the following messages
+                logger.exception("Unexpected error in %s notification", self.name)
+        self.disconnect()
+
+    def _deliver(self, subject: str, table: PrettyTable | None) -> None:
+        """Send a message and retry with exponential backoff if it fails.
+
+        :param subject: subject of the message
+        :type subject: str
+        :param table: running results
+        :type table: PrettyTable | None
+        """
+        delay = RETRY_DELAY
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.send(subject, table)
+                return
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                self.disconnect()  # reconnect on the next attempt
+                if attempt == self.max_retries:
+                    logger.error("Failed to send %s notification: %s", self.name, e)
+                    return
+                logger.warning("Failed to send %s notification, retry in %ss", self.name, delay)
+                time.sleep(delay)
+                delay *= 2
+
+    def send(self, subject: str, table: PrettyTable | None) -> None:
+        """Send a message, implemented by subclasses.
+
+        :param subject: subject of the message
+        :type subject: str
+        :param table: running results
+        :type table: PrettyTable | None
+        """
+        raise NotImplementedError
+
+    def disconnect(self) -> None:
+        """Close the connection if the channel keeps one."""
+
+    def close(self, timeout: float | None = None) -> None:
+        """Deliver queued messages and stop the worker thread.
+
+        :param timeout: maximum time to wait for the delivery, defaults to None
+        :type timeout: float | None, optional
+        """
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+class EmailChannel(Channel):
+    """Send emails through a reused SMTP connection."""
+
+    name = "email"
+
+    def __init__(self):
+        """Initialize the connection lazily."""
+        self._smtp_server = None
+        self.sender = os.getenv("EMAIL")
+        super().__init__()
+
+    def send(self, subject: str, table: PrettyTable | None) -> None:
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        msg = MIMEMultipart()
+        msg["Subject"] = f"RussianFishing4Script: {subject}"
+        msg["From"] = self.sender
+        recipients = [self.sender]
+        msg["To"] = ", ".join(recipients)
+        if table is not None:
+            msg.attach(MIMEText(table.get_html_string(), "html"))
+
+        self._get_smtp_server().sendmail(self.sender, recipients, msg.as_string())
+        logger.info("A notification email has been sent to your email address")
+
+    def _get_smtp_server(self):
+        """Get the connected SMTP client, reconnect if the server closed it.
+
+        :return: connected SMTP client
+        :rtype: smtplib.SMTP
+        """
+        if self._smtp_server is not None:
+            try:
+                if self._smtp_server.noop()[0] == 250:
+                    return self._smtp_server
+            except OSError:  # SMTPServerDisconnected after an idle timeout
+                pass
+            self.disconnect()
+        self._smtp_server = connect_smtp()
+        return self._smtp_server
+
+    def disconnect(self) -> None:
+        if self._smtp_server is None:
+            return
+        try:
+            self._smtp_server.quit()
+        except OSError:
+            pass
+        self._smtp_server = None
+
+
+class MiaotixingChannel(Channel):
+    """Trigger miaotixing messages through a reused HTTP connection."""
+
+    name = "miaotixing"
+
+    def __init__(self):
+        """Initialize the connection lazily."""
+        self._connection = None
+        self.miao_code = os.getenv("MIAO_CODE")
+        self.url = parse.urlsplit(os.getenv("MIAOTIXING_URL", MIAOTIXING_URL))
+        super().__init__()
+
+    def send(self, subject: str, table: PrettyTable | None) -> None:
+        lines = [subject]
+        if table is not None:
+            lines.extend(f"{column_name}：{value}" for column_name, value in table.rows)
+        query = parse.urlencode({"id": self.miao_code, "text": "\n".join(lines), "type": "json"})
+
+        if self._connection is None:
+            connection_class = (
+                http.client.HTTPSConnection
+                if self.url.scheme == "https"
+                else http.client.HTTPConnection
+            )
+            self._connection = connection_class(self.url.netloc, timeout=CONNECTION_TIMEOUT)
+        self._connection.request("GET", f"{self.url.path}?{query}")
+        response = self._connection.getresponse()
+        body = response.read()  # read it completely to reuse the connection
+        if response.status >= 500:
+            raise http.client.HTTPException(f"HTTP {response.status}")
+
+        result = json.loads(body)
+        if result["code"] == 0:
+            logger.info("A notification message has been sent to miaotixing")
+        else:  # rejected by the service, retrying won't help
+            logger.error("Sending failed with error code %s: %s", result["code"], result["msg"])
+
+    def disconnect(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class SoundChannel(Channel):
+    """Play the alarm sound."""
+
+    name = "sound"
+    max_retries = 0
+
+    def __init__(self, sound_file: str):
+        """Resolve the path of the sound file.
+
+        :param sound_file: path of the sound file
+        :type sound_file: str
+        """
+        self.sound_file = str(Path(sound_file).resolve())
+        super().__init__()
+
+    def send(self, subject: str, table: PrettyTable | None) -> None:
+        from playsound import playsound
+
+        logger.info("Playing alarm: %s", subject)
+        playsound(self.sound_file)
+
+
+class Notifier:
+    """Dispatch notifications to the enabled channels without blocking."""
+
+    def __init__(self, email_enabled: bool, miaotixing_enabled: bool, sound_file: str):
+        """Load .env if a remote channel is enabled, channels are started on first use.
+
+        :param email_enabled: whether to send emails
+        :type email_enabled: bool
+        :param miaotixing_enabled: whether to send miaotixing messages
+        :type miaotixing_enabled: bool
+        :param sound_file: path of the alarm sound file
+        :type sound_file: str
+        """
+        self.email_enabled = email_enabled
+        self.miaotixing_enabled = miaotixing_enabled
+        self.sound_file = sound_file
+        self.channels = {}
+        if email_enabled or miaotixing_enabled:
+            load_env()
+
+    def _get_channel(self, name: str) -> Channel:
+        """Get a channel, start it if it's not started yet.
+
+        :param name: email, miaotixing, or sound
+        :type name: str
+        :return: notification channel
+        :rtype: Channel
+        """
+        if name not in self.channels:
+            match name:
+                case "email":
+                    self.channels[name] = EmailChannel()
+                case "miaotixing":
+                    self.channels[name] = MiaotixingChannel()
+                case "sound":
+                    self.channels[name] = SoundChannel(self.sound_file)
+        return self.channels[name]
+
+    def notify(self, subject: str, table: PrettyTable) -> None:
+        """Send a message to the enabled remote channels.
+
+        :param subject: subject of the message
+        :type subject: str
+        :param table: running results
+        :type table: PrettyTable
+        """
+        if self.email_enabled:
+            self._get_channel("email").put(subject, table)
+        if self.miaotixing_enabled:
+            self._get_channel("miaotixing").put(subject, table)
+
+    def alarm(self, msg: str) -> None:
+        """Play the alarm sound.
+
+        :param msg: cause of the alarm
+        :type msg: str
+        """
+        self._get_channel("sound").put(msg, None)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Deliver queued messages and stop all channels.
+
+        :param timeout: maximum time to wait for each channel, defaults to None
+        :type timeout: float | None, optional
+        """
+        for channel in self.channels.values():
+            channel.close(timeout)
@@ -1,12 +1,14 @@
 """
 Module for Player class.
 """
+
+# pylint: disable=import-outside-toplevel
+# optional features import their dependencies on first use to speed up startup
+
 import logging
 import os
-import smtplib
+import subprocess
 import sys
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 
 ##
 import time
@@ -15,22 +17,26 @@ import random
 # from email.mime.image import MIMEImage
 from pathlib import Path
 from time import sleep
+from typing import Callable
 
 import pyautogui as pag
-from dotenv import load_dotenv
-from matplotlib import pyplot as plt
-from matplotlib.ticker import MaxNLocator
-from playsound import playsound
 from prettytable import PrettyTable
 
 import exceptions
 import script
+from capture import MatchResult
+from catchdb import CatchDatabase
+from configwatcher import ConfigWatcher
+from eventlog import EventLog
+from metrics import MetricsServer
 from monitor import Monitor
-from setting import Setting
+from notifier import Notifier
+from precisetime import hold_stats
+from scheduler import Scheduler
+from screenshotwriter import ScreenshotWriter
+from setting import CONFIG_PATH, Setting
 from tackle import Tackle
 from timer import Timer
-from urllib import request, parse
-import json
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +50,10 @@ ANIMATION_DELAY = 1
 TICKET_EXPIRE_DELAY = 16
 LURE_ADJUST_DELAY = 4
 DISCONNECTED_DELAY = 8
-WEAR_TEXT_UPDATE_DELAY = 2
+NOTIFICATION_TIMEOUT = 30
+PAUSE_CHECK_DELAY = 10
+
+CHART_SCRIPT = Path(__file__).resolve().parent / "chart.py"
 
 
 class Player:
@@ -54,13 +63,33 @@ class Player:
     # there are too many counters...
     # setting node's attributes will be merged on the fly
 
-    def __init__(self, setting: Setting):
+    def __init__(
+        self,
+        setting: Setting,
+        catch_db: CatchDatabase | None = None,
+        screenshot_writer: ScreenshotWriter | None = None,
+        config_watcher: ConfigWatcher | None = None,
+    ):
         """Initialize monitor, timer, timer and some trivial counters.
 
+        Shared services are given by MultiWindowRunner, which also closes them,
+        the player creates and closes the missing ones itself.
+
         :param setting: universal setting node, initialized in App()
         :type setting: Setting
+        :param catch_db: shared catch database, defaults to None
+        :type catch_db: CatchDatabase | None, optional
+        :param screenshot_writer: shared screenshot writer, defaults to None
+        :type screenshot_writer: ScreenshotWriter | None, optional
+        :param config_watcher: shared watcher of config.ini, defaults to None
+        :type config_watcher: ConfigWatcher | None, optional
         """
         self.setting = setting
+        self.shared_services = [
+            service
+            for service in (catch_db, screenshot_writer, config_watcher)
+            if service is not None
+        ]
         self.monitor = Monitor(setting)
         if setting.rainbow_line_enabled:
             self.monitor.is_retrieval_finished = self.monitor._is_rainbow_line_0or5m
@@ -68,13 +97,7 @@ class Player:
             self.monitor.is_retrieval_finished = self.monitor._is_spool_full
         self.timer = Timer()
         self.tackle = Tackle(self.setting, self.monitor, self.timer)
-
-        self.telescopic = self.setting.fishing_strategy  # for acceleration
-        if self.telescopic == "float":
-            self.puller = self.tackle.telescopic_pull
-        else:
-            self.puller = self.tackle.general_pull
-        self.special_cast_miss = self.setting.fishing_strategy in ["bottom", "marine"]
+        self._init_strategy()
 
         # fish count and bite rate
         self.cast_miss_count = 0
@@ -90,27 +113,92 @@ class Player:
         self.total_coffee_count = 0
         self.harvest_count = 0
 
+        # persistent multi-session records
+        self.catch_db = catch_db if catch_db is not None else CatchDatabase()
+        self.catch_session = self.catch_db.start_session(
+            self.setting.profile_name, self.setting.profile.fishing_strategy
+        )
+
+        # structured per-cast records
+        self.event_log = None
+        if self.setting.event_log_enabled:
+            timestamp = self.timer.get_cur_timestamp()
+            self.event_log = EventLog(f"../logs/{timestamp}{self.setting.window_suffix}.jsonl")
+        self.pre_item_counts = self._get_item_counts()
+        self.pre_detect_count = 0
+        self.pre_detect_time = 0
+
+        # local metrics endpoint
+        self.metrics_server = None
+        if self.setting.metrics_port is not None:
+            self.metrics_server = MetricsServer(self.setting.metrics_port)
+        self.pre_publish_time = time.perf_counter()
+        self.pre_publish_detect_count = 0
+        self.time_to_first_cast = None
+
+        # notifications are sent in background threads
+        self.notifier = Notifier(
+            self.setting.email_sending_enabled,
+            self.setting.miaotixing_sending_enabled,
+            self.setting.general.alarm_sound_file,
+        )
+        self.pre_summary_time = time.perf_counter()
+
+        # screenshots are encoded and saved in background threads
+        self.screenshot_writer = screenshot_writer
+        if self.screenshot_writer is None and self.setting.screenshot_enabled:
+            self.screenshot_writer = create_screenshot_writer(self.setting)
+
+        # config.ini is reloaded at the next safe point after it's modified
+        self.config_watcher = config_watcher
+        if self.config_watcher is None and self.setting.general.config_reload_enabled:
+            self.config_watcher = ConfigWatcher(CONFIG_PATH)
+        self.config_version = 0 if self.config_watcher is None else self.config_watcher.version
+
+        # run/pause windows and profile rotations
+        self.scheduler = None
+        if self.setting.schedule is not None:
+            self.scheduler = Scheduler(self.setting.schedule)
+
+    def _init_strategy(self) -> None:
+        """Initialize the attributes that depend on the fishing strategy."""
+        self.telescopic = self.setting.profile.fishing_strategy  # for acceleration
+        if self.telescopic == "float":
+            self.puller = self.tackle.telescopic_pull
+        else:
+            self.puller = self.tackle.general_pull
+        self.special_cast_miss = self.setting.profile.fishing_strategy in ["bottom", "marine"]
+
     def start_fishing(self) -> None:
-        """Start main fishing loop with specified fishing strategt."""
-        match self.setting.fishing_strategy:
-            case "spin" | "spin_with_pause":
-                self.spin_fishing()
-            case "bottom":
-                self.bottom_fishing()
-            case "marine":
-                self.marine_fishing()
-            case "float":
-                self.float_fishing()
-            case "wakey_rig":
-                self.wakey_rig_fishing()
+        """Start main fishing loop with specified fishing strategt.
+
+        The loop is restarted with the new strategy if the profile is changed
+        by the schedule.
+        """
+        while True:
+            try:
+                match self.setting.profile.fishing_strategy:
+                    case "spin" | "spin_with_pause":
+                        self.spin_fishing()
+                    case "bottom":
+                        self.bottom_fishing()
+                    case "marine":
+                        self.marine_fishing()
+                    case "float":
+                        self.float_fishing()
+                    case "wakey_rig":
+                        self.wakey_rig_fishing()
+            except exceptions.ProfileChangedError:
+                logger.info("Switched to profile %s", self.setting.profile_name)
 
     # ---------------------------------------------------------------------------- #
     #                              main fishing loops                              #
     # ---------------------------------------------------------------------------- #
     def spin_fishing(self) -> None:
         """Main spin fishing loop for "spin" and "spin_with_pause"."""
-        spin_with_pause = self.setting.fishing_strategy == "spin_with_pause"
+        spin_with_pause = self.setting.profile.fishing_strategy == "spin_with_pause"
         while True:
+            self._checkpoint()
             self._refill_user_stats()
             self._resetting_stage()
             self.tackle.cast()
@@ -119,6 +207,7 @@ class Player:
             self._retrieving_stage()
             if not self.monitor.is_fish_hooked():
                 self.cast_miss_count += 1
+                self._log_cast("missed")
                 continue
             self._drink_alcohol()
             self._pulling_stage()
@@ -126,14 +215,16 @@ class Player:
     def bottom_fishing(self) -> None:
         """Main bottom fishing loop."""
         rod_idx = -1
-        rod_count = len(self.setting.bottom_rods_shortcuts)
+        rod_count = len(self.setting.general.bottom_rods_shortcuts)
         check_miss_counts = [0] * rod_count
 
         while True:
+            self._checkpoint()
             self._refill_user_stats()
             self._harvesting_stage()
             rod_idx = (rod_idx + 1) % rod_count
-            rod_key = self.setting.bottom_rods_shortcuts[rod_idx]
+            rod_key = self.setting.general.bottom_rods_shortcuts[rod_idx]
+            self.timer.select_rod(rod_key)
             logger.info("Checking rod %s", rod_idx + 1)
             pag.press(f"{rod_key}")
             sleep(1)  # wait for pick up animation
@@ -144,10 +235,13 @@ class Player:
                 continue
 
             check_miss_counts[rod_idx] = 0
+            self.timer.mark("bite")
             self._retrieving_stage()
             if self.monitor.is_fish_hooked():
                 self._drink_alcohol()
                 self._pulling_stage()
+            else:
+                self._log_cast("missed")
             self._resetting_stage()
             self.tackle.cast()
             pag.click()
@@ -155,6 +249,7 @@ class Player:
     def marine_fishing(self) -> None:
         """Main marine fishing loop."""
         while True:
+            self._checkpoint()
             self._refill_user_stats()
             self._resetting_stage()
             self.tackle.cast()
@@ -165,11 +260,14 @@ class Player:
             if self.monitor.is_fish_hooked():
                 self._drink_alcohol()
                 self._pulling_stage()
+            else:
+                self._log_cast("missed")
 
     def float_fishing(self) -> None:
         """Main float fishing loop."""
         float_region = self.monitor.get_float_camera_region()
         while True:
+            self._checkpoint()
             self._refill_user_stats()
             self._resetting_stage()
             self.tackle.cast()
@@ -178,27 +276,33 @@ class Player:
                 self._monitor_float_state(float_region)
             except TimeoutError:
                 self.cast_miss_count += 1
+                self._log_cast("missed")
                 continue
-            sleep(self.setting.pull_delay)
+            sleep(self.setting.profile.pull_delay)
             script.hold_left_click(PRE_RETRIEVAL_DURATION)
             if self.monitor.is_fish_hooked():
 #                self._drink_alcohol()
                 self._pulling_stage()
+            else:
+                self._log_cast("missed")
 
     def wakey_rig_fishing(self) -> None:
         """Main wakey rig fishing loop."""
         while True:
+            self._checkpoint()
             self._refill_user_stats()
             self._resetting_stage()
             self.tackle.cast()
             self.tackle.sink(marine=False)
 
-            if self.setting.pirk_timeout > 0:
+            if self.setting.profile.pirk_timeout > 0:
                 self._pirking_stage()
             self._retrieving_stage()
             if self.monitor.is_fish_hooked():
                 self._drink_alcohol()
                 self._pulling_stage()
+            else:
+                self._log_cast("missed")
 
     # this is not done yet :(
     # def trolling_fishing(self) -> None:
@@ -236,6 +340,115 @@ class Player:
     # ---------------------------------------------------------------------------- #
     #            stages and their helper functions in main fishing loops           #
     # ---------------------------------------------------------------------------- #
+    def _checkpoint(self) -> None:
+        """Run periodic tasks at a safe point of the main fishing loop."""
+        if self.time_to_first_cast is None:
+            launch_time = self.setting.launch_time
+            self.time_to_first_cast = self.timer.get_time_to_first_cast(launch_time)
+            if self.time_to_first_cast is not None:
+                logger.info("Time to first cast: %.2fs", self.time_to_first_cast)
+                self.catch_db.set_time_to_first_cast(self.catch_session, self.time_to_first_cast)
+        if self.metrics_server is not None:
+            self._publish_metrics()
+        if self.setting.arbiter is not None:  # let other windows take their turns
+            self.tackle.clicklock.release()
+            self.setting.arbiter.release()
+            self.setting.arbiter.acquire(self.setting.window_controller)
+        if self.config_watcher is not None and self.config_watcher.version != self.config_version:
+            self.config_version = self.config_watcher.version
+            self._reload_config()
+        if self.scheduler is not None:
+            self._follow_schedule()
+        if self.monitor.score_tracker.pop_warnings():
+            self.notifier.notify(
+                "Detection Drift Warning", self.monitor.score_tracker.gen_table()
+            )
+        if self.setting.summary_interval is not None:
+            now = time.perf_counter()
+            if now - self.pre_summary_time >= self.setting.summary_interval * 60:
+                self.pre_summary_time = now
+                self.notifier.notify("Running Summary", self.gen_result("Still running"))
+
+    def _follow_schedule(self) -> None:
+        """Pause, switch the profile, or quit according to the schedule.
+
+        :raises exceptions.ProfileChangedError: the profile is changed
+        """
+        self.scheduler.poll()
+        while self.scheduler.window.action == "pause":
+            self._pause(self.scheduler.get_remaining_time())
+            self.scheduler.poll()
+
+        window = self.scheduler.window
+        if window.action == "quit":
+            self._handle_termination("Schedule finished", shutdown=True)
+
+        try:
+            profile_name = self.setting.get_profile_name(window.pid)
+            if profile_name == self.setting.profile_name:
+                return
+            self.setting.merge_user_configs(window.pid)
+        except exceptions.ConfigError as e:  # broken by a reload
+            logger.error("Failed to switch profile: %s", e)
+            return
+        self._init_strategy()
+        self.catch_session = self.catch_db.start_session(
+            profile_name, self.setting.profile.fishing_strategy
+        )
+        raise exceptions.ProfileChangedError
+
+    def _reload_config(self) -> None:
+        """Apply the modified config.ini, invalid changes are rejected as a whole.
+
+        :raises exceptions.ProfileChangedError: the fishing strategy is changed
+        """
+        strategy = self.setting.profile.fishing_strategy
+        try:
+            changed = self.setting.reload_config()
+        except exceptions.ConfigError as e:
+            logger.error("Config reload rejected: %s", e)
+            return
+        logger.info("Config reloaded, changed: %s", ", ".join(changed) or "nothing")
+
+        if self.setting.profile.fishing_strategy != strategy:
+            self._init_strategy()
+            self.catch_session = self.catch_db.start_session(
+                self.setting.profile_name, self.setting.profile.fishing_strategy
+            )
+            raise exceptions.ProfileChangedError
+
+    def _pause(self, duration: float) -> None:
+        """Release all inputs and stop fishing for a while.
+
+        :param duration: pause duration in seconds
+        :type duration: float
+        """
+        logger.info("Pausing for %.0f minutes", duration / 60)
+        self.tackle.clicklock.release()
+        pag.keyUp("shift")
+        pag.mouseUp(button="left")
+        pag.mouseUp(button="right")
+        end_time = time.monotonic() + duration
+        while (remaining_time := end_time - time.monotonic()) > 0:
+            self._idle(min(remaining_time, PAUSE_CHECK_DELAY))
+            if self.metrics_server is not None:
+                self._publish_metrics()
+
+    def _idle(self, duration: float) -> None:
+        """Wait without using the input, other windows can use it in the meantime.
+
+        :param duration: waiting time in seconds
+        :type duration: float
+        """
+        arbiter = self.setting.arbiter
+        if arbiter is None:
+            sleep(duration)
+            return
+        self.tackle.clicklock.release()
+        arbiter.release()
+        sleep(duration)
+        arbiter.acquire(self.setting.window_controller)
+
     def _harvesting_stage(self) -> None:
         """Harvest the bait."""
         if not self.setting.baits_harvesting_enabled:
@@ -257,7 +470,7 @@ class Player:
                 pag.press("space")
                 # sleep(ANIMATION_DELAY) #TODO: is this necessary?
                 pag.press("backspace")
-                sleep(ANIMATION_DELAY)
+                self.monitor.wait_until_settled(ANIMATION_DELAY)
                 self.harvest_count += 1
                 return
 
@@ -273,26 +486,26 @@ class Player:
         if self.monitor.is_comfort_low() and self.timer.is_tea_drinkable():
             self._access_item("tea")
             self.tea_count += 1
-            sleep(ANIMATION_DELAY)
+            self.monitor.wait_until_settled(ANIMATION_DELAY)
 
         # refill food level
         if self.monitor.is_hunger_low():
             self._access_item("carrot")
             self.carrot_count += 1
-            sleep(ANIMATION_DELAY)
+            self.monitor.wait_until_settled(ANIMATION_DELAY)
 
     def _drink_alcohol(self) -> None:
         """Drink alcohol with given quantity."""
         if not self.setting.alcohol_drinking_enabled:
             return
 
-        if not self.timer.is_alcohol_drinkable(self.setting.alcohol_drinking_delay):
+        if not self.timer.is_alcohol_drinkable(self.setting.general.alcohol_drinking_delay):
             return
 
-        for _ in range(self.setting.alcohol_drinking_quantity):
+        for _ in range(self.setting.general.alcohol_drinking_quantity):
             self._access_item("alcohol")
             self.alcohol_count += 1
-            sleep(ANIMATION_DELAY)
+            self.monitor.wait_until_settled(ANIMATION_DELAY)
 
     def _drink_coffee(self) -> None:
         """Drink coffee."""
@@ -302,7 +515,7 @@ class Player:
         if self.monitor.is_energy_high():
             return
 
-        if self.cur_coffee_count > self.setting.coffee_limit:
+        if self.cur_coffee_count > self.setting.general.coffee_limit:
             pag.press("esc")  # back to control panel to reduce power usage
             self._handle_termination("Coffee limit reached", shutdown=False)
 
@@ -317,22 +530,26 @@ class Player:
         :param item: the name of the item
         :type item: str
         """
-        key = getattr(self.setting, f"{item}_shortcut")
+        self.tackle.clicklock.release()  # the item can't be used while reeling
+        key = getattr(self.setting.general, f"{item}_shortcut")
         if key != "-1":
             pag.press(key)
             return
 
         # key = 1, item is a food
         with pag.hold("t"):
-            sleep(ANIMATION_DELAY)
-            food_position = self.monitor.get_food_position(item)
-            pag.moveTo(food_position)
+            food_position = self.monitor.wait_until_settled(
+                ANIMATION_DELAY, lambda: self.monitor.get_food_position(item)
+            )
+            if not food_position:
+                logger.warning("%s not found in quick selection menu", item.capitalize())
+                return
+            pag.moveTo(food_position.center)
             pag.click()
 
     def _resetting_stage(self) -> None:
         """Reset the tackle till it's ready."""
-        sleep(ANIMATION_DELAY)
-        if self.monitor.is_tackle_ready():
+        if self.monitor.wait_until_settled(ANIMATION_DELAY, self.monitor.is_tackle_ready):
             return
 
         if self.monitor.is_lure_broken():
@@ -356,22 +573,44 @@ class Player:
                 self._handle_timeout()
 
     def _handle_timeout(self) -> None:
-        """Handle common timeout events."""
-        if self.monitor.is_tackle_broken():
-            self.save_screenshot()
-            self.general_quit("Tackle is broken")
+        """Handle common timeout events.
 
-        if self.monitor.is_disconnected():
-            self.disconnected_quit()
+        If the screen state classifier is trained, only the detector of the
+        classified state is confirmed, and states without a handler are retried
+        directly. Otherwise, or if it's not confirmed, every detector is checked.
+        """
+        handlers = {
+            "broken": (self.monitor.is_tackle_broken, self._handle_broken_tackle),
+            "disconnected": (self.monitor.is_disconnected, self.disconnected_quit),
+            "ticket": (self.monitor.is_ticket_expired, self._handle_expired_ticket),
+        }
+        state = self.monitor.classify_screen()
+        if state is not None:
+            if state not in handlers:
+                return
+            detector, handler = handlers[state]
+            if detector():
+                handler()
+                return
+            logger.warning("Screen state '%s' not confirmed, checking all", state)
+
+        for detector, handler in handlers.values():
+            if detector():
+                handler()
 
-        if self.monitor.is_ticket_expired():
-            self._handle_expired_ticket()
+    def _handle_broken_tackle(self) -> None:
+        """Record the broken tackle and quit."""
+        self._log_cast("broken")
+        self.save_screenshot()
+        self.general_quit("Tackle is broken")
 
     def _handle_broken_lure(self):
         """Handle the broken lure event according to the settings."""
         msg = "Lure is broken"
         logger.warning(msg)
-        match self.setting.lure_broken_action:
+        self.tackle.clicklock.release()
+        self._log_cast("broken")
+        match self.setting.general.lure_broken_action:
             case "alarm":
                 self._handle_termination(msg, shutdown=False)
             case "replace":
@@ -391,13 +630,12 @@ class Player:
         :type shutdown: bool
         """
         # TODO: quit game?
+        self.tackle.clicklock.release()
         result = self.gen_result(msg)
-        if self.setting.email_sending_enabled:
-            self.send_email(result)
-        if self.setting.miaotixing_sending_enabled:
-            self.send_miaotixing(result)
+        self.notifier.notify("Notice of Program Termination", result)
         if self.setting.plotting_enabled:
             self.plot_and_save()
+        self.close()
         if shutdown and self.setting.shutdown_enabled:
             os.system("shutdown /s /t 5")
         print(result)
@@ -408,6 +646,7 @@ class Player:
         if self.monitor.is_retrieval_finished():
             return
 
+        start_time = time.perf_counter()
         first = True
         gr_switched = False
         self.cur_coffee_count = 0
@@ -432,10 +671,13 @@ class Player:
         pag.keyUp("shift")
         if gr_switched:
             self.tackle.switch_gear_ratio()
+        if not self.monitor.is_fish_hooked():  # the reeling ends, no pulling follows
+            self.tackle.clicklock.release()
+        self.timer.add_stage_duration("retrieval", time.perf_counter() - start_time)
 
     def _pirking_stage(self) -> None:
         """Perform pirking till a fish hooked, adjust the lure if timeout is reached."""
-        ctrl_enabled = self.setting.fishing_strategy == "wakey_rig"
+        ctrl_enabled = self.setting.profile.fishing_strategy == "wakey_rig"
         while True:
             try:
                 self.tackle.pirk(ctrl_enabled)
@@ -446,7 +688,7 @@ class Player:
                 logger.info("Adjusting lure depth")
                 pag.press("enter")  # open reel
                 sleep(LURE_ADJUST_DELAY)
-                script.hold_left_click(self.setting.tighten_duration)
+                script.hold_left_click(self.setting.profile.tighten_duration)
                 # TODO: improve dedicated miss count for marine fishing
                 self.cast_miss_count += 1
 
@@ -456,36 +698,46 @@ class Player:
         :param float_region: a PyScreeze.Box-like coordinate tuple
         :type float_region: tuple[int, int, int, int]
         """
-        reference_img = pag.screenshot(region=float_region)
-        i = self.setting.drifting_timeout
+        capture = self.setting.capture
+        reference_img = capture.grab_region(float_region)
+        i = self.setting.profile.drifting_timeout
         while i > 0:
-            i = script.sleep_and_decrease(i, self.setting.check_delay)
-            current_img = pag.screenshot(region=float_region)
-            if not pag.locate(
-                current_img,
+            self._idle(self.setting.profile.check_delay)
+            i -= self.setting.profile.check_delay
+            if not capture.match(
                 reference_img,
+                self.setting.profile.float_confidence,
+                float_region,
                 grayscale=True,
-                confidence=self.setting.float_confidence,
             ):
                 logger.info("Float status changed")
+                self.timer.mark("bite")
                 return
 
         raise TimeoutError
 
     def _pulling_stage(self) -> None:
-        """Pull the fish up, then handle it."""
-        while True:
-            try:
-                self.puller()
-                self._handle_fish()
-                return
-            except exceptions.FishGotAwayError:
-                return
-            except TimeoutError:
-                self._handle_timeout()
-                if self.telescopic:
-                    continue
-                self.tackle.retrieve()
+        """Pull the fish up, then handle it, the reeling ends with this stage."""
+        self.timer.mark("hook")
+        start_time = time.perf_counter()
+        try:
+            while True:
+                try:
+                    self.puller()
+                    self.timer.add_stage_duration("pull", time.perf_counter() - start_time)
+                    self._handle_fish()
+                    return
+                except exceptions.FishGotAwayError:
+                    self.timer.add_stage_duration("pull", time.perf_counter() - start_time)
+                    self._log_cast("missed")
+                    return
+                except TimeoutError:
+                    self._handle_timeout()
+                    if self.telescopic:
+                        continue
+                    self.tackle.retrieve()
+        finally:
+            self.tackle.clicklock.release()
 
     def _handle_fish(self) -> None:
         """Keep or release the fish and record the fish count.
@@ -493,55 +745,254 @@ class Player:
         !! a trophy ruffe will break the checking mechanism?
         """
         logger.info("handling fish")
+        self.tackle.clicklock.release()
 
         if self.setting.screenshot_enabled:
-            self.save_screenshot()
+            self.save_screenshot(self.monitor.get_fish_card_region())
 
-        if self.monitor.is_fish_marked():
+        card = self.monitor.analyze_fish_card(self._get_whitelist())
+        if card.marked:
             self.marked_count += 1
         else:
             self.unmarked_count += 1
             unmarked_release_enabled = self.setting.unmarked_release_enabled
-            if unmarked_release_enabled and not self._is_fish_whitelisted():
+            if unmarked_release_enabled and card.species not in self._get_whitelist():
                 pag.press("backspace")
+                self._log_cast("released")
                 return
 
         # fish is marked, unmarked release is disabled, or fish is in whitelist
-        sleep(self.setting.keep_fish_delay)
+        sleep(self.setting.general.keep_fish_delay)
         pag.press("space")
 
-        self.keep_fish_count += 1
-        if self.keep_fish_count == self.setting.fishes_to_catch:
-            self._handle_full_keepnet()
-
         # avoid wrong cast hour
         if self.special_cast_miss:
             self.timer.update_cast_hour()
-        self.timer.add_cast_hour()
+        self._log_cast("kept")
+
+        self.keep_fish_count += 1
+        if self.keep_fish_count == self.setting.fishes_to_catch:
+            self._handle_full_keepnet()
 
     def _handle_full_keepnet(self):
         msg = "Keepnet is full"
-        match self.setting.keepnet_full_action:
+        match self.setting.general.keepnet_full_action:
             case "alarm":
                 logger.warning(msg)
-                playsound(str(Path(self.setting.alarm_sound_file).resolve()))
+                self.notifier.alarm(msg)
             case "quit":
                 self.general_quit(msg)
             case _:
                 raise ValueError
 
-    def _is_fish_whitelisted(self):
-        if self.setting.unmarked_release_whitelist[0] == "None":
-            return False
+    def _get_whitelist(self) -> tuple[str, ...]:
+        """Getter.
 
-        for species in self.setting.unmarked_release_whitelist:
-            if self.monitor.is_fish_species_matched(species):
-                return True
-        return False
+        :return: species to keep even if they are unmarked
+        :rtype: tuple[str, ...]
+        """
+        if self.setting.general.unmarked_release_whitelist[0] == "None":
+            return ()
+        return self.setting.general.unmarked_release_whitelist
 
     # ---------------------------------------------------------------------------- #
     #                                     misc                                     #
     # ---------------------------------------------------------------------------- #
+    def _get_item_counts(self) -> dict[str, int]:
+        """Getter.
+
+        :return: item name - consumed count mapping
+        :rtype: dict[str, int]
+        """
+        return {
+            "tea": self.tea_count,
+            "carrot": self.carrot_count,
+            "alcohol": self.alcohol_count,
+            "coffee": self.total_coffee_count,
+        }
+
+    def _log_cast(self, outcome: str) -> None:
+        """Record the ongoing cast in the catch database and the event log.
+
+        :param outcome: kept, released, missed, or broken
+        :type outcome: str
+        """
+        marks = self.timer.pop_cast_marks()
+        if marks is None:
+            # no ongoing cast, e.g., it's already logged when a fish captured during
+            # retrieval is kept, or a broken lure is found before casting
+            return
+
+        self.catch_db.add_cast(self.catch_session, *self.timer.get_cast_hour(), outcome)
+        if self.event_log is None:
+            return
+
+        cast_time = marks["cast"]
+        bite_time = marks.get("bite")
+        hook_time = marks.get("hook")
+        durations = marks["durations"]
+
+        item_counts = self._get_item_counts()
+        items_consumed = {
+            item: count - self.pre_item_counts[item]
+            for item, count in item_counts.items()
+            if count != self.pre_item_counts[item]
+        }
+        self.pre_item_counts = item_counts
+
+        detect_count = self.monitor.detect_count - self.pre_detect_count
+        detect_time = self.monitor.detect_time - self.pre_detect_time
+        self.pre_detect_count = self.monitor.detect_count
+        self.pre_detect_time = self.monitor.detect_time
+
+        self.event_log.write(
+            {
+                "time": time.time(),
+                "strategy": self.setting.profile.fishing_strategy,
+                "rod": self.timer.rod,
+                "time_to_bite": _get_elapsed_time(cast_time, bite_time),
+                "time_to_hook": _get_elapsed_time(bite_time or cast_time, hook_time),
+                "retrieval_duration": round(durations.get("retrieval", 0), 3),
+                "pull_duration": round(durations.get("pull", 0), 3),
+                "outcome": outcome,
+                "items_consumed": items_consumed,
+                "detect_count": detect_count,
+                "detect_time": round(detect_time, 3),
+            }
+        )
+
+    def _publish_metrics(self) -> None:
+        """Publish a snapshot of counters and detector statistics."""
+        cur_time = time.perf_counter()
+        detect_count = self.monitor.detect_count
+        detect_time = self.monitor.detect_time
+        elapsed = cur_time - self.pre_publish_time
+        poll_rate = (detect_count - self.pre_publish_detect_count) / elapsed if elapsed else 0
+        avg_latency = detect_time / detect_count if detect_count else 0
+        probe_skip_count, probe_saved_time = self.monitor.get_probe_stats()
+        self.pre_publish_time = cur_time
+        self.pre_publish_detect_count = detect_count
+
+        profile = {"strategy": self.setting.profile.fishing_strategy}
+        items = self._get_item_counts()
+        self.metrics_server.publish(
+            (
+                ("rf4s_info", "gauge", "Running profile.", ((profile, 1),)),
+                (
+                    "rf4s_uptime_seconds",
+                    "counter",
+                    "Time since the fishing loop started.",
+                    ((None, int(time.time() - self.timer.start_time)),),
+                ),
+                (
+                    "rf4s_fish_kept_total",
+                    "counter",
+                    "Fishes kept in the keepnet.",
+                    ((None, self.keep_fish_count),),
+                ),
+                (
+                    "rf4s_fish_marked_total",
+                    "counter",
+                    "Marked fishes caught.",
+                    ((None, self.marked_count),),
+                ),
+                (
+                    "rf4s_fish_unmarked_total",
+                    "counter",
+                    "Unmarked fishes caught.",
+                    ((None, self.unmarked_count),),
+                ),
+                (
+                    "rf4s_cast_miss_total",
+                    "counter",
+                    "Casts without a fish.",
+                    ((None, self.cast_miss_count),),
+                ),
+                (
+                    "rf4s_items_consumed_total",
+                    "counter",
+                    "Consumed items.",
+                    tuple(({"item": item}, count) for item, count in items.items()),
+                ),
+                (
+                    "rf4s_harvest_total",
+                    "counter",
+                    "Baits harvested.",
+                    ((None, self.harvest_count),),
+                ),
+                (
+                    "rf4s_time_to_first_cast_seconds",
+                    "gauge",
+                    "Time between the launch and the first cast.",
+                    ((None, round(self.time_to_first_cast or 0, 3)),),
+                ),
+                (
+                    "rf4s_detect_total",
+                    "counter",
+                    "Screen searches performed.",
+                    ((None, detect_count),),
+                ),
+                (
+                    "rf4s_detect_seconds_total",
+                    "counter",
+                    "Time spent in screen searches.",
+                    ((None, round(detect_time, 3)),),
+                ),
+                (
+                    "rf4s_probe_skip_total",
+                    "counter",
+                    "Template matchings skipped by color probes.",
+                    ((None, probe_skip_count),),
+                ),
+                (
+                    "rf4s_probe_saved_seconds",
+                    "gauge",
+                    "Estimated time saved by color probes.",
+                    ((None, round(probe_saved_time, 3)),),
+                ),
+                (
+                    "rf4s_clicklock_saved_seconds",
+                    "gauge",
+                    "Time saved by keeping clicklock engaged across stages.",
+                    ((None, self.tackle.clicklock.get_saved_time()),),
+                ),
+                (
+                    "rf4s_detect_latency_seconds",
+                    "gauge",
+                    "Average time of a screen search.",
+                    ((None, round(avg_latency, 4)),),
+                ),
+                (
+                    "rf4s_detect_poll_rate",
+                    "gauge",
+                    "Screen searches per second since the last snapshot.",
+                    ((None, round(poll_rate, 3)),),
+                ),
+            )
+        )
+
+    def close(self) -> None:
+        """Flush and stop background services, queued notifications are sent first.
+
+        Shared services are left to their owner, the other windows may still use them.
+        """
+        self._close_service(self.config_watcher)
+        self.notifier.close(NOTIFICATION_TIMEOUT)
+        self._close_service(self.screenshot_writer)
+        if self.event_log is not None:
+            self.event_log.close()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+        self._close_service(self.catch_db)
+
+    def _close_service(self, service: object | None) -> None:
+        """Close a service created by this player.
+
+        :param service: service with a close() method, None if it's disabled
+        :type service: object | None
+        """
+        if service is not None and service not in self.shared_services:
+            service.close()
 
     def general_quit(self, msg: str) -> None:
         """Quit the game through control panel.
@@ -549,15 +1000,11 @@ class Player:
         :param msg: the cause of the termination
         :type msg: str
         """
-        sleep(ANIMATION_DELAY)  # pre-delay
+        self.monitor.wait_until_settled(ANIMATION_DELAY)  # pre-delay
         pag.press("esc")
         pag.click()  # prevent possible stuck
-        sleep(ANIMATION_DELAY)
-        pag.moveTo(self.monitor.get_quit_position())
-        pag.click()
-        sleep(ANIMATION_DELAY)
-        pag.moveTo(self.monitor.get_yes_position())
-        pag.click()
+        if self._click_when_found("Quit button", self.monitor.get_quit_position):
+            self._click_when_found("Yes button", self.monitor.get_yes_position)
 
         self._handle_termination(msg, shutdown=True)
 
@@ -569,16 +1016,31 @@ class Player:
         sleep(DISCONNECTED_DELAY)
 
         pag.press("space")
-        sleep(ANIMATION_DELAY)
-
-        pag.moveTo(self.monitor.get_exit_icon_position())
-        pag.click()
-        sleep(ANIMATION_DELAY)
-        pag.moveTo(self.monitor.get_confirm_exit_icon_position())
-        pag.click()
+        if self._click_when_found("Exit icon", self.monitor.get_exit_icon_position):
+            self._click_when_found(
+                "Confirm exit icon", self.monitor.get_confirm_exit_icon_position
+            )
 
         self._handle_termination("Game disconnected", shutdown=True)
 
+    def _click_when_found(self, name: str, locate: Callable[[], MatchResult]) -> bool:
+        """Wait for a button to appear, then click it.
+
+        :param name: name of the button in the log
+        :type name: str
+        :param locate: detector of the button
+        :type locate: Callable[[], MatchResult]
+        :return: True if the button is clicked, False if it didn't appear
+        :rtype: bool
+        """
+        position = self.monitor.wait_until_settled(ANIMATION_DELAY, locate)
+        if not position:
+            logger.error("%s not found", name)
+            return False
+        pag.moveTo(position.center)
+        pag.click()
+        return True
+
     def gen_result(self, msg: str) -> PrettyTable:
         """Generate a PrettyTable object for display and email based on running results.
 
@@ -599,12 +1061,47 @@ class Player:
         bite_ratio = int(fish_count_total / cast_count * 100) if cast_count != 0 else 0
         hmb_desc = f"{fish_count_total} / {cast_count} / {bite_ratio}%"
 
+        time_to_first_cast = self.timer.get_time_to_first_cast(self.setting.launch_time)
+        ttfc_desc = "N/A" if time_to_first_cast is None else f"{time_to_first_cast:.2f}s"
+
+        totals = self.catch_db.get_profile_totals(self.catch_session)
+        session_total, cast_total, catch_total = totals
+        profile_desc = f"{catch_total} / {cast_total} / {session_total}"
+
+        hold_count, hold_mean, hold_stdev, hold_max = hold_stats.get_summary()
+        if hold_count:
+            hold_desc = (
+                f"{hold_mean * 1000:+.1f} / {hold_stdev * 1000:.1f} / {hold_max * 1000:.1f} ms"
+            )
+        else:
+            hold_desc = "N/A"
+
+        clicklock = self.tackle.clicklock
+        saved_time = clicklock.get_saved_time()
+        saved_per_cast = saved_time / cast_count if cast_count != 0 else 0
+        clicklock_desc = f"{clicklock.reuse_count} / {saved_time:.0f}s / {saved_per_cast:.2f}s"
+        settle_desc = f"{self.monitor.settle_count} / {self.monitor.settle_saved_time:.0f}s"
+
+        score_tracker = self.monitor.score_tracker
+        drift_desc = ", ".join(score_tracker.get_drifting_templates()) or "None"
+        lowest = min(
+            score_tracker.templates.items(),
+            key=lambda item: item[1].min_score - item[1].threshold,
+            default=None,
+        )
+        if lowest is None:
+            margin_desc = "N/A"
+        else:
+            name, stats = lowest
+            margin_desc = f"{name} {stats.min_score:.3f} / {stats.threshold}"
+
         # display_running_results() not applicable for some of the records
         results = (
             ("Cause of termination", msg),
             ("Start time", self.timer.get_start_datetime()),
             ("Finish time", self.timer.get_cur_datetime()),
             ("Running time", self.timer.get_duration()),
+            ("Time to first cast", ttfc_desc),
             ("Fish caught", self.keep_fish_count),
             ("Marked / Unmarked / Mark ratio", mum_desc),
             ("Hit / Miss / Bite ratio", hmb_desc),
@@ -613,6 +1110,12 @@ class Player:
             ("Tea consumed", self.tea_count),
             ("Carrot consumed", self.carrot_count),
             ("Harvest baits count", self.harvest_count),
+            ("Profile catches / casts / sessions", profile_desc),
+            ("Hold error mean / stdev / max", hold_desc),
+            ("Clicklock reuses / time saved / per cast", clicklock_desc),
+            ("Animation waits / time saved", settle_desc),
+            ("Lowest match score / threshold", margin_desc),
+            ("Drifting templates", drift_desc),
         )
 
         table = PrettyTable(header=False, align="l")
@@ -621,113 +1124,36 @@ class Player:
             table.add_row([column_name, attribute_value])
         return table
 
-    def send_email(self, table: PrettyTable) -> None:
-        """Send a notification email to the user's email address.
+    def save_screenshot(self, region: tuple[int, int, int, int] | None = None) -> None:
+        """Capture the screen and save it to screenshots/ in the background.
 
-        :param table: table consisting cause of termination and run-time records
-        :type table: PrettyTable
+        :param region: region to capture, defaults to the whole screen
+        :type region: tuple[int, int, int, int] | None, optional
         """
-        # get environment variables
-        load_dotenv()
-        sender = os.getenv("EMAIL")
-        password = os.getenv("PASSWORD")
-        smtp_server_name = os.getenv("SMTP_SERVER")
-
-        # configure mail info
-        msg = MIMEMultipart()
-        msg["Subject"] = "RussianFishing4Script: Notice of Program Termination"
-        msg["From"] = sender
-        recipients = [sender]
-        msg["To"] = ", ".join(recipients)
-        msg.attach(MIMEText(table.get_html_string(), "html"))
-
-        # send email with SMTP
-        with smtplib.SMTP_SSL(smtp_server_name, 465) as smtp_server:
-            # smtp_server.ehlo()
-            smtp_server.login(sender, password)
-            smtp_server.sendmail(sender, recipients, msg.as_string())
-        print("A notification email has been sent to your email address")
-
-    def send_miaotixing(self, table: PrettyTable) -> None:
-        """Send a notification Message to the user's miaotixing service."""
-
-        # Prepare the data to be sent as query parameters
-        data_dict = {}
-        for row in table.rows:
-            # Assuming each row contains a column name and an attribute value
-            column_name, attribute_value = row
-            data_dict[column_name] = attribute_value
-
-        # Get the environment variable for MIAO_CODE
-        load_dotenv()  # This function is typically used to load environment variables from a .env file
-        miao_code = os.getenv("MIAO_CODE")
-
-        # Customizable Text Prompt Message
-        text = ("Cause of termination：" + data_dict['Cause of termination'] +
-                "\nStart time：" + data_dict['Start time'] +
-                "\nFinish time：" + data_dict['Finish time'] +
-                "\nRunning time：" + data_dict['Running time'] +
-                "\nFish caught：" + str(data_dict['Fish caught']) +
-                "\nMarked / Unmarked / Mark ratio：" + data_dict['Marked / Unmarked / Mark ratio'] +
-                "\nHit / Miss / Bite ratio：" + data_dict['Hit / Miss / Bite ratio'] +
-                "\nAlcohol consumed：" + str(data_dict['Alcohol consumed']) +
-                "\nCoffee consumed：" + str(data_dict['Coffee consumed']) +
-                "\nTea consumed：" + str(data_dict['Tea consumed']) +
-                "\nCarrot consumed：" + str(data_dict['Carrot consumed']) +
-                "\nHarvest baits count：" + str(data_dict['Harvest baits count']))
-
-        # Build the URL with the miao_code and Customizable Text
-        page = request.urlopen(
-            "http://miaotixing.com/trigger?" + parse.urlencode({"id": miao_code, "text": text, "type": "json"}))
-        result = page.read()
-        jsonObj = json.loads(result)
-        if (jsonObj["code"] == 0):
-            print("A notification message to the user's miaotixing service.")
-        else:
-            print("Sending failed with error code:" + str(jsonObj["code"]) + ", Description:" + jsonObj["msg"])
-
-    def save_screenshot(self) -> None:
-        """Save screenshot to screenshots/."""
-        # datetime.now().strftime("%H:%M:%S")
+        capture = self.setting.capture
         pag.press("q")
-        with open(
-            rf"../screenshots/{self.timer.get_cur_timestamp()}.png", "wb"
-        ) as file:
-            pag.screenshot().save(file, "png")
+        image = capture.grab() if region is None else capture.grab_region(region)
         pag.press("esc")
+        name = f"{self.timer.get_cur_timestamp()}{self.setting.window_suffix}"
+        if self.screenshot_writer is None:  # e.g., a broken tackle without -S
+            self.screenshot_writer = create_screenshot_writer(self.setting)
+        self.screenshot_writer.save(image, name)
 
     def plot_and_save(self) -> None:
-        """Plot and save an image using rhour and ghour list from timer object."""
+        """Render a chart of the current session in a separate process.
+
+        The chart is rendered from the catch database by chart.py, so matplotlib
+        is never imported and rendering doesn't delay the termination.
+        """
         if self.keep_fish_count == 0:
             return
 
-        cast_rhour_list, cast_ghour_list = self.timer.get_cast_hour_list()
-        _, ax = plt.subplots(nrows=1, ncols=2)
-        # _.canvas.manager.set_window_title('Record')
-        ax[0].set_ylabel("Fish")
-
-        last_rhour = cast_rhour_list[-1]  # hour: 0, 1, 2, 3, 4, "5"
-        fish_per_rhour = [0] * (last_rhour + 1)  # idx: #(0, 1, 2, 3, 4, 5) = 6
-        for hour in cast_rhour_list:
-            fish_per_rhour[hour] += 1
-        ax[0].plot(range(last_rhour + 1), fish_per_rhour)
-        ax[0].set_title("Fish Caughted per Real Hour")
-        ax[0].set_xticks(range(last_rhour + 2))
-        ax[0].set_xlabel("Hour (real running time)")
-        ax[0].yaxis.set_major_locator(MaxNLocator(integer=True))
-
-        fish_per_ghour = [0] * 24
-        for hour in cast_ghour_list:
-            fish_per_ghour[hour] += 1
-        ax[1].bar(range(0, 24), fish_per_ghour)
-        ax[1].set_title("Fish Caughted per Game Hour")
-        ax[1].set_xticks(range(0, 24, 2))
-        ax[1].set_xlabel("Hour (game time)")
-        ax[1].yaxis.set_major_locator(MaxNLocator(integer=True))
-
-        # plt.tight_layout()
-        plt.savefig(f"../logs/{self.timer.get_cur_timestamp()}.png")
-        print("The Plot has been saved under logs/")
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, CHART_SCRIPT, "-s", str(self.catch_session.id)],
+            cwd=CHART_SCRIPT.parent,
+            creationflags=getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0),
+        )
+        print("The Plot will be saved under logs/")
 
     def _handle_expired_ticket(self):
         """Select and use the ticket according to boat_ticket_duration argument."""
@@ -738,89 +1164,82 @@ class Player:
 
         logger.info("Renewing boat ticket")
         ticket_loc = self.monitor.get_ticket_position(self.setting.boat_ticket_duration)
-        if ticket_loc is None:
+        if not ticket_loc:
             pag.press("esc")  # quit ticket menu
-            sleep(ANIMATION_DELAY)
+            self.monitor.wait_until_settled(ANIMATION_DELAY)
             self.general_quit("Boat ticket not found")
-        pag.moveTo(ticket_loc)
+        pag.moveTo(ticket_loc.center)
         pag.click(clicks=2, interval=0.1)  # pag.doubleClick() not implemented
-        sleep(ANIMATION_DELAY)
+        self.monitor.wait_until_settled(ANIMATION_DELAY)
 
     def _replace_broken_lures(self):
         """Replace multiple broken items (lures)."""
         logger.info("Replacing broken lures")
         # open tackle menu
         pag.press("v")
-        sleep(ANIMATION_DELAY)
-
-        scrollbar_position = self.monitor.get_scrollbar_position()
-        if scrollbar_position is None:
+        scrollbar_position = self.monitor.wait_until_settled(
+            ANIMATION_DELAY, self.monitor.get_scrollbar_position
+        )
+        if not scrollbar_position:
             logger.info("Scroll bar not found, changing lures for normal rig")
-            while self._open_broken_lure_menu():
-                self._replace_selected_item()
+            self._replace_broken_items()
             pag.press("v")
             return
 
         logger.info("Scroll bar found, changing lures for dropshot rig")
-        pag.moveTo(scrollbar_position)
+        pag.moveTo(scrollbar_position.center)
         for _ in range(5):
-            sleep(1)
             pag.drag(xOffset=0, yOffset=125, duration=0.5, button="left")
-
-            replaced = False
-            while self._open_broken_lure_menu():
-                self._replace_selected_item()
-                replaced = True
-
-            if replaced:
-                pag.moveTo(self.monitor.get_scrollbar_position())
+            self.monitor.wait_until_settled(ANIMATION_DELAY)
+            if self._replace_broken_items():
+                pag.moveTo(self.monitor.get_scrollbar_position().center)
         pag.press("v")
-        sleep(ANIMATION_DELAY)
+        self.monitor.wait_until_settled(ANIMATION_DELAY)
+
+    def _replace_broken_items(self) -> bool:
+        """Replace all broken items visible in the tackle panel.
 
-    def _open_broken_lure_menu(self) -> bool:
-        """Search for text of broken item, open selection menu if found.
+        The broken items are found in a single capture before clicking anything,
+        replacing an item doesn't move the others.
 
-        :return: True if broken item is found, False otherwise
+        :return: True if any item is replaced, False otherwise
         :rtype: bool
         """
         logger.info("Searching for broken lure")
-        broken_item_position = self.monitor.get_100wear_position()
-        if broken_item_position is None:
+        broken_item_positions = self.monitor.scan_broken_items()
+        if not broken_item_positions:
             logger.warning("Broken lure not found")
             return False
 
-        # click item to open selection menu
-        logger.info("Broken lure found")
-        pag.moveTo(broken_item_position)
-        sleep(ANIMATION_DELAY)
-        pag.click()
-        sleep(ANIMATION_DELAY)
+        logger.info("%d broken lure(s) found", len(broken_item_positions))
+        for position in broken_item_positions:
+            # click item to open selection menu
+            pag.moveTo(position)
+            self.monitor.wait_until_settled(ANIMATION_DELAY)
+            pag.click()
+            self.monitor.wait_until_settled(ANIMATION_DELAY)
+            self._replace_selected_item()
         return True
 
     def _replace_selected_item(self) -> None:
         """Search for favorite items for replacement and skip the broken ones."""
         logger.info("Search for favorite items")
-        favorite_item_positions = self.monitor.get_favorite_item_positions()
-        while True:
-            favorite_item_position = next(favorite_item_positions, None)
-            if favorite_item_position is None:
-                msg = "Lure for replacement not found"
-                logger.warning(msg)
-                pag.press("esc")
-                sleep(ANIMATION_DELAY)
-                pag.press("esc")
-                sleep(ANIMATION_DELAY)
-                self.general_quit(msg)
+        usable_positions, broken_count = self.monitor.scan_usable_favorites()
+        if broken_count:
+            logger.warning("%d lure(s) for replacement found but already broken", broken_count)
+        if not usable_positions:
+            msg = "Lure for replacement not found"
+            logger.warning(msg)
+            pag.press("esc")
+            self.monitor.wait_until_settled(ANIMATION_DELAY)
+            pag.press("esc")
+            self.monitor.wait_until_settled(ANIMATION_DELAY)
+            self.general_quit(msg)
 
-            # check if the lure for replacement is already broken
-            x, y = script.get_box_center(favorite_item_position)
-            if pag.pixel(x - 75, y + 190) != (178, 59, 30):  # magic value
-                logger.info("The broken lure has been replaced")
-                pag.moveTo(x - 75, y + 190)
-                pag.click(clicks=2, interval=0.1)
-                sleep(WEAR_TEXT_UPDATE_DELAY)
-                break
-            logger.warning("Lure for replacement found but already broken")
+        logger.info("The broken lure has been replaced")
+        pag.moveTo(usable_positions[0])
+        pag.click(clicks=2, interval=0.1)
+        self.monitor.wait_until_settled(ANIMATION_DELAY)
 
     def _put_tackle_back(self, check_miss_counts: list[int], rod_idx: int) -> None:
         """Update counters, put down the tackle and wait for a while.
@@ -832,8 +1251,9 @@ class Player:
         """
 ##        
         print("Checking fishing rod...")
-        deviation = random.uniform(self.setting.min_deviation, self.setting.max_deviation)
-        next_interval = self.setting.check_delay + deviation
+        profile = self.setting.profile
+        deviation = random.uniform(profile.min_deviation, profile.max_deviation)
+        next_interval = profile.check_delay + deviation
         print (f"Next check in {next_interval:.2f} seconds.")
         
         check_miss_counts[rod_idx] += 1
@@ -844,10 +1264,41 @@ class Player:
             pag.click()
 
         pag.press("0")
-        time.sleep(next_interval)
+        self._idle(next_interval)
+
+
+def create_screenshot_writer(setting: Setting) -> ScreenshotWriter:
+    """Create the background writer of screenshots/.
+
+    :param setting: setting node with the screenshot configs
+    :type setting: Setting
+    :return: screenshot writer with the configured format and quota
+    :rtype: ScreenshotWriter
+    """
+    return ScreenshotWriter(
+        "../screenshots",
+        setting.general.screenshot_format,
+        setting.general.screenshot_quality,
+        setting.general.screenshot_quota,
+    )
+
+
+def _get_elapsed_time(start: float | None, end: float | None) -> float | None:
+    """Calculate the elapsed time between two perf_counter() timestamps.
+
+    :param start: start timestamp, None if unknown
+    :type start: float | None
+    :param end: end timestamp, None if the event didn't happen
+    :type end: float | None
+    :return: elapsed time rounded to milliseconds, None if unavailable
+    :rtype: float | None
+    """
+    if start is None or end is None:
+        return None
+    return round(end - start, 3)
 
 
-# sleep(self.setting.pull_delay + random.uniform(0.5, 1.5))
+# sleep(self.setting.profile.pull_delay + random.uniform(0.5, 1.5))
 
 # head up backup
 # win32api.mouse_event(win32con.MOUSEEVENTF_MOVE, int(0), int(-200), 0, 0)
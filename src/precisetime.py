@@ -0,0 +1,104 @@
+"""
+High-resolution waits for input holds.
+
+time.sleep() may overshoot by up to a scheduler tick, 15.6 ms on Windows with the
+default timer resolution. precise_sleep() sleeps until shortly before the
+deadline, then spins on the monotonic performance counter for the rest. The
+spin margin adapts to the overshoots observed, so the CPU is only busy for the
+last few milliseconds.
+"""
+
+import statistics
+import threading
+import time
+
+MIN_SPIN = 0.001
+MAX_SPIN = 0.02
+SPIN_FACTOR = 1.5  # margin over the worst recent overshoot
+OVERSHOOT_WINDOW = 16
+
+
+class HoldStats:
+    """Errors between requested and achieved hold durations."""
+
+    def __init__(self):
+        """Initialize the records."""
+        self._lock = threading.Lock()
+        self.errors = []  # achieved - requested, in seconds
+
+    def record(self, requested: float, achieved: float) -> None:
+        """Record a hold.
+
+        :param requested: requested duration
+        :type requested: float
+        :param achieved: measured duration
+        :type achieved: float
+        """
+        with self._lock:
+            self.errors.append(achieved - requested)
+
+    def get_summary(self) -> tuple[int, float, float, float]:
+        """Getter.
+
+        :return: number of holds, mean error, standard deviation and maximum
+            absolute error in seconds
+        :rtype: tuple[int, float, float, float]
+        """
+        with self._lock:
+            errors = list(self.errors)
+        if not errors:
+            return 0, 0.0, 0.0, 0.0
+        stdev = statistics.pstdev(errors)
+        return len(errors), statistics.fmean(errors), stdev, max(map(abs, errors))
+
+
+class PreciseSleeper:
+    """Hybrid sleep and spin with an adaptive spin margin."""
+
+    def __init__(self):
+        """Start with the largest spin margin until overshoots are observed."""
+        self._overshoots = []
+        self.spin = MAX_SPIN
+
+    def sleep(self, duration: float) -> float:
+        """Wait for the duration precisely.
+
+        :param duration: wait time in seconds
+        :type duration: float
+        :return: achieved wait time
+        :rtype: float
+        """
+        start_time = time.perf_counter()
+        deadline = start_time + duration
+        coarse = duration - self.spin
+        if coarse > 0:
+            time.sleep(coarse)
+            self._record_overshoot(time.perf_counter() - (start_time + coarse))
+        while time.perf_counter() < deadline:
+            pass
+        return time.perf_counter() - start_time
+
+    def _record_overshoot(self, overshoot: float) -> None:
+        """Adapt the spin margin to the recent overshoots of time.sleep().
+
+        :param overshoot: delay of the coarse sleep after its deadline
+        :type overshoot: float
+        """
+        self._overshoots.append(max(0.0, overshoot))
+        del self._overshoots[:-OVERSHOOT_WINDOW]
+        self.spin = min(MAX_SPIN, max(MIN_SPIN, max(self._overshoots) * SPIN_FACTOR))
+
+
+_sleeper = PreciseSleeper()
+hold_stats = HoldStats()
+
+
+def precise_sleep(duration: float) -> float:
+    """Wait for the duration with the shared sleeper.
+
+    :param duration: wait time in seconds
+    :type duration: float
+    :return: achieved wait time
+    :rtype: float
+    """
+    return _sleeper.sleep(duration)
@@ -1,10 +1,3 @@
 @echo off
-start "PythonScript" python app.py -p 5
-setlocal enabledelayedexpansion
-
-for /f "tokens=2 delims=," %%a in ('tasklist /fi "imagename eq python.exe" /fo csv /nh') do (
-	set pid=%%a
-)
-
-timeout /t 1400 /nobreak
-taskkill /pid %pid% /f
\ No newline at end of file
+::Fish with profile 5 for 23m20s, then quit
+python app.py --schedule "5:23m20s quit"
\ No newline at end of file
@@ -1,4 +1,3 @@
 @echo off
-python app.py -p 6
-timeout /t 1800 /nobreak
-taskkill /im /f python.exe
\ No newline at end of file
+::Fish with profile 6 for 30m, then quit
+python app.py --schedule "6:30m quit"
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Module for Scheduler class, run/pause windows and profile rotations of a session.
+
+A schedule is a space-separated list of windows:
+    PID:DURATION    fish with the given profile for the duration
+    pause:DURATION  stop fishing for the duration
+    quit            terminate the script
+
+Durations are written like 90s, 30m, 1h or 1h30m. The schedule is repeated
+unless it ends with quit, e.g., "5:30m pause:30m 6:1h quit".
+"""
+
+import logging
+import re
+import time
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+DURATION_PATTERN = re.compile(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?")
+
+
+class Window(NamedTuple):
+    """A window of the schedule, pid is None for pause and quit windows."""
+
+    action: str  # fish, pause, or quit
+    pid: int | None
+    duration: float
+
+
+def parse_duration(duration: str) -> float:
+    """Convert a duration like 1h30m into seconds.
+
+    :param duration: duration string
+    :type duration: str
+    :raises ValueError: invalid duration
+    :return: duration in seconds
+    :rtype: float
+    """
+    match = DURATION_PATTERN.fullmatch(duration)
+    if not duration or match is None:
+        raise ValueError(f"Invalid duration '{duration}'")
+    hours, minutes, seconds = (int(value or 0) for value in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_schedule(spec: str) -> tuple[Window, ...]:
+    """Parse a schedule string into windows.
+
+    :param spec: schedule string, e.g., "5:30m pause:30m 6:1h"
+    :type spec: str
+    :raises ValueError: invalid schedule
+    :return: windows of the schedule
+    :rtype: tuple[Window, ...]
+    """
+    windows = []
+    tokens = spec.split()
+    for i, token in enumerate(tokens):
+        if token == "quit":
+            if i != len(tokens) - 1:
+                raise ValueError("quit must be the last window of the schedule")
+            windows.append(Window("quit", None, 0))
+            continue
+
+        name, _, duration = token.partition(":")
+        if name == "pause":
+            windows.append(Window("pause", None, parse_duration(duration)))
+        elif name.isdigit():
+            windows.append(Window("fish", int(name), parse_duration(duration)))
+        else:
+            raise ValueError(f"Invalid window '{token}'")
+
+    if not any(window.action == "fish" for window in windows):
+        raise ValueError("Schedule contains no fishing window")
+    return tuple(windows)
+
+
+class Scheduler:
+    """Track the current window of a schedule."""
+
+    def __init__(self, spec: str):
+        """Parse the schedule and enter its first window.
+
+        :param spec: schedule string
+        :type spec: str
+        :raises ValueError: invalid schedule
+        """
+        self.windows = parse_schedule(spec)
+        self.idx = 0
+        self.end_time = time.monotonic() + self.windows[0].duration
+
+    @property
+    def window(self) -> Window:
+        """Getter.
+
+        :return: current window
+        :rtype: Window
+        """
+        return self.windows[self.idx]
+
+    def get_remaining_time(self) -> float:
+        """Getter.
+
+        :return: remaining time of the current window in seconds
+        :rtype: float
+        """
+        return max(0, self.end_time - time.monotonic())
+
+    def poll(self) -> Window | None:
+        """Advance to the next window if the current one is over.
+
+        :return: the new window, None if the current window is not over
+        :rtype: Window | None
+        """
+        if self.window.action == "quit" or time.monotonic() < self.end_time:
+            return None
+        self.idx = (self.idx + 1) % len(self.windows)
+        # keep the schedule aligned with its planned times, unless the safe point
+        # was reached so late that the whole window would be skipped
+        now = time.monotonic()
+        start_time = self.end_time if now - self.end_time < self.window.duration else now
+        self.end_time = start_time + self.window.duration
+        logger.info("Schedule: %s", _describe(self.window))
+        return self.window
+
+
+def _describe(window: Window) -> str:
+    """Format a window for logging.
+
+    :param window: window of the schedule
+    :type window: Window
+    :return: description
+    :rtype: str
+    """
+    match window.action:
+        case "fish":
+            return f"fish with profile {window.pid} for {window.duration / 60:.0f} minutes"
+        case "pause":
+            return f"pause for {window.duration / 60:.0f} minutes"
+    return "quit"
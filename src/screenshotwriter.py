@@ -0,0 +1,124 @@
+"""
+Module for ScreenshotWriter class, a background screenshot encoder.
+
+The fishing loop only captures the image, encoding and writing are done by a
+small thread pool. The oldest screenshots are deleted when the total size of
+the directory exceeds the quota, files not named by the bot are never touched.
+"""
+
+import logging
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+ENCODER_WORKERS = 2
+PNG_COMPRESS_LEVEL = 1  # fastest level that still compresses, Pillow uses 6 by default
+WEBP_METHOD = 0  # fastest encoding
+EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+# timestamp of Timer.get_cur_timestamp() and the optional suffix of the window
+NAME_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}--\d{2}-\d{2}-\d{2}(-w\d+)?\.(png|jpg|webp)")
+
+
+class ScreenshotWriter:
+    """Encode and save screenshots in background threads with a disk quota."""
+
+    def __init__(self, directory: str, image_format: str, quality: int, quota: float):
+        """Index existing screenshots and start the encoder pool.
+
+        :param directory: directory of the screenshots
+        :type directory: str
+        :param image_format: png, jpeg, or webp
+        :type image_format: str
+        :param quality: quality of jpeg and webp, 1 ~ 100
+        :type quality: int
+        :param quota: maximum total size of the directory in MB, 0 for unlimited
+        :type quota: float
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(exist_ok=True)
+        self.image_format = image_format
+        self.extension = EXTENSIONS[image_format]
+        match image_format:
+            case "png":
+                self.params = {"compress_level": PNG_COMPRESS_LEVEL}
+            case "jpeg":
+                self.params = {"quality": quality}
+            case "webp":
+                self.params = {"quality": quality, "method": WEBP_METHOD}
+        self.quota = int(quota * 1024 * 1024)
+
+        # oldest first, the ring is shared by the workers
+        self._lock = threading.Lock()
+        self._files = deque()
+        self._total_size = 0
+        if self.quota:
+            paths = [
+                path
+                for path in self.directory.iterdir()
+                if NAME_PATTERN.fullmatch(path.name) and path.is_file()
+            ]
+            for path in sorted(paths, key=lambda path: path.stat().st_mtime_ns):
+                self._add_file(path)
+            self._enforce_quota()
+
+        self._executor = ThreadPoolExecutor(ENCODER_WORKERS, thread_name_prefix="screenshot")
+
+    def save(self, image: Image.Image, name: str) -> None:
+        """Queue a captured image for encoding, this method never blocks.
+
+        :param image: captured screenshot
+        :type image: Image.Image
+        :param name: file name without extension
+        :type name: str
+        """
+        path = self.directory / f"{name}.{self.extension}"
+        self._executor.submit(self._write, image, path)
+
+    def _write(self, image: Image.Image, path: Path) -> None:
+        """Encode and write an image, then enforce the quota.
+
+        :param image: captured screenshot
+        :type image: Image.Image
+        :param path: output path
+        :type path: Path
+        """
+        try:
+            image.save(path, self.image_format, **self.params)
+        except OSError as e:
+            logger.error("Failed to save screenshot %s: %s", path, e)
+            return
+        if self.quota:
+            with self._lock:
+                self._add_file(path)
+                self._enforce_quota()
+
+    def _add_file(self, path: Path) -> None:
+        """Append a file to the ring.
+
+        :param path: path of the file
+        :type path: Path
+        """
+        size = path.stat().st_size
+        self._files.append((path, size))
+        self._total_size += size
+
+    def _enforce_quota(self) -> None:
+        """Delete the oldest files until the total size is within the quota."""
+        # always keep the latest one even if it alone exceeds the quota
+        while self._total_size > self.quota and len(self._files) > 1:
+            path, size = self._files.popleft()
+            self._total_size -= size
+            try:
+                path.unlink()
+            except OSError:
+                logger.warning("Failed to delete screenshot %s", path)
+
+    def close(self) -> None:
+        """Wait for queued screenshots to be written."""
+        self._executor.shutdown(wait=True)
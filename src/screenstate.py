@@ -0,0 +1,194 @@
+"""
+Classify the screen into known UI states with nearest neighbors.
+
+Frames are reduced to small normalized thumbnails and compared with the labeled
+frames of recorded sessions, which takes a few milliseconds instead of a
+template search per state. Frames are sorted into directories named after their
+state, like the frame set of calibrate.py:
+
+    FRAMES/fishing/*.png
+    FRAMES/disconnected/*.png
+
+Training writes screenstates.npz, which Monitor loads if it exists.
+
+Usage: screenstate.py FRAMES [-h] [-k K]
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = Path(__file__).resolve().parents[1] / "screenstates.npz"
+STATES = ("fishing", "fish_card", "menu", "inventory", "broken", "disconnected", "ticket")
+THUMBNAIL_SIZE = (32, 18)  # width, height
+NEIGHBORS = 3
+# frames farther than this from every labeled one are unknown, the features are
+# unit vectors so distances are in [0, 2]
+MAX_DISTANCE = 0.6
+FRAME_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def extract_features(frame: np.ndarray) -> np.ndarray:
+    """Reduce a frame to a normalized thumbnail vector.
+
+    The thumbnail is centered and scaled to unit length, so the brightness of the
+    scene matters less than its layout.
+
+    :param frame: image in RGB or BGR format, the same for training and use
+    :type frame: np.ndarray
+    :return: feature vector
+    :rtype: np.ndarray
+    """
+    thumbnail = cv2.resize(frame[:, :, :3], THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+    features = thumbnail.astype(np.float32).ravel()
+    features -= features.mean()
+    norm = np.linalg.norm(features)
+    return features / norm if norm else features
+
+
+class ScreenClassifier:
+    """k-nearest neighbors over the thumbnails of labeled frames."""
+
+    def __init__(self, features: np.ndarray, labels: np.ndarray, k: int = NEIGHBORS):
+        """Initialize the classifier.
+
+        :param features: feature vectors of shape (n, d)
+        :type features: np.ndarray
+        :param labels: state of every vector
+        :type labels: np.ndarray
+        :param k: number of neighbors to vote, defaults to NEIGHBORS
+        :type k: int, optional
+        """
+        self.features = features
+        self.labels = labels
+        self.k = min(k, len(labels))
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> "ScreenClassifier | None":
+        """Load a trained classifier.
+
+        :param path: path of the model, defaults to MODEL_PATH
+        :type path: Path, optional
+        :return: classifier, None if it's not trained
+        :rtype: ScreenClassifier | None
+        """
+        try:
+            with np.load(path) as model:
+                return cls(model["features"], model["labels"], int(model["k"]))
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError):
+            logger.warning("%s is invalid, retrain it with screenstate.py", path.name)
+            return None
+
+    def save(self, path: Path = MODEL_PATH) -> None:
+        """Save the classifier.
+
+        :param path: path of the model, defaults to MODEL_PATH
+        :type path: Path, optional
+        """
+        np.savez_compressed(path, features=self.features, labels=self.labels, k=self.k)
+
+    def classify(self, frame: np.ndarray) -> tuple[str | None, float]:
+        """Label a frame with the majority state of its nearest neighbors.
+
+        :param frame: image in the format of the training frames
+        :type frame: np.ndarray
+        :return: state, None if the frame is unlike all labeled ones, and the
+            distance to the nearest neighbor
+        :rtype: tuple[str | None, float]
+        """
+        return self.classify_features(extract_features(frame))
+
+    def classify_features(self, features: np.ndarray) -> tuple[str | None, float]:
+        """Label a feature vector, see classify().
+
+        :param features: feature vector from extract_features()
+        :type features: np.ndarray
+        :return: state or None, and the distance to the nearest neighbor
+        :rtype: tuple[str | None, float]
+        """
+        distances = np.linalg.norm(self.features - features, axis=1)
+        nearest = np.argpartition(distances, self.k - 1)[: self.k]
+        min_distance = float(distances[nearest].min())
+        if min_distance > MAX_DISTANCE:
+            return None, min_distance
+        states, votes = np.unique(self.labels[nearest], return_counts=True)
+        return str(states[votes.argmax()]), min_distance
+
+
+def load_frames(frame_dir: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Extract the features of the labeled frames.
+
+    :param frame_dir: directory of the frame set
+    :type frame_dir: Path
+    :return: feature vectors and their states
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    features, labels = [], []
+    for state_dir in sorted(path for path in frame_dir.iterdir() if path.is_dir()):
+        if state_dir.name not in STATES:
+            logger.warning("Unknown state '%s', skipped", state_dir.name)
+            continue
+        for path in sorted(state_dir.iterdir()):
+            if path.suffix.lower() not in FRAME_SUFFIXES:
+                continue
+            frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if frame is None:
+                logger.warning("Failed to read %s, skipped", path)
+                continue
+            # frames are captured in RGB at runtime
+            features.append(extract_features(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+            labels.append(state_dir.name)
+    return np.array(features), np.array(labels)
+
+
+def get_loo_accuracy(features: np.ndarray, labels: np.ndarray, k: int) -> float:
+    """Estimate the accuracy by classifying every frame with the others.
+
+    :param features: feature vectors
+    :type features: np.ndarray
+    :param labels: states of the vectors
+    :type labels: np.ndarray
+    :param k: number of neighbors to vote
+    :type k: int
+    :return: leave-one-out accuracy
+    :rtype: float
+    """
+    hits = 0
+    for i in range(len(labels)):
+        others = np.arange(len(labels)) != i
+        classifier = ScreenClassifier(features[others], labels[others], k)
+        hits += classifier.classify_features(features[i])[0] == labels[i]
+    return hits / len(labels)
+
+
+def parse_args() -> argparse.Namespace:
+    """Cofigure argparser and parse the command line arguments.
+
+    :return: parsed args
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Train the screen state classifier.")
+    parser.add_argument("frames", type=Path, metavar="FRAMES", help="Labeled frame directory")
+    parser.add_argument("-k", type=int, default=NEIGHBORS, help="Number of neighbors")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
+    arguments = parse_args()
+    frame_features, frame_labels = load_frames(arguments.frames)
+    if len(frame_labels) <= arguments.k:
+        raise SystemExit(f"At least {arguments.k + 1} labeled frames are required")
+    for name in STATES:
+        print(f"{name}: {np.count_nonzero(frame_labels == name)} frames")
+    accuracy = get_loo_accuracy(frame_features, frame_labels, arguments.k)
+    print(f"Leave-one-out accuracy: {accuracy:.1%}")
+    ScreenClassifier(frame_features, frame_labels, arguments.k).save()
+    print(f"Saved to {MODEL_PATH}")
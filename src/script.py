@@ -3,18 +3,37 @@ Some helper functions.
 """
 
 import sys
+import time
 from time import sleep
 
 import pyautogui as pag
 from prettytable import PrettyTable
-from pyscreeze import Box
 
+import exceptions
 from monitor import Monitor
+from precisetime import hold_stats, precise_sleep
 from setting import Setting
 
-# BASE_DELAY + LOOP_DELAY >= 2.2 to trigger clicklock
-BASE_DELAY = 1
-LOOP_DELAY = 2
+CLICKLOCK_DURATION = 2.2
+
+
+def _hold_button(button: str, duration: float) -> None:
+    """Hold a mouse button for a precise duration.
+
+    The pause of pyautogui after mouseDown() is skipped, it used to lengthen
+    every hold by about 0.1 second.
+
+    :param button: left or right
+    :type button: str
+    :param duration: hold time
+    :type duration: float
+    """
+    pag.mouseDown(button=button, _pause=False)
+    start_time = time.perf_counter()
+    precise_sleep(duration)
+    achieved = time.perf_counter() - start_time
+    pag.mouseUp(button=button)
+    hold_stats.record(duration, achieved)
 
 
 def hold_left_click(duration: float = 1) -> None:
@@ -23,10 +42,8 @@ def hold_left_click(duration: float = 1) -> None:
     :param duration: hold time, defaults to 1
     :type duration: float, optional
     """
-    pag.mouseDown()
-    sleep(duration)
-    pag.mouseUp()
-    if duration >= 2.1:  # + 0.1 due to pag.mouseDown() delay
+    _hold_button("left", duration)
+    if duration >= CLICKLOCK_DURATION:
         pag.click()
 
 
@@ -36,9 +53,7 @@ def hold_right_click(duration: float = 1) -> None:
     :param duration: hold time, defaults to 1
     :type duration: float, optional
     """
-    pag.mouseDown(button="right")
-    sleep(duration)
-    pag.mouseUp(button="right")
+    _hold_button("right", duration)
 
 
 def sleep_and_decrease(num: int, delay: int) -> int:
@@ -86,19 +101,6 @@ def display_running_results(app: object, result_map: tuple[tuple]) -> None:
     print(table)
 
 
-def get_box_center(box: Box) -> tuple[int, int]:
-    """Get the center coordinate (x, y) of the given box.
-
-    # (x, y, w, h) -> (x, y), np.int64 -> int
-
-    :param box: box coordinates (x, y, w, h)
-    :type box: Box
-    :return: x and y coordinates of the center point
-    :rtype: tuple[int, int]
-    """
-    return int(box.left + box.width // 2), int(box.top + box.height // 2)
-
-
 def initialize_setting_and_monitor(args_map: tuple[tuple]) -> None:
     """Initialize a setting node and a screen monitor for given application.
 
@@ -122,16 +124,21 @@ def initialize_setting_and_monitor(args_map: tuple[tuple]) -> None:
 
 
 def toggle_clicklock(func):
-    """Toggle clicklock before and after calling the function."""
+    """Engage clicklock before calling the function.
+
+    The ClickLock of the tackle stays engaged for the next reeling stage if the
+    function succeeds or a fish is hooked, the player releases it when the
+    reeling ends or before other inputs.
+    """
 
     def wrapper(self, *args):
-        pag.mouseDown()
-        sleep(BASE_DELAY + LOOP_DELAY)
+        self.clicklock.engage()
         try:
             func(self, *args)
-            pag.click()
+        except exceptions.FishHookedError:
+            raise
         except Exception as e:
-            pag.click()
+            self.clicklock.release()
             raise e
 
     return wrapper
@@ -189,7 +196,7 @@ def start_app(app: object, results: tuple[tuple]):
     :type results: tuple[tuple]
     """
 
-    if app.setting.confirmation_enabled:
+    if app.setting.general.confirmation_enabled:
         ask_for_confirmation()
     app.setting.window_controller.activate_game_window()
     try:
@@ -1,20 +1,32 @@
 """
-Module for SettingHandler class, not used yet.
+Module for Setting class and the compiled configuration of config.ini.
+
+config.ini is compiled into immutable, slotted dataclasses that are validated at
+load time and cached on disk, keyed by the modification time of config.ini.
 """
 
 import configparser
+import dataclasses
+import json
 import logging
 import pathlib
+import re
 from argparse import Namespace
 
+from exceptions import ConfigError
 from windowcontroller import WindowController
 
 logger = logging.getLogger(__name__)
 
+CONFIG_PATH = pathlib.Path(__file__).resolve().parents[1] / "config.ini"
+CACHE_PATH = pathlib.Path(__file__).resolve().parents[1] / ".config_cache.json"
+CACHE_VERSION = 2  # bump when the compiled keys change
+
 # -------------------- attribute name - column name - type ------------------- #
 GENERAL_CONFIGS = (
     ("language", "Language", str),
     ("window_size", "Window size", str),
+    ("ui_scale", "UI scale", float),
     ("default_arguments", "Default arguments", str),
     ("confirmation_enabled", "Enable confirmation", bool),
     ("SMTP_validation_enabled", "Enable SMTP validation", bool),
@@ -29,6 +41,10 @@ GENERAL_CONFIGS = (
     ("lure_broken_action", "Lure broken action", str),
     ("keepnet_full_action", "Keep net full action", str),
     ("alarm_sound_file", "Alarm sound file", str),
+    ("screenshot_format", "Screenshot format", str),
+    ("screenshot_quality", "Screenshot quality", int),
+    ("screenshot_quota", "Screenshot quota", float),
+    ("config_reload_enabled", "Enable config reload", bool),
     ("unmarked_release_whitelist", "Unmarked release whitelist", str),
 )
 
@@ -87,72 +103,335 @@ SPECIAL_CONFIGS = {
 }
 
 
+# --------------------------- attribute name - choices -------------------------- #
+CHOICES = {
+    "fishing_strategy": tuple(SPECIAL_CONFIGS),
+    "post_acceleration_enabled": ("always", "never", "auto"),
+    "lure_broken_action": ("quit", "alarm", "replace"),
+    "keepnet_full_action": ("quit", "alarm"),
+    "screenshot_format": ("png", "jpeg", "webp"),
+}
+
+# ----------------------- attribute name - fallback value ----------------------- #
+FALLBACKS = {
+    "ui_scale": "1",
+    "screenshot_format": "png",
+    "screenshot_quality": "90",
+    "screenshot_quota": "0",
+    "config_reload_enabled": "True",
+    "post_acceleration_enabled": "never",
+    "pre_acceleration_enabled": "False",
+}
+
+# ------------------ general configs that need a restart to apply ----------------- #
+RESTART_CONFIGS = ("language", "window_size", "ui_scale", "keepnet_limit")
+
+# ---------------------- attribute name - min value - max value ---------------------- #
+RANGES = {
+    "cast_power_level": (1, 5),
+    "energy_threshold": (0, 1),
+    "retrieval_detect_confidence": (0, 1),
+    "float_confidence": (0, 1),
+    "ui_scale": (0.5, 2),
+    "screenshot_quality": (1, 100),
+    "screenshot_quota": (0, float("inf")),
+}
+
+
+def _make_config_class(name: str, configs: tuple[tuple], bases: tuple = ()) -> type:
+    """Generate an immutable, slotted dataclass from a config table.
+
+    :param name: class name
+    :type name: str
+    :param configs: attribute name - column name - type table
+    :type configs: tuple[tuple]
+    :param bases: base classes, defaults to ()
+    :type bases: tuple, optional
+    :return: generated dataclass
+    :rtype: type
+    """
+    fields = [(attribute_name, var_type) for attribute_name, _, var_type in configs]
+    cls = dataclasses.make_dataclass(name, fields, bases=bases, frozen=True, slots=True)
+    cls.__module__ = __name__
+    return cls
+
+
+GeneralConfig = _make_config_class(
+    "GeneralConfig",
+    GENERAL_CONFIGS + (("bottom_rods_shortcuts", "Bottom rods", tuple),)
+    + tuple((attribute_name, "", str) for _, attribute_name in SHORTCUTS[:-2])
+    + (("quitting_shortcut", "Quit", str),),
+)
+Profile = _make_config_class("Profile", (("name", "Profile name", str),) + COMMON_CONFIGS)
+PROFILE_CLASSES = {
+    strategy: _make_config_class(
+        "".join(word.capitalize() for word in strategy.split("_")) + "Profile",
+        special_configs,
+        (Profile,),
+    )
+    for strategy, special_configs in SPECIAL_CONFIGS.items()
+}
+
+
+def _convert(section: str, attribute_name: str, value: str | None, var_type: type):
+    """Convert and validate a raw value from config.ini.
+
+    :param section: section name, for error messages
+    :type section: str
+    :param attribute_name: attribute name
+    :type attribute_name: str
+    :param value: raw value
+    :type value: str | None
+    :param var_type: target type
+    :type var_type: type
+    :raises ConfigError: value is missing or invalid
+    :return: converted value
+    """
+    if value is None:
+        raise ConfigError(f"Key '{attribute_name}' not found in section '{section}'")
+
+    try:
+        if var_type == bool:
+            converted = configparser.ConfigParser.BOOLEAN_STATES[value.lower()]
+        else:
+            converted = var_type(value)
+    except (KeyError, ValueError) as e:
+        raise ConfigError(
+            f"Invalid {var_type.__name__} value '{value}' of '{attribute_name}' "
+            f"in section '{section}'"
+        ) from e
+
+    choices = CHOICES.get(attribute_name)
+    if choices is not None and converted not in choices:
+        raise ConfigError(
+            f"Invalid value '{value}' of '{attribute_name}' in section '{section}', "
+            f"available options: {', '.join(choices)}"
+        )
+    limits = RANGES.get(attribute_name)
+    if limits is not None and not limits[0] <= converted <= limits[1]:
+        raise ConfigError(
+            f"Value '{value}' of '{attribute_name}' in section '{section}' "
+            f"is out of range [{limits[0]}, {limits[1]}]"
+        )
+    return converted
+
+
+def _split(value: str) -> tuple[str, ...]:
+    """Split a comma-separated value.
+
+    :param value: raw value
+    :type value: str
+    :return: stripped items
+    :rtype: tuple[str, ...]
+    """
+    return tuple(key.strip() for key in value.split(","))
+
+
+def _compile_general_config(config: configparser.ConfigParser) -> dict:
+    """Compile and validate section 'game' and 'shortcut'.
+
+    :param config: parsed config.ini
+    :type config: configparser.ConfigParser
+    :raises ConfigError: section or key is missing or invalid
+    :return: attribute name - value mapping
+    :rtype: dict
+    """
+    for section_name in ("game", "shortcut"):
+        if section_name not in config:
+            raise ConfigError(f"Section '{section_name}' not found in config file")
+
+    section = config["game"]
+    values = {}
+    for attribute_name, _, var_type in GENERAL_CONFIGS:
+        raw_value = section.get(attribute_name, FALLBACKS.get(attribute_name))
+        values[attribute_name] = _convert("game", attribute_name, raw_value, var_type)
+    values["unmarked_release_whitelist"] = _split(values["unmarked_release_whitelist"])
+
+    window_size = values["window_size"]
+    if window_size != "auto" and not re.fullmatch(r"\d+x\d+", window_size):
+        raise ConfigError(
+            f"Invalid value '{window_size}' of 'window_size' in section 'game', "
+            "use auto or {width}x{height}, e.g., 1920x1080"
+        )
+
+    section = config["shortcut"]
+    for config_name, attribute_name in SHORTCUTS:
+        values[attribute_name] = section.get(config_name, fallback=None)
+    bottom_rods = values["bottom_rods_shortcuts"]
+    values["bottom_rods_shortcuts"] = () if bottom_rods is None else _split(bottom_rods)
+    return values
+
+
+def _compile_profile(config: configparser.ConfigParser, name: str) -> dict:
+    """Compile and validate a user profile.
+
+    :param config: parsed config.ini
+    :type config: configparser.ConfigParser
+    :param name: profile name
+    :type name: str
+    :raises ConfigError: key is missing or invalid
+    :return: attribute name - value mapping
+    :rtype: dict
+    """
+    section = config[name]
+    values = {"name": name}
+    strategy = _convert(name, "fishing_strategy", section.get("fishing_strategy"), str)
+    for attribute_name, _, var_type in COMMON_CONFIGS + SPECIAL_CONFIGS[strategy]:
+        raw_value = section.get(attribute_name, FALLBACKS.get(attribute_name))
+        values[attribute_name] = _convert(name, attribute_name, raw_value, var_type)
+    return values
+
+
+def compile_config(path: pathlib.Path = CONFIG_PATH) -> dict:
+    """Parse config.ini and compile its values, using the cache if it's up to date.
+
+    Errors of a profile are stored instead of raised, so a broken profile
+    doesn't prevent the others from being used.
+
+    :param path: path of config.ini, defaults to CONFIG_PATH
+    :type path: pathlib.Path, optional
+    :raises ConfigError: general configs or shortcuts are missing or invalid
+    :return: compiled config with general values, profile names, profiles and errors
+    :rtype: dict
+    """
+    stat = path.stat()
+    key = [CACHE_VERSION, str(path), stat.st_mtime_ns, stat.st_size]
+    try:
+        with open(CACHE_PATH, encoding="utf-8") as file:
+            cache = json.load(file)
+        if cache["key"] == key:
+            return cache["config"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    config = configparser.ConfigParser()
+    try:
+        config.read(path)
+    except configparser.Error as e:
+        raise ConfigError(f"Failed to parse config file: {e}") from e
+    compiled = {
+        "general": _compile_general_config(config),
+        "names": [],
+        "profiles": {},
+        "errors": {},
+    }
+    for section in config.sections():
+        if "fishing_strategy" not in config[section]:
+            continue
+        compiled["names"].append(section)
+        try:
+            compiled["profiles"][section] = _compile_profile(config, section)
+        except ConfigError as e:
+            compiled["errors"][section] = str(e)
+            logger.warning(e)
+
+    try:
+        with open(CACHE_PATH, "w", encoding="utf-8") as file:
+            json.dump({"key": key, "config": compiled}, file)
+    except OSError:
+        logger.warning("Failed to write config cache %s", CACHE_PATH)
+    return compiled
+
+
+def build_profile(compiled: dict, name: str) -> Profile:
+    """Build an immutable profile object from the compiled config.
+
+    :param compiled: compiled config from compile_config()
+    :type compiled: dict
+    :param name: profile name
+    :type name: str
+    :raises ConfigError: profile is invalid
+    :return: profile of the corresponding fishing strategy
+    :rtype: Profile
+    """
+    if name in compiled["errors"]:
+        raise ConfigError(compiled["errors"][name])
+    values = compiled["profiles"][name]
+    return PROFILE_CLASSES[values["fishing_strategy"]](**values)
+
+
 class Setting:
-    """Universal setting node."""
+    """Universal setting node.
+
+    Compiled configs are only exposed as self.general and self.profile, so a reload
+    swaps them as a whole. Command line arguments are merged into this node.
+    """
 
     def __init__(self):
-        """Initialize attributes and merge the configs."""
-        self.window_controller = WindowController()
-        self.config = configparser.ConfigParser()
-        self.config.read(pathlib.Path(__file__).resolve().parents[1] / "config.ini")
+        """Compile config.ini and build the general configs.
 
-        self.profile_names = ["edit configuration file"]
-        for section in self.config.sections():
-            section_obj = self.config[section]
-            if "fishing_strategy" in section_obj:  # Replace has_option() with 'in'
-                self.profile_names.append(section)
+        :raises ConfigError: general configs or shortcuts are missing or invalid
+        """
+        self.compiled = compile_config()
+        self.profile_names = ["edit configuration file"] + self.compiled["names"]
+        self.profile = None
 
         # args should be handled and merged in caller module first
-        self._merge_general_configs()
-        self._merge_shortcuts()
+        self.general = self._build_general_config(self.compiled)
+
+        # backends, replaced by MultiWindowRunner when several windows are driven,
+        # the capture is created on first use, it imports cv2 and numpy
+        self._capture = None
+        self.arbiter = None
+        self.window_suffix = ""
+        self.bind_window(WindowController())
 
         # generate path of the image directory
         parent_dir = pathlib.Path(__file__).resolve().parents[1]
-        self.image_dir = parent_dir / "static" / self.language
-
-    def _merge_general_configs(self) -> None:
-        """Merge general configs from config.ini."""
-        if "game" not in self.config:
-            logger.error("Section 'game' not found in config file")
-            return
-
-        section = self.config["game"]
-
-        for attribute_name, _, var_type in GENERAL_CONFIGS:
-            if attribute_name in section:  # Check if the key exists
-                if var_type == bool:
-                    attribute_value = section.get(attribute_name) == "True"
-                else:
-                    attribute_value = var_type(section.get(attribute_name))
-                setattr(self, attribute_name, attribute_value)
-            else:
-                logger.warning(f"Key '{attribute_name}' not found in section 'game'")
-
-        # Handle whitelist correctly
-        if hasattr(self, "unmarked_release_whitelist"):
-            self.unmarked_release_whitelist = [
-                key.strip() for key in self.unmarked_release_whitelist.split(",")
-            ]
-        else:
-            self.unmarked_release_whitelist = []
+        self.image_dir = parent_dir / "static" / self.general.language
+
+    @property
+    def capture(self) -> "ScreenCapture":
+        """Getter.
 
-    def _merge_shortcuts(self) -> None:
-        """Merge shortcuts from config.ini."""
-        if "shortcut" not in self.config:
-            logger.error("Section 'shortcut' not found in config file")
-            return
+        :return: screen capture backend
+        :rtype: ScreenCapture
+        """
+        if self._capture is None:
+            from capture import ScreenCapture  # pylint: disable=import-outside-toplevel
 
-        section = self.config["shortcut"]
+            self._capture = ScreenCapture()
+        return self._capture
 
-        for config, attribute_name in SHORTCUTS:
-            setattr(self, attribute_name, section.get(config, fallback=None))  # Provide fallback
+    @capture.setter
+    def capture(self, capture: "ScreenCapture") -> None:
+        """Setter.
 
-        if hasattr(self, "bottom_rods_shortcuts"):
-            self.bottom_rods_shortcuts = [
-                key.strip() for key in self.bottom_rods_shortcuts.split(",")
-            ]
-        else:
-            self.bottom_rods_shortcuts = []
+        :param capture: screen capture backend, e.g., a shared one or FakeCapture
+        :type capture: ScreenCapture
+        """
+        self._capture = capture
+
+    def bind_window(self, window_controller: object) -> None:
+        """Bind the node to a game window and detect its size if it's auto.
+
+        :param window_controller: WindowController or FakeWindowController
+        :type window_controller: object
+        """
+        self.window_controller = window_controller
+        # resolved size of the window, general.window_size may be auto
+        self.window_size = self.general.window_size
+        if self.window_size == "auto":
+            width, height = window_controller.get_client_size()
+            self.window_size = f"{width}x{height}"
+            logger.info("Detected window size: %s", self.window_size)
+
+    def _build_general_config(self, compiled: dict) -> GeneralConfig:
+        """Build an immutable general config object from the compiled config.
+
+        :param compiled: compiled config from compile_config()
+        :type compiled: dict
+        :return: general configs and shortcuts
+        :rtype: GeneralConfig
+        """
+        values = compiled["general"]
+        return GeneralConfig(
+            **values | {
+                # json cache stores tuples as lists
+                "unmarked_release_whitelist": tuple(values["unmarked_release_whitelist"]),
+                "bottom_rods_shortcuts": tuple(values["bottom_rods_shortcuts"]),
+            }
+        )
 
     def merge_args(self, args: Namespace, args_map: tuple[tuple]) -> None:
         """Merge command line arguments from caller module.
@@ -165,31 +444,67 @@ class Setting:
         for arg_name, attribute_name, _ in args_map:
             setattr(self, attribute_name, getattr(args, arg_name))
 
+    def get_profile_name(self, pid: int) -> str:
+        """Get the name of a user profile.
+
+        :param pid: user profile id
+        :type pid: int
+        :raises ConfigError: profile doesn't exist, e.g., removed by a reload
+        :return: profile name
+        :rtype: str
+        """
+        if not 0 < pid < len(self.profile_names):
+            raise ConfigError(f"Profile id {pid} not found in config file")
+        return self.profile_names[pid]
+
     def merge_user_configs(self, pid: int):
         """Merge the chosen user profile using pid.
 
         After a profile id and args is given, this method should be invoked by app.py
-        to merge the profile section in config.ini into this object.
+        to build the profile section in config.ini as self.profile.
 
         :param pid: user profile id
         :type pid: int
+        :raises ConfigError: profile is invalid
         """
-        section = self.config[self.profile_names[pid]]
+        self.profile_name = self.get_profile_name(pid)
+        self.profile = build_profile(self.compiled, self.profile_name)
 
-        for attribute_name, _, var_type in COMMON_CONFIGS:
-            # Provide a fallback if the key is missing from the section
-            if var_type == bool:
-                attribute_value = section.get(attribute_name, fallback="False") == "True"
-            else:
-                attribute_value = var_type(section.get(attribute_name, fallback=None))
-            setattr(self, attribute_name, attribute_value)
+    def reload_config(self) -> list[str]:
+        """Recompile config.ini and swap the general configs and the active profile.
 
-        special_configs = SPECIAL_CONFIGS.get(self.fishing_strategy, [])
-        for attribute_name, _, var_type in special_configs:
-            if var_type == bool:
-                attribute_value = section.get(attribute_name, fallback="False") == "True"
-            else:
-                attribute_value = var_type(section.get(attribute_name, fallback=None))
-            setattr(self, attribute_name, attribute_value)
+        Nothing is changed unless both the general configs and the active profile
+        are valid. Profile ids follow the new config file, and the configs in
+        RESTART_CONFIGS keep their current values.
+
+        :raises ConfigError: config.ini or the active profile is invalid
+        :return: names of the changed attributes
+        :rtype: list[str]
+        """
+        compiled = compile_config()
+        if self.profile_name not in compiled["names"]:
+            raise ConfigError(f"Profile '{self.profile_name}' not found in config file")
+        profile = build_profile(compiled, self.profile_name)
+        general = self._build_general_config(compiled)
 
+        ignored = [
+            name for name in RESTART_CONFIGS if getattr(general, name) != getattr(self.general, name)
+        ]
+        if ignored:
+            logger.warning("Restart the script to apply: %s", ", ".join(ignored))
+        general = dataclasses.replace(
+            general, **{name: getattr(self.general, name) for name in RESTART_CONFIGS}
+        )
 
+        changed = [
+            field.name
+            for new, old in ((general, self.general), (profile, self.profile))
+            for field in dataclasses.fields(new)
+            if getattr(new, field.name) != getattr(old, field.name, None)
+        ]
+        # everything is validated, swap the compiled objects
+        self.compiled = compiled
+        self.profile_names = ["edit configuration file"] + compiled["names"]
+        self.general = general
+        self.profile = profile
+        return changed
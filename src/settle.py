@@ -0,0 +1,94 @@
+"""
+Wait for an animation to finish instead of sleeping for a fixed delay.
+
+Opening a menu or taking out an item takes a variable time, the fixed delays
+were long enough for the slowest case. wait_until_settled() polls a region and
+returns as soon as it stops changing, or polls the detector of the expected
+element until it's found. The fixed delay is kept as the upper bound, e.g., for
+a scene that is never still because of the water.
+"""
+
+import time
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+from PIL import Image
+
+SETTLE_INTERVAL = 0.05
+THUMBNAIL_SIZE = (64, 36)  # width, height
+# mean absolute difference of the gray levels of two thumbnails
+CHANGE_THRESHOLD = 1.5
+STABLE_POLLS = 3  # unchanged polls in a row after a change
+# if nothing changes at all, the input may not have been handled yet
+STILL_DURATION = 0.4
+
+
+def get_thumbnail(image: Image.Image) -> np.ndarray:
+    """Reduce an image to a small grayscale thumbnail.
+
+    :param image: image in RGB format
+    :type image: Image.Image
+    :return: thumbnail as float32
+    :rtype: np.ndarray
+    """
+    gray = cv2.cvtColor(np.asarray(image)[:, :, :3], cv2.COLOR_RGB2GRAY)
+    thumbnail = cv2.resize(gray, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+    return thumbnail.astype(np.float32)
+
+
+def wait_until_settled(
+    grab: Callable[[], Image.Image],
+    timeout: float,
+    until: Callable[[], Any] | None = None,
+    interval: float = SETTLE_INTERVAL,
+) -> Any:
+    """Wait until the grabbed image stops changing, or until the expected element
+    appears if its detector is given.
+
+    :param grab: function that captures the watched region
+    :type grab: Callable[[], Image.Image]
+    :param timeout: upper bound of the wait
+    :type timeout: float
+    :param until: detector of the expected element, its result is truthy if it's
+        found, the image is not watched if it's given, defaults to None
+    :type until: Callable[[], Any] | None, optional
+    :param interval: delay between two polls, defaults to SETTLE_INTERVAL
+    :type interval: float, optional
+    :return: the last result of the detector if it's given, falsy if the element
+        didn't appear before the timeout, otherwise True if the image settled
+    :rtype: Any
+    """
+    start_time = time.perf_counter()
+    deadline = start_time + timeout
+    if until is not None:
+        # a still screen doesn't mean the element will appear, e.g., a menu that
+        # opens after a short delay
+        while True:
+            result = until()
+            now = time.perf_counter()
+            if result or now >= deadline:
+                return result
+            time.sleep(min(interval, deadline - now))
+
+    previous = None
+    changed = False
+    stable_polls = 0
+    while True:
+        thumbnail = get_thumbnail(grab())
+        if previous is not None:
+            if np.abs(thumbnail - previous).mean() > CHANGE_THRESHOLD:
+                changed = True
+                stable_polls = 0
+            else:
+                stable_polls += 1
+        previous = thumbnail
+
+        now = time.perf_counter()
+        if changed and stable_polls >= STABLE_POLLS:
+            return True
+        if not changed and now - start_time >= STILL_DURATION:
+            return True
+        if now >= deadline:
+            return False
+        time.sleep(min(interval, deadline - now))
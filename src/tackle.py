@@ -12,6 +12,7 @@ import pyautogui as pag
 
 import exceptions
 import script
+from inputstate import ClickLock
 from monitor import Monitor
 from setting import Setting
 from timer import Timer
@@ -26,6 +27,11 @@ BASE_DELAY = 1
 LOOP_DELAY = 2
 
 RETRIEVAL_TIMEOUT = 64
+# wake up before the predicted finish of the rainbow line, but keep polling
+# often enough to notice a bite
+PREDICTION_MARGIN = 0.5
+MIN_PREDICTED_DELAY = 0.2
+MAX_PREDICTED_DELAY = 8
 PULL_TIMEOUT = 32
 RETRIEVAL_WITH_PAUSE_TIMEOUT = 128
 LIFT_DURATION = 3
@@ -50,6 +56,8 @@ class Tackle:
         self.timer = timer
         self.setting = setting
         self.monitor = monitor
+        # kept per player, the windows of MultiWindowRunner take turns on the mouse
+        self.clicklock = ClickLock()
 
         self.landing_net_out = False  # for telescopic_pull()
 
@@ -79,7 +87,9 @@ class Tackle:
     def cast(self) -> None:
         """Cast the rod, then wait for the lure/bait to fly and sink."""
         logger.info("Casting")
-        match self.setting.cast_power_level:
+        self.clicklock.release()
+        self.timer.start_cast_marks()
+        match self.setting.profile.cast_power_level:
             case 1:  # 0%
                 pag.click()
             case 5:  # power cast
@@ -87,11 +97,12 @@ class Tackle:
                     script.hold_left_click(1)
             case _:
                 # level -1 for backward compatibility
-                #duration = CAST_SCALE * (self.setting.cast_power_level - 1)
-                duration = CAST_SCALE * (self.setting.cast_power_level - random.uniform(-0.2, 0.2))
+                #duration = CAST_SCALE * (self.setting.profile.cast_power_level - 1)
+                power_level = self.setting.profile.cast_power_level
+                duration = CAST_SCALE * (power_level - random.uniform(-0.2, 0.2))
                 script.hold_left_click(duration)
 
-        sleep(self.setting.cast_delay)
+        sleep(self.setting.profile.cast_delay)
         self.timer.update_cast_hour()
 
     def sink(self, marine: bool = True) -> None:
@@ -101,7 +112,8 @@ class Tackle:
         :type marine: bool, optional
         """
         logger.info("Sinking Lure")
-        i = self.setting.sink_timeout
+        profile = self.setting.profile
+        i = profile.sink_timeout
         while i > 0:
             i = script.sleep_and_decrease(i, LOOP_DELAY)
             if marine and self.monitor.is_moving_in_bottom_layer():
@@ -110,10 +122,11 @@ class Tackle:
 
             if self.is_fish_hooked_twice():
                 logger.info("Fish hooked")
+                self.timer.mark("bite")
                 pag.click()
                 return
 
-        script.hold_left_click(self.setting.tighten_duration)
+        script.hold_left_click(profile.tighten_duration)
 
     def is_fish_hooked_twice(self) -> bool:
         """Check if the fish is still hooked after a short delay.
@@ -125,7 +138,7 @@ class Tackle:
             return False
 
         # check if the fish got away after a short delay
-        sleep(self.setting.fish_hooked_delay)
+        sleep(self.setting.profile.fish_hooked_delay)
         if self.monitor.is_fish_hooked():
             return True
         return False
@@ -143,19 +156,26 @@ class Tackle:
         """
         logger.info("Retrieving")
 
+        post_acceleration_enabled = self.setting.profile.post_acceleration_enabled
+        lifting_enabled = self.setting.lifting_enabled
+        finish_delay = 0 if self.setting.rainbow_line_enabled else 2
+
+        self.monitor.rainbow_meter.reset()
+        hooked = False
         i = RETRIEVAL_TIMEOUT
         while i > 0:
             if self.monitor.is_fish_hooked():
-                if self.setting.post_acceleration_enabled == "always":
+                hooked = True
+                self.timer.mark("bite")
+                if post_acceleration_enabled == "always":
                     pag.keyDown("shift")
-                elif self.setting.post_acceleration_enabled == "auto" and first:
+                elif post_acceleration_enabled == "auto" and first:
                     pag.keyDown("shift")
 
-                if self.setting.lifting_enabled:
+                if lifting_enabled:
                     script.hold_right_click(LIFT_DURATION)
 
             if self.monitor.is_retrieval_finished():
-                finish_delay = 0 if self.setting.rainbow_line_enabled else 2
                 sleep(finish_delay)  # for flexibility of default spool (improve ?)
                 return
 
@@ -164,23 +184,47 @@ class Tackle:
             if self.monitor.is_line_at_end():
                 raise exceptions.LineAtEndError
 
-            i = script.sleep_and_decrease(i, LOOP_DELAY)
+            i = script.sleep_and_decrease(i, self._get_retrieval_delay(i, hooked))
 
         raise TimeoutError
 
+    def _get_retrieval_delay(self, i: float, hooked: bool) -> float:
+        """Get the delay before the next retrieval check.
+
+        :param i: remaining time of the retrieval loop
+        :type i: float
+        :param hooked: whether a fish is hooked, its speed is unpredictable
+        :type hooked: bool
+        :return: predicted time before the finish, LOOP_DELAY if it's unknown
+        :rtype: float
+        """
+        if not self.setting.rainbow_line_enabled or hooked:
+            return LOOP_DELAY
+        time_left = self.monitor.rainbow_meter.predict_time_left()
+        if time_left is None:
+            return LOOP_DELAY
+        delay = max(MIN_PREDICTED_DELAY, time_left - PREDICTION_MARGIN)
+        return min(delay, MAX_PREDICTED_DELAY, max(i, MIN_PREDICTED_DELAY))
+
     @script.release_shift_key
     def retrieve_with_pause(self) -> None:
         """Retreive the line, pause periodically."""
         logger.info("Retrieving with pause")
 
-        if self.setting.pre_acceleration_enabled:
+        profile = self.setting.profile
+        if profile.pre_acceleration_enabled:
             pag.keyDown("shift")
 
+        retrieval_duration = profile.retrieval_duration
+        retrieval_delay = profile.retrieval_delay
         i = RETRIEVAL_WITH_PAUSE_TIMEOUT
         while i > 0:
-            script.hold_left_click(self.setting.retrieval_duration)
-            i = script.sleep_and_decrease(i, self.setting.retrieval_delay)
-            if self.monitor.is_fish_hooked() or self.monitor.is_retrieval_finished():
+            script.hold_left_click(retrieval_duration)
+            i = script.sleep_and_decrease(i, retrieval_delay)
+            if self.monitor.is_fish_hooked():
+                self.timer.mark("bite")
+                return
+            if self.monitor.is_retrieval_finished():
                 return
 
     @script.release_ctrl_key
@@ -193,19 +237,21 @@ class Tackle:
         """
         logger.info("Pirking")
 
-        lift_enabled = self.setting.pirk_duration != 0 or self.setting.pirk_delay != 0
-        i = self.setting.pirk_timeout
+        profile = self.setting.profile
+        lift_enabled = profile.pirk_duration != 0 or profile.pirk_delay != 0
+        i = profile.pirk_timeout
         while i > 0:
             if self.is_fish_hooked_twice():
                 logger.info("Fish hooked")
+                self.timer.mark("bite")
                 pag.click()
                 return
 
             if lift_enabled:
                 if ctrl_enabled:
                     pag.keyDown("ctrl")
-                script.hold_right_click(self.setting.pirk_duration)
-                i = script.sleep_and_decrease(i, self.setting.pirk_delay)
+                script.hold_right_click(profile.pirk_duration)
+                i = script.sleep_and_decrease(i, profile.pirk_delay)
             else:
                 i = script.sleep_and_decrease(i, LOOP_DELAY)
 
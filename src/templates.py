@@ -0,0 +1,267 @@
+"""
+Build and load precompiled template bundles.
+
+Each static/{language}/ directory is compiled into one raw bundle file of decoded
+templates and a manifest with their offsets, shapes and content hashes. At
+startup, the bundle is memory-mapped and verified instead of decoding every PNG.
+
+Usage: templates.py [LANGUAGE ...]
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from exceptions import BundleError
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parents[1] / "static"
+BUNDLE_DIR = STATIC_DIR / "bundles"
+BUNDLE_VERSION = 2
+NATIVE_SCALE = 1
+NON_LANGUAGE_DIRS = ("bundles", "digits", "readme", "sound", "tmp")
+
+
+class TemplateBundle:
+    """Memory-mapped templates of a language."""
+
+    def __init__(self, bundle_path: Path, manifest: dict):
+        """Map the bundle file and create views of the templates.
+
+        :param bundle_path: path of the bundle file
+        :type bundle_path: Path
+        :param manifest: parsed manifest of the bundle
+        :type manifest: dict
+        """
+        self.manifest = manifest
+        self.templates = {}
+        self._scaled_templates = {}  # scale - templates
+        entries = manifest["templates"]
+        if not entries:
+            return
+
+        data = np.memmap(bundle_path, dtype=np.uint8, mode="r")
+        for name, entry in entries.items():
+            offset = entry["offset"]
+            size = int(np.prod(entry["shape"]))
+            self.templates[name] = data[offset : offset + size].reshape(entry["shape"])
+
+    @property
+    def names(self) -> set[str]:
+        """Getter.
+
+        :return: names of the templates
+        :rtype: set[str]
+        """
+        return set(self.templates)
+
+    def get(self, name: str) -> np.ndarray | None:
+        """Get a decoded template in BGR format.
+
+        :param name: base name of the image
+        :type name: str
+        :return: template, None if not found
+        :rtype: np.ndarray | None
+        """
+        return self.templates.get(name)
+
+    def get_scaled_templates(self, scale: float) -> dict[str, np.ndarray]:
+        """Get all templates resized to a ui scale, they are resized only once.
+
+        :param scale: ui scale of the game
+        :type scale: float
+        :return: name - template mapping
+        :rtype: dict[str, np.ndarray]
+        """
+        if scale == NATIVE_SCALE:
+            return self.templates
+        if scale not in self._scaled_templates:
+            self._scaled_templates[scale] = {
+                name: scale_template(template, scale)
+                for name, template in self.templates.items()
+            }
+        return self._scaled_templates[scale]
+
+    def get_corrupted_names(self) -> list[str]:
+        """Compare the content of the templates with the hashes in the manifest.
+
+        :return: names of the templates with mismatched hashes
+        :rtype: list[str]
+        """
+        entries = self.manifest["templates"]
+        return [
+            name
+            for name, template in self.templates.items()
+            if hashlib.sha256(template.tobytes()).hexdigest() != entries[name]["sha256"]
+        ]
+
+
+def scale_template(template: np.ndarray, scale: float) -> np.ndarray:
+    """Resize a template to a ui scale.
+
+    :param template: template in BGR format
+    :type template: np.ndarray
+    :param scale: ui scale of the game
+    :type scale: float
+    :return: resized template
+    :rtype: np.ndarray
+    """
+    if scale == NATIVE_SCALE:
+        return template
+    height, width = template.shape[:2]
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    # area interpolation avoids moire when shrinking, cubic keeps edges when enlarging
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(template, size, interpolation=interpolation)
+
+
+def read_template(path: Path, scale: float = NATIVE_SCALE) -> np.ndarray | None:
+    """Decode a png template and resize it to a ui scale.
+
+    :param path: path of the png file
+    :type path: Path
+    :param scale: ui scale of the game, defaults to NATIVE_SCALE
+    :type scale: float, optional
+    :return: template in BGR format, None if it can't be decoded
+    :rtype: np.ndarray | None
+    """
+    template = cv2.imread(str(path), cv2.IMREAD_COLOR)
+    if template is None:
+        return None
+    return scale_template(template, scale)
+
+
+def _get_bundle_paths(language: str) -> tuple[Path, Path]:
+    """Get the paths of the bundle and its manifest.
+
+    :param language: language directory name in static/
+    :type language: str
+    :return: bundle path and manifest path
+    :rtype: tuple[Path, Path]
+    """
+    return BUNDLE_DIR / f"{language}.bin", BUNDLE_DIR / f"{language}.json"
+
+
+def _get_source_stats(image_dir: Path) -> dict[str, list[int]]:
+    """Get the modification time and size of every png file of a language.
+
+    :param image_dir: directory of the png files
+    :type image_dir: Path
+    :return: file name - [mtime in ns, size in bytes]
+    :rtype: dict[str, list[int]]
+    """
+    stats = {}
+    for path in sorted(image_dir.glob("*.png")):
+        stat = path.stat()
+        stats[path.name] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def build_bundle(language: str) -> dict:
+    """Decode all templates of a language into a bundle and write its manifest.
+
+    :param language: language directory name in static/
+    :type language: str
+    :return: manifest of the bundle
+    :rtype: dict
+    """
+    image_dir = STATIC_DIR / language
+    bundle_path, manifest_path = _get_bundle_paths(language)
+    BUNDLE_DIR.mkdir(exist_ok=True)
+
+    sources = _get_source_stats(image_dir)
+    entries = {}
+    offset = 0
+    with open(bundle_path, "wb") as file:
+        for path in sorted(image_dir.glob("*.png")):
+            template = read_template(path)
+            if template is None:
+                logger.warning("Failed to decode %s", path)
+                continue
+            data = np.ascontiguousarray(template).tobytes()
+            file.write(data)
+            entries[path.stem] = {
+                "offset": offset,
+                "shape": list(template.shape),
+                "sha256": hashlib.sha256(data).hexdigest(),
+            }
+            offset += len(data)
+
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "sources": sources,
+        "templates": entries,
+    }
+    with open(manifest_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=1)
+    return manifest
+
+
+@functools.cache
+def load_bundle(language: str) -> TemplateBundle | None:
+    """Load and verify the bundle of a language, loaded bundles are shared.
+
+    The bundle is considered outdated if png files in static/{language}/ were
+    added, removed or modified after it was built.
+
+    :param language: language directory name in static/
+    :type language: str
+    :raises BundleError: content of the bundle doesn't match its manifest
+    :return: loaded bundle, None if it's missing or outdated
+    :rtype: TemplateBundle | None
+    """
+    bundle_path, manifest_path = _get_bundle_paths(language)
+    try:
+        with open(manifest_path, encoding="utf-8") as file:
+            manifest = json.load(file)
+        sources = _get_source_stats(STATIC_DIR / language)
+    except (OSError, ValueError):
+        logger.info("Template bundle of '%s' not found, run templates.py to build it", language)
+        return None
+
+    if manifest.get("version") != BUNDLE_VERSION or manifest["sources"] != sources:
+        logger.warning("Template bundle of '%s' is outdated, run templates.py", language)
+        return None
+
+    try:
+        bundle = TemplateBundle(bundle_path, manifest)
+    except (OSError, ValueError) as e:
+        raise BundleError(f"Failed to load template bundle of '{language}'") from e
+    corrupted_names = bundle.get_corrupted_names()
+    if corrupted_names:
+        raise BundleError(
+            f"Template bundle of '{language}' is corrupted: {', '.join(corrupted_names)}"
+        )
+    return bundle
+
+
+def parse_args() -> argparse.Namespace:
+    """Cofigure argparser and parse the command line arguments.
+
+    :return: parsed args
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Build template bundles.")
+    parser.add_argument(
+        "languages", nargs="*", metavar="LANGUAGE", help="Languages to build, all by default"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
+    languages = parse_args().languages or [
+        path.name
+        for path in STATIC_DIR.iterdir()
+        if path.is_dir() and path.name not in NON_LANGUAGE_DIRS
+    ]
+    for lang in languages:
+        bundle_manifest = build_bundle(lang)
+        print(f"Built {len(bundle_manifest['templates'])} templates of '{lang}'")
@@ -21,12 +21,15 @@ class Timer:
 
         self.cast_rhour = None
         self.cast_ghour = None
-        self.cast_rhour_list = []
-        self.cast_ghour_list = []
 
         self.pre_tea_drink_time = 0
         self.pre_alcohol_drink_time = 0
 
+        # per-rod timestamps and stage durations of the ongoing cast
+        self.rod = None
+        self.cast_marks = {}
+        self.first_cast_time = None
+
     def get_duration(self) -> str:
         """Calculate the execution time of the program.
 
@@ -67,18 +70,73 @@ class Timer:
         self.cast_rhour = int((time.time() - self.start_time) // 3600)
         self.cast_ghour = int((dt.minute / 60 + dt.second / 3600) * 24 % 24)
 
-    def add_cast_hour(self) -> None:
-        """Record latest real and in-game hour"""
-        self.cast_rhour_list.append(self.cast_rhour)
-        self.cast_ghour_list.append(self.cast_ghour)
-
-    def get_cast_hour_list(self) -> tuple[list[int]]:
+    def get_cast_hour(self) -> tuple[int, int]:
         """Getter.
 
-        :return: lists of real and in-game hours
-        :rtype: tuple[list[int]]
+        :return: latest real and in-game hour of casting
+        :rtype: tuple[int, int]
+        """
+        if self.cast_rhour is None:
+            self.update_cast_hour()
+        return self.cast_rhour, self.cast_ghour
+
+    def select_rod(self, rod: str | None) -> None:
+        """Select the rod that following cast marks belong to.
+
+        :param rod: rod shortcut, None if only one rod is used
+        :type rod: str | None
+        """
+        self.rod = rod
+
+    def start_cast_marks(self) -> None:
+        """Reset the marks of the selected rod and record the casting time."""
+        cast_time = time.perf_counter()
+        if self.first_cast_time is None:
+            self.first_cast_time = cast_time
+        self.cast_marks[self.rod] = {"cast": cast_time, "durations": {}}
+
+    def mark(self, event: str) -> None:
+        """Record the first occurrence of an event during the ongoing cast.
+
+        :param event: event name, e.g., bite, hook
+        :type event: str
+        """
+        marks = self.cast_marks.get(self.rod)
+        if marks is not None and event not in marks:
+            marks[event] = time.perf_counter()
+
+    def add_stage_duration(self, stage: str, duration: float) -> None:
+        """Accumulate the time spent in a stage during the ongoing cast.
+
+        :param stage: stage name, e.g., retrieval, pull
+        :type stage: str
+        :param duration: time spent in seconds
+        :type duration: float
+        """
+        marks = self.cast_marks.get(self.rod)
+        if marks is not None:
+            durations = marks["durations"]
+            durations[stage] = durations.get(stage, 0) + duration
+
+    def pop_cast_marks(self) -> dict | None:
+        """Remove and return the marks of the selected rod.
+
+        :return: event timestamps and stage durations, None if no cast is ongoing
+        :rtype: dict | None
+        """
+        return self.cast_marks.pop(self.rod, None)
+
+    def get_time_to_first_cast(self, launch_time: float) -> float | None:
+        """Calculate the time between the launch and the first cast.
+
+        :param launch_time: perf_counter() timestamp of the launch
+        :type launch_time: float
+        :return: time to first cast in seconds, None if not casted yet
+        :rtype: float | None
         """
-        return self.cast_rhour_list, self.cast_ghour_list
+        if self.first_cast_time is None:
+            return None
+        return self.first_cast_time - launch_time
 
     def is_tea_drinkable(self) -> bool:
         """Check if it has been a long time since the last tea consumption.
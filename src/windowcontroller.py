@@ -10,19 +10,41 @@ import pyautogui as pag
 # import win32api, win32con
 import win32gui
 
+GAME_WINDOW_TITLE = "Russian Fishing 4"
+
+
+def find_game_windows(title: str = GAME_WINDOW_TITLE) -> list[int]:
+    """Find the handles of all visible game windows.
+
+    :param title: game title, defaults to GAME_WINDOW_TITLE
+    :type title: str, optional
+    :return: window handles
+    :rtype: list[int]
+    """
+    hwnds = []
+
+    def callback(hwnd: int, _) -> None:
+        if win32gui.IsWindowVisible(hwnd) and win32gui.GetWindowText(hwnd) == title:
+            hwnds.append(hwnd)
+
+    win32gui.EnumWindows(callback, None)
+    return hwnds
+
 
 class WindowController:
     """Controller for terminal and game windows management."""
 
-    def __init__(self, game_window_title="Russian Fishing 4"):
+    def __init__(self, game_window_title=GAME_WINDOW_TITLE, hwnd: int | None = None):
         """Constructor method.
 
-        :param title: game title, defaults to 'Russian Fishing 4'
+        :param title: game title, defaults to GAME_WINDOW_TITLE
         :type title: str, optional
+        :param hwnd: handle of the game window, find it by title if not given
+        :type hwnd: int | None, optional
         """
         self._title = game_window_title
         self._script_hwnd = self._get_cur_hwnd()
-        self._game_hwnd = self._get_game_hwnd()
+        self._game_hwnd = hwnd or self._get_game_hwnd()
 
     def _get_cur_hwnd(self) -> int:
         """Get the handle of the terminal.
@@ -53,6 +75,24 @@ class WindowController:
         """
         return win32gui.GetWindowRect(self._game_hwnd)
 
+    def get_capture_region(self) -> tuple[int, int, int, int]:
+        """Get the region of the game window for screen searches.
+
+        :return: left, top, width, and height
+        :rtype: tuple[int, int, int, int]
+        """
+        left, top, right, bottom = win32gui.GetWindowRect(self._game_hwnd)
+        return left, top, right - left, bottom - top
+
+    def get_client_size(self) -> tuple[int, int]:
+        """Get the size of the game window without its title bar and borders.
+
+        :return: width and height of the client area
+        :rtype: tuple[int, int]
+        """
+        left, top, right, bottom = win32gui.GetClientRect(self._game_hwnd)
+        return right - left, bottom - top
+
     def activate_script_window(self) -> None:
         """Focus terminal."""
         pag.press("alt")
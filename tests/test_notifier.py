@@ -0,0 +1,294 @@
+"""
+Tests of the notification channels against local stand-ins of the services.
+
+The SMTP stand-in is a small socketserver, smtpd was removed in Python 3.12 and
+aiosmtpd is not a dependency. The miaotixing stand-in is an http.server that
+answers with the queued status codes.
+"""
+
+import json
+import os
+import socketserver
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import notifier  # pylint: disable=wrong-import-position
+
+TIMEOUT = 5
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Answer the commands used by smtplib and record the messages."""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost stand-in")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            verb = line.decode().split(" ", 1)[0].strip().upper()
+            with server.lock:
+                server.commands.append(verb)
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while (line := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(line)
+                with server.lock:
+                    server.messages.append(b"".join(data).decode())
+                self.reply("250 OK")
+                if server.drop_after_data:  # like an idle timeout of the server
+                    break
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                break
+            else:
+                self.reply("250 OK")
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Local SMTP server without authentication or TLS."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.commands = []
+        self.messages = []
+        self.drop_after_data = False
+
+
+class MiaotixingHandler(BaseHTTPRequestHandler):
+    """Answer with the next queued status code and record the requests."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        server = self.server
+        with server.lock:
+            server.requests.append((self.client_address, self.path))
+            status = server.statuses.pop(0) if server.statuses else 200
+        if status == 200:
+            body = json.dumps({"code": server.code, "msg": "stand-in"}).encode()
+        else:
+            body = b"unavailable"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:  # pylint: disable=redefined-builtin
+        pass
+
+
+class MiaotixingStandIn(ThreadingHTTPServer):
+    """Local miaotixing trigger endpoint."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), MiaotixingHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.statuses = []
+        self.code = 0
+
+
+def start_server(server: socketserver.BaseServer) -> socketserver.BaseServer:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_server(server: socketserver.BaseServer) -> None:
+    server.shutdown()
+    server.server_close()
+
+
+class EmailChannelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = start_server(SMTPStandIn())
+        self.addCleanup(stop_server, self.server)
+        env = {
+            "EMAIL": "bot@example.com",
+            "PASSWORD": "",
+            "SMTP_SERVER": "127.0.0.1",
+            "SMTP_PORT": str(self.server.server_address[1]),
+            "SMTP_SSL": "False",
+        }
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connection_is_reused_after_noop(self):
+        channel = notifier.EmailChannel()
+        channel.put("first", None)
+        channel.put("second", None)
+        channel.close(TIMEOUT)
+
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(self.server.connections, 1)
+        self.assertIn("NOOP", self.server.commands)
+        self.assertEqual(self.server.commands[-1], "QUIT")
+
+    def test_reconnect_after_server_closed_connection(self):
+        self.server.drop_after_data = True
+        channel = notifier.EmailChannel()
+        channel.put("first", None)
+        channel.put("second", None)
+        channel.close(TIMEOUT)
+
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_give_up_when_server_is_unreachable(self):
+        stop_server(self.server)  # nothing is listening on the port now
+        with (
+            mock.patch.object(notifier, "time") as time_mock,
+            self.assertLogs(notifier.logger, "ERROR"),
+        ):
+            channel = notifier.EmailChannel()
+            channel.put("lost", None)
+            channel.close(TIMEOUT)
+
+        delays = [call.args[0] for call in time_mock.sleep.call_args_list]
+        expected = [notifier.RETRY_DELAY * 2**i for i in range(notifier.MAX_RETRIES)]
+        self.assertEqual(delays, expected)
+
+
+class MiaotixingChannelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = start_server(MiaotixingStandIn())
+        self.addCleanup(stop_server, self.server)
+        host, port = self.server.server_address[:2]
+        env = {"MIAO_CODE": "code", "MIAOTIXING_URL": f"http://{host}:{port}/trigger"}
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(notifier, "time")
+        self.time_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_delays(self) -> list:
+        return [call.args[0] for call in self.time_mock.sleep.call_args_list]
+
+    def test_connection_is_reused(self):
+        channel = notifier.MiaotixingChannel()
+        channel.put("first", None)
+        channel.put("second", None)
+        channel.close(TIMEOUT)
+
+        self.assertEqual(len(self.server.requests), 2)
+        clients = {client for client, _ in self.server.requests}
+        self.assertEqual(len(clients), 1)
+        self.assertTrue(all(path.startswith("/trigger?") for _, path in self.server.requests))
+
+    def test_retry_with_exponential_backoff(self):
+        self.server.statuses = [503, 503]
+        channel = notifier.MiaotixingChannel()
+        channel.put("retried", None)
+        channel.close(TIMEOUT)
+
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.get_delays(), [notifier.RETRY_DELAY, notifier.RETRY_DELAY * 2])
+
+    def test_give_up_after_max_retries(self):
+        self.server.statuses = [503] * (notifier.MAX_RETRIES + 1)
+        with self.assertLogs(notifier.logger, "ERROR"):
+            channel = notifier.MiaotixingChannel()
+            channel.put("lost", None)
+            channel.close(TIMEOUT)
+
+        self.assertEqual(len(self.server.requests), notifier.MAX_RETRIES + 1)
+
+    def test_rejected_message_is_not_retried(self):
+        self.server.code = 101
+        with self.assertLogs(notifier.logger, "ERROR"):
+            channel = notifier.MiaotixingChannel()
+            channel.put("rejected", None)
+            channel.close(TIMEOUT)
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.get_delays(), [])
+
+
+class RecordingChannel(notifier.Channel):
+    """Record delivered subjects, slowly, and fail on the given ones."""
+
+    name = "recording"
+
+    def __init__(self, failing: tuple = ()):
+        self.delivered = []
+        self.failing = failing
+        self.started = threading.Event()
+        self.resume = threading.Event()
+        super().__init__()
+
+    def send(self, subject, table):
+        self.started.set()
+        self.resume.wait(TIMEOUT)
+        if subject in self.failing:
+            raise RuntimeError(subject)
+        self.delivered.append(subject)
+
+
+class WorkerTest(unittest.TestCase):
+
+    def test_close_drains_queue(self):
+        channel = RecordingChannel()
+        for i in range(5):
+            channel.put(f"message {i}", None)
+        # the worker is still delivering the first message when close is called
+        self.assertTrue(channel.started.wait(TIMEOUT))
+        threading.Timer(0.1, channel.resume.set).start()
+        channel.close(TIMEOUT)
+
+        self.assertFalse(channel._thread.is_alive())
+        self.assertEqual(channel.delivered, [f"message {i}" for i in range(5)])
+
+    def test_worker_survives_unexpected_error(self):
+        channel = RecordingChannel(failing=("broken",))
+        channel.resume.set()
+        with self.assertLogs(notifier.logger, "ERROR"):
+            channel.put("broken", None)
+            channel.put("fine", None)
+            channel.close(TIMEOUT)
+
+        self.assertEqual(channel.delivered, ["fine"])
+
+    def test_notifier_closes_every_channel(self):
+        with mock.patch.object(notifier, "load_env"):
+            notifier_ = notifier.Notifier(False, False, "alarm.wav")
+        channels = [RecordingChannel(), RecordingChannel()]
+        for channel in channels:
+            channel.resume.set()
+            channel.put("last", None)
+        notifier_.channels = dict(enumerate(channels))
+        notifier_.close(TIMEOUT)
+
+        for channel in channels:
+            self.assertFalse(channel._thread.is_alive())
+            self.assertEqual(channel.delivered, ["last"])
+
+
+if __name__ == "__main__":
+    unittest.main()